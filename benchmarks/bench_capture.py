@@ -0,0 +1,53 @@
+"""
+截图延迟基准测试：对比每次重新查找窗口、创建 mss/DC 的冷启动截图与复用截图会话的截图耗时。
+
+用法（需在 Windows 上打开游戏窗口）:
+  python benchmarks/bench_capture.py [--title <窗口标题>] [--count 100] [--background]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.config import cfg  # noqa: E402
+from module.automation.screenshot import Screenshot  # noqa: E402
+
+
+def measure(title, count, use_background, cold):
+    timings = []
+    for _ in range(count):
+        if cold:
+            # 模拟原实现：每帧都重新查找窗口、计算几何信息并创建截图资源
+            Screenshot.session.close()
+        start = time.perf_counter()
+        result = Screenshot.take_screenshot(title, use_background_screenshot=use_background)
+        timings.append(time.perf_counter() - start)
+        if not result:
+            sys.exit(f"截图失败，请确认窗口已打开：{title}")
+    return np.array(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="截图延迟基准测试")
+    parser.add_argument("--title", default=None, help="游戏窗口标题，默认使用配置文件中的 game_title_name")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--background", action="store_true", help="使用后台截图（PrintWindow）")
+    args = parser.parse_args()
+
+    title = args.title or cfg.game_title_name
+
+    results = {}
+    for name, cold in (("cold", True), ("session", False)):
+        Screenshot.session.close()
+        timings = measure(title, args.count, args.background, cold)
+        results[name] = timings
+        print(f"{name:>8}: 平均 {timings.mean():.2f} ms  p50 {np.percentile(timings, 50):.2f} ms  p95 {np.percentile(timings, 95):.2f} ms")
+    print(f"加速比：{results['cold'].mean() / max(results['session'].mean(), 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
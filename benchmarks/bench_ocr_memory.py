@@ -0,0 +1,74 @@
+"""
+OCR 长时间运行内存基准测试：对同一张图片循环识别，对比原先 to_json + convert_format（可选周期性 full GC）
+与直接读取 RapidOCR 输出数组的 OCRResult 的进程内存峰值。
+
+用法:
+  python benchmarks/bench_ocr_memory.py [--image assets/screenshot/README.png] [--count 300] [--gc-interval 20]
+"""
+import os
+import gc
+import sys
+import time
+import argparse
+
+import psutil
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.ocr import ocr  # noqa: E402
+from module.ocr.ocr_result import OCRResult  # noqa: E402
+
+
+def legacy(engine, image, count, gc_interval):
+    """原实现：to_json 构造字典列表，再转换为 [box, (text, score)] 嵌套列表，每 gc_interval 次执行 full GC。"""
+    for i in range(1, count + 1):
+        result = engine(image).to_json() or []
+        lines = [[item['box'], (item['txt'], item['score'])] for item in result]
+        if gc_interval > 0 and i % gc_interval == 0:
+            gc.collect()
+        yield lines
+
+
+def lean(engine, image, count, gc_interval):
+    """新实现：只保留检测框数组、文本和置信度，不执行 full GC。"""
+    for _ in range(count):
+        yield OCRResult.from_output(engine(image))
+
+
+def measure(name, runner, engine, image, count, gc_interval):
+    process = psutil.Process()
+    gc.collect()
+    baseline = process.memory_info().rss
+    peak = baseline
+    start = time.perf_counter()
+    for lines in runner(engine, image, count, gc_interval):
+        # 模拟调用方遍历识别结果
+        texts = [text for _, (text, _) in (lines or [])]
+        peak = max(peak, process.memory_info().rss)
+    elapsed = time.perf_counter() - start
+    final = process.memory_info().rss
+    mb = 1024 * 1024
+    print(f"{name:>14}: 峰值 +{(peak - baseline) / mb:.1f} MB  结束 +{(final - baseline) / mb:.1f} MB  "
+          f"平均 {elapsed / count * 1000:.1f} ms/次  行数 {len(texts)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR 长时间运行内存基准测试")
+    parser.add_argument("--image", default="assets/screenshot/README.png")
+    parser.add_argument("--count", type=int, default=300)
+    parser.add_argument("--gc-interval", type=int, default=20, help="原实现的 full GC 间隔，0 表示不执行")
+    args = parser.parse_args()
+
+    image = Image.open(args.image).convert("RGB")
+    ocr.instance_ocr()
+    engine = ocr.ocr
+    engine(image)  # 预热，避免首次推理的内存分配计入结果
+
+    measure("legacy", legacy, engine, image, args.count, 0)
+    measure(f"legacy+gc/{args.gc_interval}", legacy, engine, image, args.count, args.gc_interval)
+    measure("lean", lean, engine, image, args.count, 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+OCR 后处理基准测试：对比逐条规则的文本替换与先整体筛选的 replace_strings，
+以及逐行遍历的文本查找与 OCRTextIndex 倒排索引查找。
+
+用法:
+  python benchmarks/bench_ocr_postprocess.py [--lines 40] [--hit-ratio 0.05] [--rounds 2000]
+"""
+import os
+import sys
+import copy
+import json
+import time
+import random
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from module.ocr.ocr import OCR  # noqa: E402
+from module.ocr.text_index import OCRTextIndex  # noqa: E402
+
+REPLACEMENTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "config", "ocr_replacements.json")
+WORDS = ["开拓力", "委托", "派遣", "领取", "确认", "取消", "返回", "每日实训", "模拟宇宙", "差分宇宙", "货币战争", "凝滞虚影",
+         "侵蚀隧洞", "拟造花萼", "历战余响", "背包", "星琼", "信用点", "无名勋礼", "任务", "活动", "商店", "兑换", "已售罄"]
+MISSING_WORDS = ["开始挑战", "战斗失败", "再来一次", "退出关卡", "点击空白处关闭", "自动战斗", "选择祝福", "选择奇物", "下一步", "领取奖励"]
+
+
+def loop_replace(replacements, results):
+    """原实现：每行文本逐条检查所有替换规则。"""
+    direct = replacements.get("direct", {}) or {}
+    conditional = replacements.get("conditional", {}) or {}
+    for item in results:
+        new_text = item["txt"]
+        for old_str, new_str in direct.items():
+            if old_str and new_text.count(old_str) > 0:
+                new_text = new_text.replace(old_str, new_str)
+        for old_str, new_str in conditional.items():
+            if old_str and new_str not in new_text and old_str in new_text:
+                new_text = new_text.replace(old_str, new_str)
+        item["txt"] = new_text
+    return results
+
+
+def loop_search(ocr_result, targets, include):
+    """原实现：按目标顺序逐行遍历 OCR 结果，返回第一个匹配的行号。"""
+    for target in targets:
+        for i, (_, (text, _)) in enumerate(ocr_result):
+            if (target in text) if include else (text == target):
+                return i
+    return None
+
+
+def index_search(index, targets, include):
+    return index.find_first(targets, include)[1]
+
+
+def make_results(rng, replacements, count, hit_ratio):
+    keys = list(replacements["direct"]) + list(replacements["conditional"])
+    results = []
+    for i in range(count):
+        text = "".join(rng.sample(WORDS, rng.randint(1, 3)))
+        if rng.random() < hit_ratio:
+            text += rng.choice(keys)
+        box = [[0, i * 30], [200, i * 30], [200, i * 30 + 24], [0, i * 30 + 24]]
+        results.append({"box": box, "txt": text, "score": 0.95})
+    return results
+
+
+def timed(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    return (time.perf_counter() - start) / rounds * 1e6, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR 后处理基准测试")
+    parser.add_argument("--lines", type=int, default=40, help="每次识别结果的文本行数")
+    parser.add_argument("--hit-ratio", type=float, default=0.05, help="包含替换规则原字符串的行所占比例")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(REPLACEMENTS_PATH, "r", encoding="utf-8") as file:
+        replacements = json.load(file)
+    logger = logging.getLogger("bench_ocr_postprocess")
+    logger.setLevel(logging.WARNING)
+    ocr = OCR(logger, replacements)
+
+    rng = random.Random(0)
+    results = make_results(rng, replacements, args.lines, args.hit_ratio)
+
+    # 替换会原地修改结果，提前准备好每轮使用的副本，不计入耗时
+    batches = iter([copy.deepcopy(results) for _ in range(args.rounds)])
+    loop_time, expected = timed(lambda: loop_replace(replacements, next(batches)), args.rounds)
+    batches = iter([copy.deepcopy(results) for _ in range(args.rounds)])
+    gated_time, replaced = timed(lambda: ocr.replace_strings(next(batches)), args.rounds)
+    same = [item["txt"] for item in expected] == [item["txt"] for item in replaced]
+    print(f"文本替换（{len(replacements['direct']) + len(replacements['conditional'])} 条规则，{args.lines} 行）")
+    print(f"      loop: {loop_time:.1f} us")
+    print(f"     gated: {gated_time:.1f} us")
+    print(f"加速比：{loop_time / max(gated_time, 1e-9):.1f}x，结果一致：{same}")
+
+    ocr_result = [[item["box"], (item["txt"], item["score"])] for item in replaced]
+    # 等待界面出现时查找的文字往往尚未出现，命中与未命中的查询各占一半
+    queries = [([rng.choice(WORDS)], True) for _ in range(10)] + [([word], True) for word in MISSING_WORDS] + [([ocr_result[-1][1][0]], False)]
+    index = OCRTextIndex(ocr_result)
+    same = all(loop_search(ocr_result, targets, include) == index_search(index, targets, include) for targets, include in queries)
+    # 一份 OCR 结果上通常会连续查找多个目标，索引只构建一次
+    loop_time, _ = timed(lambda: [loop_search(ocr_result, targets, include) for targets, include in queries], args.rounds)
+
+    def search_all():
+        index = OCRTextIndex(ocr_result)
+        return [index_search(index, targets, include) for targets, include in queries]
+
+    index_time, _ = timed(search_all, args.rounds)
+    print(f"文本查找（{len(queries)} 次查询，{args.lines} 行）")
+    print(f"      loop: {loop_time:.1f} us")
+    print(f"     index: {index_time:.1f} us")
+    print(f"加速比：{loop_time / max(index_time, 1e-9):.1f}x，结果一致：{same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+多尺度模板匹配基准测试：对比逐比例全分辨率匹配与金字塔匹配的耗时和结果。
+
+用法:
+  python benchmarks/bench_pyramid_match.py --frames <录制的 1920x1080 截图目录> --template <模板图片> [--scale-range 0.8 1.2]
+"""
+import os
+import sys
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.image_utils import ImageUtils  # noqa: E402
+
+
+def exhaustive_match(screenshot, template, scales):
+    """原实现：每个缩放比例都在全分辨率截图上匹配一次。"""
+    max_val, max_loc = -np.inf, None
+    for scale in scales:
+        scaled_template = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        result = cv2.matchTemplate(screenshot, scaled_template, cv2.TM_CCOEFF_NORMED)
+        _, local_max_val, _, local_max_loc = cv2.minMaxLoc(result)
+        if local_max_val > max_val:
+            max_val, max_loc = local_max_val, local_max_loc
+    return max_val, max_loc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多尺度模板匹配基准测试")
+    parser.add_argument("--frames", required=True, help="录制的截图目录（PNG/JPG）")
+    parser.add_argument("--template", required=True, help="模板图片路径")
+    parser.add_argument("--scale-range", nargs=2, type=float, default=(0.8, 1.2))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    template = ImageUtils.read_image(args.template)
+    scales = np.arange(args.scale_range[0], args.scale_range[1] + 0.0001, 0.05)
+    frames = [
+        ImageUtils.read_image(os.path.join(args.frames, name))
+        for name in sorted(os.listdir(args.frames))
+        if name.lower().endswith((".png", ".jpg", ".jpeg"))
+    ]
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        sys.exit("未找到截图")
+
+    timings = {"exhaustive": 0.0, "pyramid": 0.0}
+    mismatches = 0
+    for frame in frames:
+        for name, func in (("exhaustive", exhaustive_match), ("pyramid", ImageUtils.pyramid_match_template)):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                val, loc = func(frame, template, scales)
+            timings[name] += (time.perf_counter() - start) / args.repeat
+            if name == "exhaustive":
+                expected = (val, loc)
+        if loc != expected[1] or abs(val - expected[0]) > 1e-3:
+            mismatches += 1
+            print(f"结果不一致：exhaustive={expected[0]:.4f}@{expected[1]} pyramid={val:.4f}@{loc}")
+
+    count = len(frames)
+    for name, total in timings.items():
+        print(f"{name:>10}: {total / count * 1000:.1f} ms/帧")
+    print(f"加速比：{timings['exhaustive'] / max(timings['pyramid'], 1e-9):.1f}x，结果不一致：{mismatches}/{count}")
+
+
+if __name__ == "__main__":
+    main()
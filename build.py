@@ -47,6 +47,14 @@ def init_ocr() -> None:
     log.info("[✓] OCR初始化完成")
 
 
+def build_templates() -> None:
+    """构建预解码模板包"""
+    log.info("[*] 构建模板包...")
+    from utils.template_store import TemplateStore
+    count = TemplateStore.build()
+    log.info(f"[✓] 模板包构建完成，共 {count} 张图片")
+
+
 def update_universe() -> None:
     """更新Universe"""
     log.info("[*] 更新Universe...")
@@ -113,6 +121,7 @@ def execute_all_tasks(version: str = None, output_file: Path = None) -> None:
     log.info("=" * 50)
 
     init_ocr()
+    build_templates()
     update_universe()
     update_fight()
     update_fps_unlocker()
@@ -134,6 +143,7 @@ def main():
 示例:
   python build.py --help                                      # 显示帮助信息
   python build.py --task ocr                                  # 只初始化OCR
+  python build.py --task templates                            # 只构建模板包
   python build.py --task universe                             # 只更新Universe
   python build.py --task fight                                # 只更新Fight
   python build.py --task fps-unlocker                         # 只更新FPS解锁器
@@ -148,7 +158,7 @@ def main():
         "--task",
         "-t",
         type=str,
-        choices=["ocr", "universe", "fight", "fps-unlocker", "browser", "changelog", "all"],
+        choices=["ocr", "templates", "universe", "fight", "fps-unlocker", "browser", "changelog", "all"],
         help="要执行的任务(默认: all)"
     )
     parser.add_argument(
@@ -184,6 +194,8 @@ def main():
     try:
         if task == "ocr":
             init_ocr()
+        elif task == "templates":
+            build_templates()
         elif task == "universe":
             update_universe()
         elif task == "fight":
@@ -1,9 +1,11 @@
 import sys
 import time
 import math
+import threading
+import functools
+from collections import OrderedDict
 import cv2
 import numpy as np
-from PIL import Image
 
 from .screenshot import Screenshot
 from .debug_overlay import get_debug_overlay, DebugOverlay
@@ -11,11 +13,41 @@ from utils.logger.logger import Logger
 from typing import Optional
 from utils.singleton import SingletonMeta
 from utils.image_utils import ImageUtils
+from utils.template_store import TemplateStore
+from utils.frame import Frame
 from module.game import get_game_controller
 from module.ocr import ocr
+from module.ocr.text_index import OCRTextIndex
+from module.ocr.onnx_session import OnnxSession
 from module.config import cfg
 
 
+# 截图来源支持只截取部分区域时，面积不超过整个画面此比例的裁剪截图不经过整帧缓存，直接截取该区域
+FRAME_CACHE_BYPASS_CROP_AREA = 0.25
+# OCR 预检：区域内的边缘像素少于此值时视为没有文字，不调用 OCR
+OCR_PREFILTER_MIN_EDGE_PIXELS = 16
+# OCR 预检使用的 Canny 阈值，取较低的值使低对比度的小字也能产生边缘
+OCR_PREFILTER_CANNY_THRESHOLDS = (16, 48)
+# 记录的模板匹配位置最多保留的条数，超过后淘汰最久未使用的记录
+LEARNED_REGION_CACHE_SIZE = 512
+# 模板连续在同一位置匹配成功此次数后，才优先在该位置附近搜索
+LEARNED_REGION_MIN_HITS = 3
+# 两次匹配位置相差不超过此像素数时视为同一位置
+LEARNED_REGION_TOLERANCE = 4
+# 每优先搜索记录位置此次数后改为搜索整张截图一次，确认最佳匹配仍在该位置，界面布局变化后不会一直沿用旧位置
+LEARNED_REGION_VERIFY_INTERVAL = 20
+# 原始输出（未经NMS）的YOLO模型后处理使用的NMS IoU阈值
+YOLO_NMS_IOU_THRESHOLD = 0.45
+# 分块推理时相邻分块的重叠比例，小于重叠宽度的目标至少完整出现在一个分块中
+YOLO_TILE_OVERLAP = 0.2
+# 分块推理合并结果时保留的最低置信度，仅用于减少原始输出模型的候选框数量
+YOLO_TILE_MIN_SCORE = 0.001
+# 检测框与分块内部边缘的距离不超过此像素数时视为被截断
+YOLO_TILE_EDGE_MARGIN = 2
+# 被截断的框有此比例以上的面积落在另一个完整的同类框内时丢弃
+YOLO_TILE_COVER_RATIO = 0.8
+
+
 class Automation(metaclass=SingletonMeta):
     """
     自动化管理类，用于管理与游戏窗口相关的自动化操作。
@@ -31,25 +63,117 @@ class Automation(metaclass=SingletonMeta):
         self.screenshot = None
         self._init_input()
         self.img_cache = {}
+        self.template_store = TemplateStore(TemplateStore.DEFAULT_PACK_PATH, logger)
         self._debug_overlay = None
         self._debug_initialized = False
+        # 整帧缓存：短时间内的多次裁剪截图复用同一帧，输入操作后自动失效
+        self._frame_lock = threading.Lock()
+        self._frame = None  # (截图结果, 截图时间, 截图参数)
+        self.frame_generation = 0
+        # 模板预期区域：优先在预期区域内匹配，未命中时再搜索整张截图
+        self._expected_regions = {}  # {目标图像路径: (x, y, w, h)}，相对于整个客户区的比例
+        self._learned_regions = OrderedDict()  # {(目标图像路径, screenshot_pos): [x, y, 连续命中次数, 使用次数]}，截图像素坐标，按最近使用排序
+        self.screenshot_crop = (0, 0, 1, 1)
+        # OCR 结果的倒排索引，OCR 结果更新后按需重建
+        self._ocr_index = None
+        self._ocr_index_source = None
+        # OCR 预检跳过识别的次数
+        self.ocr_skip_count = 0
+        self.ocr_request_count = 0
+        # YOLO 检测缓存：同一帧、同一区域、同一模型和输入尺寸只推理一次，各类别的查询共用结果
+        self._yolo_results = {}  # {(frame_generation, screenshot_crop, model_path, input_size): (原始检测张量, 缩放比例)}
+        self._screenshot_edited = False  # 截图被 fill_crop_with_color 等修改过，与同一帧的缓存结果不再对应
+        self._yolo_class_ids = {}  # {(names, target_classes): 类别编号数组}
 
     def _init_input(self):
         """
         初始化输入处理器，将输入操作如点击、移动等绑定至实例变量。
+        输入操作执行后会使整帧缓存失效，避免后续查找使用操作前的画面。
         """
         self.input_handler = get_game_controller().get_input_handler()
-        self.mouse_click = self.input_handler.mouse_click
-        self.mouse_down = self.input_handler.mouse_down
-        self.mouse_up = self.input_handler.mouse_up
-        self.mouse_move = self.input_handler.mouse_move
-        self.mouse_scroll = self.input_handler.mouse_scroll
-        self.press_key = self.input_handler.press_key
-        self.press_key_down = self.input_handler.press_key_down
-        self.press_key_up = self.input_handler.press_key_up
-        self.secretly_press_key = self.input_handler.secretly_press_key
-        self.press_mouse = self.input_handler.press_mouse
-        self.secretly_write = self.input_handler.secretly_write
+        self.mouse_click = self._invalidate_frame_after(self.input_handler.mouse_click)
+        self.mouse_down = self._invalidate_frame_after(self.input_handler.mouse_down)
+        self.mouse_up = self._invalidate_frame_after(self.input_handler.mouse_up)
+        self.mouse_move = self._invalidate_frame_after(self.input_handler.mouse_move)
+        self.mouse_scroll = self._invalidate_frame_after(self.input_handler.mouse_scroll)
+        self.press_key = self._invalidate_frame_after(self.input_handler.press_key)
+        self.press_key_down = self._invalidate_frame_after(self.input_handler.press_key_down)
+        self.press_key_up = self._invalidate_frame_after(self.input_handler.press_key_up)
+        self.secretly_press_key = self._invalidate_frame_after(self.input_handler.secretly_press_key)
+        self.press_mouse = self._invalidate_frame_after(self.input_handler.press_mouse)
+        self.secretly_write = self._invalidate_frame_after(self.input_handler.secretly_write)
+
+    def _invalidate_frame_after(self, func):
+        """包装输入操作，执行后使整帧缓存失效。"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.invalidate_frame_cache()
+        return wrapper
+
+    def invalidate_frame_cache(self):
+        """使整帧缓存失效，下一次截图将重新捕获画面。"""
+        with self._frame_lock:
+            self._frame = None
+
+    def _get_frame_cache_max_age(self):
+        """整帧缓存的最大有效时间（秒），为 0 时禁用缓存。"""
+        try:
+            return max(0.0, float(cfg.get_value('screenshot_frame_cache_max_age', 0.1) or 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _capture_frame(self, crop, use_background_screenshot, prefer_frame_screenshot):
+        """
+        获取指定区域的截图。缓存有效时直接从缓存帧中裁剪，否则捕获整个客户区并写入缓存。
+        截图来源可以只截取部分区域时（云游戏回退为浏览器截图），较小的区域直接截取，不写入缓存。
+        :return: 与 Screenshot.take_screenshot 相同的返回值。
+        """
+        max_age = self._get_frame_cache_max_age()
+        if max_age <= 0:
+            result = Screenshot.take_screenshot(
+                self.window_title,
+                crop=crop,
+                use_background_screenshot=use_background_screenshot,
+                prefer_frame_screenshot=prefer_frame_screenshot,
+            )
+            if result:
+                self.frame_generation += 1
+            return result
+
+        options = (use_background_screenshot, prefer_frame_screenshot)
+        with self._frame_lock:
+            frame = self._frame
+            if frame is not None:
+                frame_result, captured_at, frame_options = frame
+                if frame_options == options and time.monotonic() - captured_at <= max_age:
+                    return Screenshot.crop_frame(frame_result, crop)
+
+            if crop[2] * crop[3] <= FRAME_CACHE_BYPASS_CROP_AREA and Screenshot.prefers_region_capture():
+                result = Screenshot.take_screenshot(
+                    self.window_title,
+                    crop=crop,
+                    use_background_screenshot=use_background_screenshot,
+                    prefer_frame_screenshot=prefer_frame_screenshot,
+                )
+                if result:
+                    self.frame_generation += 1
+                return result
+
+            frame_result = Screenshot.take_screenshot(
+                self.window_title,
+                crop=(0, 0, 1, 1),
+                use_background_screenshot=use_background_screenshot,
+                prefer_frame_screenshot=prefer_frame_screenshot,
+            )
+            if not frame_result:
+                self._frame = None
+                return frame_result
+            self.frame_generation += 1
+            self._frame = (frame_result, time.monotonic(), options)
+            return Screenshot.crop_frame(frame_result, crop)
 
     def _is_debug_enabled(self):
         """检查调试模式是否启用。"""
@@ -159,23 +283,28 @@ class Automation(metaclass=SingletonMeta):
         :param crop: 截图的裁剪区域，格式为(x1, y1, x2, y2)，默认为全屏。
         :return: 成功时返回截图及其位置和缩放因子，失败时抛出异常。
         """
+        result = self._capture_with_retry(crop, use_background_screenshot, prefer_frame_screenshot)
+        self.screenshot, self.screenshot_pos, self.screenshot_scale_factor = result
+        self.screenshot_crop = tuple(crop)
+        self._screenshot_edited = False
+        # 调试模式：清除上一帧的矩形框，并显示裁剪区域
+        if self._is_debug_enabled():
+            self._ensure_debug_overlay()
+            self._debug_clear()
+            if crop != (0, 0, 1, 1):
+                self._debug_draw_crop_region(crop)
+        return result
+
+    def _capture_with_retry(self, crop, use_background_screenshot=None, prefer_frame_screenshot=True):
+        """
+        获取指定区域的截图，失败时每秒重试一次，超过 60 秒抛出异常。不更新 self.screenshot。
+        :return: 与 Screenshot.take_screenshot 相同的返回值。
+        """
         start_time = time.monotonic()
         while True:
             try:
-                result = Screenshot.take_screenshot(
-                    self.window_title,
-                    crop=crop,
-                    use_background_screenshot=use_background_screenshot,
-                    prefer_frame_screenshot=prefer_frame_screenshot,
-                )
+                result = self._capture_frame(crop, use_background_screenshot, prefer_frame_screenshot)
                 if result:
-                    self.screenshot, self.screenshot_pos, self.screenshot_scale_factor = result
-                    # 调试模式：清除上一帧的矩形框，并显示裁剪区域
-                    if self._is_debug_enabled():
-                        self._ensure_debug_overlay()
-                        self._debug_clear()
-                        if crop != (0, 0, 1, 1):
-                            self._debug_draw_crop_region(crop)
                     return result
                 else:
                     self.logger.error("截图失败：没有找到游戏窗口")
@@ -185,6 +314,83 @@ class Automation(metaclass=SingletonMeta):
             if time.monotonic() - start_time > 60:
                 raise RuntimeError("截图超时")
 
+    def _region_signature(self, crop):
+        """
+        重新截取指定区域，返回缩小后的灰度图，用于快速判断画面是否变化。
+        截图不写入 self.screenshot，调用方之前取得的截图和坐标（screenshot_pos 等）保持不变。
+        """
+        self.invalidate_frame_cache()
+        screenshot, _, _ = self._capture_with_retry(crop)
+        return cv2.resize(screenshot.gray, (64, 36), interpolation=cv2.INTER_AREA)
+
+    def get_region_signature(self, crop=(0, 0, 1, 1)):
+        """
+        获取指定区域当前画面的缩略图，在点击等操作之前调用，作为 wait_for_change 的 reference 参数，
+        避免操作后画面在第一次截图之前就已经变化而等到超时。
+        :param crop: 检测区域，应与之后 wait_for_change 的 crop 相同。
+        """
+        return self._region_signature(crop)
+
+    @staticmethod
+    def _signature_diff(a, b):
+        """两张缩略灰度图的平均差异，范围 0~1。"""
+        return float(np.mean(cv2.absdiff(a, b))) / 255
+
+    def wait_for_change(self, crop=(0, 0, 1, 1), timeout=2.0, threshold=0.02, interval=0.1, reference=None):
+        """
+        等待指定区域的画面发生变化，画面差异超过阈值后立即返回。
+        :param crop: 检测区域。
+        :param timeout: 最长等待时间（秒），通常为原来的固定等待时间。
+        :param threshold: 判定为变化的平均差异（0~1）。
+        :param interval: 两次截图之间的间隔（秒）。
+        :param reference: 操作前由 get_region_signature 取得的基准画面；为 None 时以调用时的画面为基准，
+                          操作后画面立即变化的情况会检测不到。
+        :return: 画面发生变化返回 True，超时返回 False。
+        """
+        start_time = time.monotonic()
+        # 传入操作前的基准画面时不等待，先检查一次，画面可能已经变化
+        delay = interval
+        if reference is None:
+            reference = self._region_signature(crop)
+        else:
+            delay = 0
+        while time.monotonic() - start_time < timeout:
+            time.sleep(delay)
+            delay = interval
+            diff = self._signature_diff(reference, self._region_signature(crop))
+            if diff > threshold:
+                self.logger.debug(f"画面已变化，差异：{diff:.4f} 耗时：{time.monotonic() - start_time:.2f} 秒")
+                return True
+        self.logger.debug(f"等待画面变化超时：{timeout} 秒")
+        return False
+
+    def wait_for_stable(self, crop=(0, 0, 1, 1), timeout=2.0, frames=3, tolerance=0.005, interval=0.1):
+        """
+        等待指定区域的画面稳定（动画结束、界面加载完成）。连续 frames 帧之间的差异都不超过容差时立即返回。
+        :param crop: 检测区域。
+        :param timeout: 最长等待时间（秒），通常为原来的固定等待时间。
+        :param frames: 需要连续保持不变的帧数。
+        :param tolerance: 判定为不变的平均差异（0~1）。
+        :param interval: 两次截图之间的间隔（秒）。
+        :return: 画面稳定返回 True，超时返回 False。
+        """
+        start_time = time.monotonic()
+        previous = self._region_signature(crop)
+        stable_frames = 1
+        while time.monotonic() - start_time < timeout:
+            time.sleep(interval)
+            current = self._region_signature(crop)
+            if self._signature_diff(previous, current) <= tolerance:
+                stable_frames += 1
+                if stable_frames >= frames:
+                    self.logger.debug(f"画面已稳定，耗时：{time.monotonic() - start_time:.2f} 秒")
+                    return True
+            else:
+                stable_frames = 1
+            previous = current
+        self.logger.debug(f"等待画面稳定超时：{timeout} 秒")
+        return False
+
     def calculate_positions(self, template, max_loc, relative):
         """
         计算匹配位置。
@@ -204,6 +410,122 @@ class Automation(metaclass=SingletonMeta):
         bottom_right = (top_left[0] + int(width / scale_factor), top_left[1] + int(height / scale_factor))
         return top_left, bottom_right
 
+    def _load_template(self, target, cacheable=True, key='template'):
+        """
+        读取模板图片及其掩码，可缓存。优先从预解码模板包中读取。
+        :param target: 目标图像路径。
+        :param key: 模板类型，'template' 为彩色图，'gray' 为灰度图。
+        :return: (template, mask)。
+        """
+        if cacheable and target in self.img_cache:
+            entry = self.img_cache[target]
+        else:
+            entry = self.template_store.get(target)
+            if entry is None:
+                raise ValueError(f"读取图片失败：{target}")
+            if cacheable:
+                self.img_cache[target] = entry
+        return entry[key], entry['mask']
+
+    @staticmethod
+    def _is_image_matched(match_val, threshold, mask):
+        """判断匹配值是否满足阈值。无mask匹配相似度越高越好，有mask匹配则是越低越好。"""
+        if match_val is None or math.isinf(match_val):
+            return False
+        if threshold is None:
+            return True
+        if mask is not None:
+            return match_val <= threshold
+        return match_val >= threshold
+
+    def _is_region_match_enabled(self):
+        """检查是否启用模板预期区域匹配。"""
+        return bool(cfg.get_value('image_match_region_enable', True))
+
+    def set_expected_region(self, target, region):
+        """
+        声明模板图片的预期出现区域，查找时优先在该区域内匹配。
+        :param target: 目标图像路径。
+        :param region: (x, y, w, h)，相对于整个客户区的比例；为 None 时取消声明。
+        """
+        if region is None:
+            self._expected_regions.pop(target, None)
+        else:
+            self._expected_regions[target] = tuple(region)
+
+    def get_expected_region(self, target):
+        """
+        获取模板图片声明的预期出现区域。
+        :param target: 目标图像路径。
+        :return: (x, y, w, h)，相对于整个客户区的比例；未声明时返回 None。
+        """
+        return self._expected_regions.get(target)
+
+    def _get_search_region(self, target, template, threshold, scale_range):
+        """
+        获取模板在当前截图中的预期搜索区域（截图像素坐标）。没有阈值或需要缩放匹配时不限制区域。
+        优先使用记录的匹配位置，其次使用声明的预期区域。记录的位置只有连续多次在同一位置匹配成功后才使用，
+        并且每隔 LEARNED_REGION_VERIFY_INTERVAL 次改为搜索整张截图，确认该位置仍是最佳匹配。
+        :return: (x0, y0, x1, y1) 或 None。
+        """
+        if threshold is None or scale_range or not self._is_region_match_enabled():
+            return None
+        width, height = self.screenshot.size
+        template_h, template_w = template.shape[:2]
+
+        region = None
+        key = (target, tuple(self.screenshot_pos))
+        learned = self._learned_regions.get(key)
+        if learned is not None and learned[2] >= LEARNED_REGION_MIN_HITS:
+            self._learned_regions.move_to_end(key)
+            learned[3] += 1
+            if learned[3] % LEARNED_REGION_VERIFY_INTERVAL == 0:
+                return None
+            x, y = learned[0], learned[1]
+            margin_x = max(16, template_w // 2)
+            margin_y = max(16, template_h // 2)
+            region = (
+                max(0, x - margin_x),
+                max(0, y - margin_y),
+                min(width, x + template_w + margin_x),
+                min(height, y + template_h + margin_y),
+            )
+        elif target in self._expected_regions:
+            crop_x, crop_y, crop_w, crop_h = self.screenshot_crop
+            x, y, w, h = self._expected_regions[target]
+            region = (
+                max(0, int((x - crop_x) / crop_w * width)),
+                max(0, int((y - crop_y) / crop_h * height)),
+                min(width, int((x + w - crop_x) / crop_w * width)),
+                min(height, int((y + h - crop_y) / crop_h * height)),
+            )
+        if region is None:
+            return None
+
+        x0, y0, x1, y1 = region
+        if x1 - x0 < template_w or y1 - y0 < template_h or (x1 - x0 >= width and y1 - y0 >= height):
+            return None
+        return region
+
+    def _learn_region(self, target, match_loc):
+        """
+        记录模板匹配成功的位置。与上次位置相同时累计命中次数，位置变化时重新计数，
+        命中次数达到 LEARNED_REGION_MIN_HITS 后下次查找时优先搜索该位置附近。
+        """
+        if not self._is_region_match_enabled():
+            return
+        x, y = int(match_loc[0]), int(match_loc[1])
+        key = (target, tuple(self.screenshot_pos))
+        learned = self._learned_regions.get(key)
+        if learned is not None and abs(learned[0] - x) <= LEARNED_REGION_TOLERANCE and abs(learned[1] - y) <= LEARNED_REGION_TOLERANCE:
+            learned[0], learned[1] = x, y
+            learned[2] += 1
+        else:
+            self._learned_regions[key] = [x, y, 1, 0]
+        self._learned_regions.move_to_end(key)
+        while len(self._learned_regions) > LEARNED_REGION_CACHE_SIZE:
+            self._learned_regions.popitem(last=False)
+
     def find_image_element(self, target, threshold, scale_range, relative=False, cacheable=True):
         """
         查找图像元素。
@@ -214,21 +536,15 @@ class Automation(metaclass=SingletonMeta):
         :return: 最佳匹配位置和相似度。
         """
         try:
-            if cacheable and target in self.img_cache:
-                mask = self.img_cache[target]['mask']
-                template = self.img_cache[target]['template']
-            else:
-                mask = ImageUtils.read_template_with_mask(target)  # 读取模板图片掩码
-                template = ImageUtils.read_image(target)  # 读取模板图片
-                if template is None:
-                    raise ValueError(f"读取图片失败：{target}")
-                if cacheable:
-                    self.img_cache[target] = {'mask': mask, 'template': template}
-            screenshot = cv2.cvtColor(np.array(self.screenshot), cv2.COLOR_BGR2RGB)  # 将截图转换为RGB
-            if mask is not None:
+            template, mask = self._load_template(target, cacheable)
+            screenshot = self.screenshot.bgr  # 与模板相同的 BGR 格式，直接共用截图数据
+            region = self._get_search_region(target, template, threshold, scale_range)
+            matchVal, matchLoc = None, None
+            if region is not None:
+                # 先在预期区域内匹配，未命中再搜索整张截图
+                matchVal, matchLoc = ImageUtils.match_template_in_region(screenshot, template, threshold, scale_range, mask, region)
+            if not self._is_image_matched(matchVal, threshold, mask):
                 matchVal, matchLoc = ImageUtils.scale_and_match_template(screenshot, template, threshold, scale_range, mask)  # 执行缩放并匹配模板
-            else:
-                matchVal, matchLoc = ImageUtils.scale_and_match_template(screenshot, template, threshold, scale_range)  # 执行缩放并匹配模板
 
             # 这里的相似度文本说明有问题，对于无mask匹配相似度越高越好。有mask匹配则是越低越好
             self.logger.debug(f"目标图片：{target.replace('./assets/images/', '')} 相似度：{matchVal:.2f} 匹配阈值：{threshold}")
@@ -247,18 +563,102 @@ class Automation(metaclass=SingletonMeta):
             # cv2.waitKey(0)
             # cv2.destroyAllWindows()
 
-            if mask is not None:
-                if not math.isinf(matchVal) and (threshold is None or matchVal <= threshold):
-                    top_left, bottom_right = self.calculate_positions(template, matchLoc, relative)
-                    return top_left, bottom_right, matchVal
-            else:
-                if not math.isinf(matchVal) and (threshold is None or matchVal >= threshold):
-                    top_left, bottom_right = self.calculate_positions(template, matchLoc, relative)
-                    return top_left, bottom_right, matchVal
+            if self._is_image_matched(matchVal, threshold, mask):
+                self._learn_region(target, matchLoc)
+                top_left, bottom_right = self.calculate_positions(template, matchLoc, relative)
+                return top_left, bottom_right, matchVal
         except Exception as e:
             self.logger.error(f"寻找图片出错：{e}")
         return None, None, None
 
+    def match_many(self, targets, threshold=None, scale_range=None, crop=(0, 0, 1, 1), take_screenshot=True, relative=False, region_only=False):
+        """
+        在同一帧截图上批量匹配多个模板图片，截图只转换一次颜色空间，匹配在固定大小的线程池中执行。
+        :param targets: 目标图像路径列表。
+        :param threshold: 相似度阈值，可以是数值，也可以是 {目标图像路径: 阈值} 字典。
+        :param scale_range: 缩放范围。
+        :param crop: 截图的裁剪区域。
+        :param take_screenshot: 是否需要先截图。
+        :param relative: 是否返回相对位置。
+        :param region_only: 为 True 时有预期区域的模板只在区域内匹配，未命中也不再搜索整张截图。
+        :return: {目标图像路径: (top_left, bottom_right, 匹配值)}，未达到阈值时坐标为 None，读取或匹配出错时均为 None。
+        """
+        targets = list(dict.fromkeys(targets))
+        results = {target: (None, None, None) for target in targets}
+        if not targets:
+            return results
+        if take_screenshot:
+            self.take_screenshot(crop)
+
+        loaded = []
+        for target in targets:
+            try:
+                template, mask = self._load_template(target)
+            except Exception as e:
+                self.logger.error(f"寻找图片出错：{e}")
+                continue
+            target_threshold = threshold.get(target) if isinstance(threshold, dict) else threshold
+            loaded.append((target, template, mask, target_threshold))
+        if not loaded:
+            return results
+
+        try:
+            screenshot = self.screenshot.bgr  # 所有模板共用同一份截图数据
+            regions = [self._get_search_region(target, template, target_threshold, scale_range) for target, template, _, target_threshold in loaded]
+            # 先在预期区域内匹配，未命中或没有预期区域的模板再搜索整张截图
+            matches = [(None, None)] * len(loaded)
+            region_indexes = [i for i, region in enumerate(regions) if region is not None]
+            if region_indexes:
+                region_matches = ImageUtils.match_many(
+                    screenshot,
+                    [(loaded[i][1], loaded[i][3], scale_range, loaded[i][2], regions[i]) for i in region_indexes],
+                )
+                for i, match in zip(region_indexes, region_matches):
+                    matches[i] = match
+            full_indexes = [i for i, (_, _, mask, target_threshold) in enumerate(loaded)
+                            if not (region_only and regions[i] is not None)
+                            and not self._is_image_matched(matches[i][0], target_threshold, mask)]
+            if full_indexes:
+                full_matches = ImageUtils.match_many(
+                    screenshot,
+                    [(loaded[i][1], loaded[i][3], scale_range, loaded[i][2], None) for i in full_indexes],
+                )
+                for i, match in zip(full_indexes, full_matches):
+                    matches[i] = match
+        except Exception as e:
+            self.logger.error(f"批量寻找图片出错：{e}")
+            return results
+
+        for (target, template, mask, target_threshold), (match_val, match_loc) in zip(loaded, matches):
+            if match_val is None:
+                continue
+            self.logger.debug(f"目标图片：{target.replace('./assets/images/', '')} 相似度：{match_val:.2f} 匹配阈值：{target_threshold}")
+            if self._is_image_matched(match_val, target_threshold, mask):
+                self._learn_region(target, match_loc)
+                top_left, bottom_right = self.calculate_positions(template, match_loc, relative)
+                results[target] = (top_left, bottom_right, match_val)
+                if self._is_debug_enabled():
+                    self._debug_draw_rect(top_left, bottom_right, color=self._get_debug_color('image'),
+                                          label=f'image: {target}')
+            else:
+                results[target] = (None, None, match_val)
+        return results
+
+    def find_any(self, targets, threshold=None, scale_range=None, crop=(0, 0, 1, 1), take_screenshot=True, relative=False):
+        """
+        在同一帧截图上查找多个模板图片，返回按 targets 顺序第一个匹配成功的位置。
+        匹配到的图片路径保存在 self.matched_image 中。
+        :param targets: 目标图像路径列表。
+        :return: (top_left, bottom_right)，都未找到时返回 None。
+        """
+        self.matched_image = None
+        results = self.match_many(targets, threshold, scale_range, crop, take_screenshot, relative)
+        for target, (top_left, bottom_right, _) in results.items():
+            if top_left and bottom_right:
+                self.matched_image = target
+                return top_left, bottom_right
+        return None
+
     def generate_black_white_map(self, pixel_bgr):
         """生成黑白图，标记与目标像素相似的区域。
 
@@ -268,7 +668,7 @@ class Automation(metaclass=SingletonMeta):
         返回:
         - 黑白图数组。
         """
-        screenshot = cv2.cvtColor(np.array(self.screenshot), cv2.COLOR_BGR2RGB)
+        screenshot = self.screenshot.bgr
         bw_map = np.zeros(screenshot.shape[:2], dtype=np.uint8)
         bw_map[np.sum((screenshot - pixel_bgr) ** 2, axis=-1) <= 800] = 255
         return bw_map
@@ -285,9 +685,7 @@ class Automation(metaclass=SingletonMeta):
         - 匹配的数量，或在出错时返回 None。
         """
         try:
-            template = ImageUtils.read_image(target, cv2.IMREAD_GRAYSCALE)
-            if template is None:
-                raise ValueError(f"读取图片失败：{target}")
+            template, _ = self._load_template(target, key='gray')
             bw_map = self.generate_black_white_map(pixel_bgr)
             cnt = ImageUtils.count_template_matches(bw_map, template, threshold)
             self.logger.debug(f"目标图片：{target.replace('./assets/images/', '')} 匹配数量：{cnt} 匹配阈值：{threshold} 目标像素BGR：{pixel_bgr}")
@@ -298,10 +696,8 @@ class Automation(metaclass=SingletonMeta):
 
     def find_image_with_multiple_targets(self, target, threshold, scale_range, relative=False):
         try:
-            template = ImageUtils.read_image(target, cv2.IMREAD_GRAYSCALE)
-            if template is None:
-                raise ValueError(f"读取图片失败：{target}")
-            screenshot = cv2.cvtColor(np.array(self.screenshot), cv2.COLOR_BGR2GRAY)
+            template, _ = self._load_template(target, key='gray')
+            screenshot = self.screenshot.gray
             matches = ImageUtils.scale_and_match_template_with_multiple_targets(screenshot, template, threshold, scale_range)
             if len(matches) == 0:
                 return []
@@ -352,6 +748,13 @@ class Automation(metaclass=SingletonMeta):
         else:
             return (text in targets, text if text in targets else None)
 
+    def _get_ocr_index(self):
+        """返回当前OCR结果的倒排索引，OCR结果更新后重新构建。"""
+        if self._ocr_index is None or self._ocr_index_source is not self.ocr_result:
+            self._ocr_index = OCRTextIndex(self.ocr_result)
+            self._ocr_index_source = self.ocr_result
+        return self._ocr_index
+
     def search_text_in_ocr_results(self, targets, include, relative):
         """
         在OCR结果中搜索目标文本。
@@ -360,23 +763,41 @@ class Automation(metaclass=SingletonMeta):
         :param relative: 是否返回相对位置。
         :return: 如果找到，返回文本的位置坐标。
         """
-        for target in targets:
-            for box, (text, confidence) in self.ocr_result:
-                if include:
-                    match = target in text
-                else:
-                    match = text == target
-                if match:
-                    self.matched_text = target
-                    self.logger.debug(f"目标文字：{target} 相似度：{confidence:.2f}")
-                    return self.calculate_text_position(box, relative)
+        target, line = self._get_ocr_index().find_first(targets, include)
+        if target is not None:
+            box, (text, confidence) = self.ocr_result[line]
+            self.matched_text = target
+            self.logger.debug(f"目标文字：{target} 相似度：{confidence:.2f}")
+            return self.calculate_text_position(box, relative)
         self.logger.debug(f"目标文字：{', '.join(targets)} 未找到匹配文字")
         return None, None
 
-    def perform_ocr(self):
-        """执行OCR识别，并更新OCR结果列表。如果未识别到文字，保留ocr_result为一个空列表。"""
+    def _ocr_region_is_empty(self, min_edge_pixels):
+        """
+        OCR 前的快速检查：区域内几乎没有边缘时不可能有文字。
+        像素与之前识别过的区域完全相同时由 OCR 结果缓存直接返回，这里不再另外记录识别结果。
+        :param min_edge_pixels: 边缘像素少于此值时视为没有文字。为None时使用配置值，为0时不检查。
+        """
+        if min_edge_pixels is None:
+            min_edge_pixels = cfg.get_value('ocr_prefilter_min_edge_pixels', OCR_PREFILTER_MIN_EDGE_PIXELS)
+        if min_edge_pixels <= 0:
+            return False
+        return cv2.countNonZero(cv2.Canny(self.screenshot.gray, *OCR_PREFILTER_CANNY_THRESHOLDS)) < min_edge_pixels
+
+    def perform_ocr(self, prefilter=True, min_edge_pixels=None):
+        """
+        执行OCR识别，并更新OCR结果列表。如果未识别到文字，保留ocr_result为一个空列表。
+        :param prefilter: 是否在识别前做快速检查，区域内没有文字时不调用OCR。
+        :param min_edge_pixels: 边缘像素少于此值时视为没有文字。为None时使用配置值，为0时不检查。
+        """
+        self.ocr_request_count += 1
+        if prefilter and cfg.get_value('ocr_prefilter_enable', True) and self._ocr_region_is_empty(min_edge_pixels):
+            self.ocr_result = []
+            self.ocr_skip_count += 1
+            self.logger.debug(f"区域内没有文字，跳过OCR（已跳过 {self.ocr_skip_count}/{self.ocr_request_count} 次）")
+            return
         try:
-            self.ocr_result = ocr.recognize_multi_lines(np.array(self.screenshot))
+            self.ocr_result = ocr.recognize_multi_lines(self.screenshot.rgb)
             if not self.ocr_result:
                 self.logger.debug(f"未识别出任何文字")
                 self.ocr_result = []
@@ -384,21 +805,55 @@ class Automation(metaclass=SingletonMeta):
             self.logger.error(f"OCR识别失败：{e}")
             self.ocr_result = []  # 确保在异常情况下，ocr_result为列表类型
 
-    def find_text_element(self, target, include, need_ocr=True, relative=False):
+    def find_text_element(self, target, include, need_ocr=True, relative=False, ocr_prefilter=True):
         """
         查找文本元素。
         :param target: 目标文本或包含目标文本的元组。
         :param include: 如果为True，寻找包含目标字符串的文本；如果为False，寻找与目标字符串精确匹配的文本。
         :param need_ocr: 是否需要执行OCR识别来识别屏幕上的文本。
         :param relative: 如果为True，返回相对于截图的位置；如果为False，返回绝对位置。
+        :param ocr_prefilter: 是否在OCR前做快速检查，详见 perform_ocr。
         :return: 文本的位置坐标，如果找到的话。
         """
         target_texts = [target] if isinstance(target, str) else list(target)  # 确保目标文本是列表格式
         if need_ocr:
-            self.perform_ocr()  # 执行OCR识别
+            self.perform_ocr(ocr_prefilter)  # 执行OCR识别
 
         return self.search_text_in_ocr_results(target_texts, include, relative)
 
+    def recognize_regions(self, crops, take_screenshot=True, relative=False):
+        """
+        在同一帧截图上批量识别多个区域的文字，只运行一次OCR。
+        :param crops: 区域列表，每项格式与 take_screenshot 的 crop 参数相同，相对于整个窗口。
+        :param take_screenshot: 是否需要先截取整个窗口。
+        :param relative: 是否返回相对位置。
+        :return: {crop: [((top_left, bottom_right), (text, score)), ...]}，坐标已通过 calculate_text_position 转换。
+        """
+        crops = [tuple(crop) for crop in crops]
+        if not crops:
+            return {}
+        if take_screenshot:
+            self.take_screenshot()
+
+        width, height = self.screenshot.size
+        crop_x, crop_y, crop_w, crop_h = self.screenshot_crop
+        regions = [(
+            int((x - crop_x) / crop_w * width),
+            int((y - crop_y) / crop_h * height),
+            int((x + w - crop_x) / crop_w * width),
+            int((y + h - crop_y) / crop_h * height),
+        ) for x, y, w, h in crops]
+
+        results = {}
+        try:
+            region_results = ocr.recognize_regions(self.screenshot, regions)
+        except Exception as e:
+            self.logger.error(f"批量OCR识别失败：{e}")
+            region_results = [[] for _ in crops]
+        for crop, items in zip(crops, region_results):
+            results[crop] = [(self.calculate_text_position(box, relative), text) for box, text in items]
+        return results
+
     def calculate_text_position2(self, pos):
         """计算文本的位置坐标。"""
         top_left = (int(pos[0][0] / self.screenshot_scale_factor) + self.screenshot_pos[0],
@@ -434,7 +889,8 @@ class Automation(metaclass=SingletonMeta):
         target_texts = [target] if isinstance(target, str) else list(target)  # 确保目标文本是列表格式
         min_distance = float('inf')
         target_pos = None
-        for box in self.ocr_result:
+        for i in self._get_ocr_index().find_any(target_texts, include):
+            box = self.ocr_result[i]
             text, _ = box[1]
             match, matched_text = self.is_text_match(text, target_texts, include)
             if match:
@@ -454,7 +910,8 @@ class Automation(metaclass=SingletonMeta):
     def find_source_position(self, source, source_type, include):
         """根据源类型查找源位置。"""
         if source_type == 'text':
-            for box in self.ocr_result:
+            for i in self._get_ocr_index().find(source, include):
+                box = self.ocr_result[i]
                 text, confidence = box[1]
                 match, matched_text = self.is_text_match(text, [source], include)
                 if match:
@@ -465,7 +922,7 @@ class Automation(metaclass=SingletonMeta):
             return top_left
         return None
 
-    def find_min_distance_text_element(self, target, source, source_type, include, need_ocr=True, position='bottom_right'):
+    def find_min_distance_text_element(self, target, source, source_type, include, need_ocr=True, position='bottom_right', ocr_prefilter=True):
         """
         查找距离特定源最近的文本元素。
         :param target: 目标文本或包含目标文本的元组。
@@ -474,10 +931,11 @@ class Automation(metaclass=SingletonMeta):
         :param include: 是否包含目标字符串。
         :param need_ocr: 是否需要执行OCR识别。
         :param position: 查找方位，'top_left', 'top_right', 'bottom_left', 或 'bottom_right'。
+        :param ocr_prefilter: 是否在OCR前做快速检查，详见 perform_ocr。
         :return: 最近的文本位置。
         """
         if need_ocr:
-            self.perform_ocr()  # 执行OCR识别
+            self.perform_ocr(ocr_prefilter)  # 执行OCR识别
 
         source_pos = self.find_source_position(source, source_type, include)
 
@@ -511,10 +969,7 @@ class Automation(metaclass=SingletonMeta):
         :return: (top_left, bottom_right) 或 (None, None)。
         """
         lower, upper = target
-        img = np.array(self.screenshot)
-        img_bgr = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-        hsv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
-        mask = cv2.inRange(hsv, lower, upper)
+        mask = cv2.inRange(self.screenshot.hsv, lower, upper)
 
         kernel = np.ones((5, 5), np.uint8)
         mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
@@ -542,17 +997,16 @@ class Automation(metaclass=SingletonMeta):
         return top_left, bottom_right
 
     def _get_yolo_session(self, model_path):
-        """获取或创建YOLO ONNX推理会话（带缓存）。"""
+        """获取或创建YOLO ONNX推理会话（带缓存），会话配置与 OCR 引擎共用。"""
         if not hasattr(self, '_yolo_sessions'):
             self._yolo_sessions = {}
         if model_path not in self._yolo_sessions:
-            import onnxruntime as ort
             # providers = ort.get_available_providers()
             preferred = []
             # if "DmlExecutionProvider" in providers:
             #     preferred.append("DmlExecutionProvider")
             preferred.append("CPUExecutionProvider")
-            self._yolo_sessions[model_path] = ort.InferenceSession(model_path, providers=preferred)
+            self._yolo_sessions[model_path] = OnnxSession(model_path, self.logger, providers=preferred)
         return self._yolo_sessions[model_path]
 
     def _normalize_yolo_input_size(self, input_size):
@@ -605,17 +1059,24 @@ class Automation(metaclass=SingletonMeta):
 
         return 640, 640
 
-    def _yolo_preprocess(self, img, input_size=640):
-        """YOLO letterbox预处理。返回 (input_tensor, scale)。"""
+    def _yolo_preprocess(self, img, input_size=640, out=None):
+        """
+        YOLO letterbox预处理。返回 (input_tensor, scale)。
+        :param out: 形状为 (1, 3, input_h, input_w) 的 float32 缓冲区，提供时直接写入并返回该缓冲区，不再分配画布和中间数组。
+        """
         input_w, input_h = self._normalize_yolo_input_size(input_size)
         orig_h, orig_w = img.shape[:2]
         scale = min(input_w / orig_w, input_h / orig_h)
         new_w, new_h = int(orig_w * scale), int(orig_h * scale)
         resized = cv2.resize(img, (new_w, new_h))
-        canvas = np.full((input_h, input_w, 3), 114, dtype=np.uint8)
-        canvas[:new_h, :new_w] = resized
-        input_img = canvas[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
-        return np.expand_dims(input_img, axis=0), scale
+        if out is None:
+            out = np.empty((1, 3, input_h, input_w), dtype=np.float32)
+        # 填充区域为灰色 (114, 114, 114)，图片区域按 BGR -> RGB 逐通道归一化写入
+        out[0, :, new_h:, :] = 114 / 255.0
+        out[0, :, :new_h, new_w:] = 114 / 255.0
+        for channel in range(3):
+            np.multiply(resized[:, :, 2 - channel], 1 / 255.0, out=out[0, channel, :new_h, :new_w], casting='unsafe')
+        return out, scale
 
     def _get_yolo_target_config(self, target):
         """从target中提取YOLO推理配置。"""
@@ -629,22 +1090,75 @@ class Automation(metaclass=SingletonMeta):
 
         return model_path, names, target_class, input_size
 
-    def _yolo_postprocess(self, preds, scale, names, target_classes, threshold):
-        """YOLO后处理，返回按置信度降序排列的检测结果列表 [(cls_name, score, x1, y1, x2, y2), ...]。"""
-        results = []
-        for det in preds:
-            x1, y1, x2, y2, score, cls_id = det
-            if score < threshold:
-                continue
-            cls_id = int(cls_id)
-            if cls_id >= len(names):
-                continue
-            cls_name = names[cls_id]
-            if target_classes is not None and cls_name not in target_classes:
-                continue
-            results.append((cls_name, float(score), x1 / scale, y1 / scale, x2 / scale, y2 / scale))
-        results.sort(key=lambda r: r[1], reverse=True)
-        return results
+    def _get_yolo_class_ids(self, names, target_classes):
+        """目标类名对应的类别编号数组（带缓存），target_classes 为 None 时返回 None 表示不筛选。"""
+        if target_classes is None:
+            return None
+        key = (tuple(names), tuple(target_classes))
+        class_ids = self._yolo_class_ids.get(key)
+        if class_ids is None:
+            wanted = set(target_classes)
+            class_ids = np.array([i for i, name in enumerate(names) if name in wanted], dtype=np.int64)
+            self._yolo_class_ids[key] = class_ids
+        return class_ids
+
+    @staticmethod
+    def _is_raw_yolo_output(preds, num_classes=None):
+        """判断是否为未经NMS的原始输出 (4 + 类别数, 候选框数)，否则视为端到端输出 (N, 6)。"""
+        if preds.ndim != 2 or preds.shape[0] <= 4 or preds.shape[1] <= preds.shape[0]:
+            return False
+        return num_classes is None or preds.shape[0] == 4 + num_classes
+
+    def _yolo_decode(self, preds, num_classes=None, raw=None):
+        """
+        将模型输出统一解码为 (boxes, scores, cls_ids, raw)，boxes 为 (N, 4) 的 (x1, y1, x2, y2)，坐标为模型输入坐标。
+        支持端到端输出 (N, 6)，每行为 (x1, y1, x2, y2, score, cls_id)；以及未经NMS的原始输出 (4 + 类别数, 候选框数)，每列为 (cx, cy, w, h, 各类别得分)。
+        :param raw: 是否为原始输出，为None时根据形状判断。
+        """
+        preds = np.asarray(preds)
+        if raw is None:
+            raw = self._is_raw_yolo_output(preds, num_classes)
+        if raw:
+            preds = preds.T
+            class_scores = preds[:, 4:]
+            cls_ids = class_scores.argmax(axis=1)
+            scores = class_scores[np.arange(len(cls_ids)), cls_ids]
+            cx, cy, w, h = preds[:, 0], preds[:, 1], preds[:, 2], preds[:, 3]
+            boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        else:
+            preds = preds.reshape(-1, 6)
+            boxes = preds[:, :4]
+            scores = preds[:, 4]
+            cls_ids = preds[:, 5].astype(np.int64)
+        return boxes, scores, cls_ids, raw
+
+    def _yolo_postprocess(self, preds, scale, names, target_classes, threshold, nms=None, iou_threshold=YOLO_NMS_IOU_THRESHOLD, raw=None):
+        """
+        YOLO后处理，返回按置信度降序排列的检测结果列表 [(cls_name, score, x1, y1, x2, y2), ...]。
+        支持的输出格式见 _yolo_decode。
+        :param nms: 是否执行按类别的NMS，为None时只对原始输出执行。
+        :param iou_threshold: NMS的IoU阈值。
+        :param raw: 是否为原始输出，为None时根据形状判断。
+        """
+        boxes, scores, cls_ids, raw = self._yolo_decode(preds, len(names), raw)
+
+        mask = (scores >= threshold) & (cls_ids >= 0) & (cls_ids < len(names))
+        class_ids = self._get_yolo_class_ids(names, target_classes)
+        if class_ids is not None:
+            mask &= np.isin(cls_ids, class_ids)
+        boxes, scores, cls_ids = boxes[mask], scores[mask], cls_ids[mask]
+
+        if (raw if nms is None else nms) and len(scores) > 1:
+            xywh = np.concatenate([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]], axis=1)
+            keep = cv2.dnn.NMSBoxesBatched(xywh.tolist(), scores.tolist(), cls_ids.tolist(), threshold, iou_threshold)
+            keep = np.asarray(keep, dtype=np.int64).reshape(-1)
+            boxes, scores, cls_ids = boxes[keep], scores[keep], cls_ids[keep]
+
+        # 稳定排序，置信度相同时保持模型输出的顺序
+        order = np.argsort(-scores, kind='stable')
+        boxes = (boxes[order] / scale).tolist()
+        return [(names[cls_id], score, x1, y1, x2, y2)
+                for cls_id, score, (x1, y1, x2, y2) in zip(cls_ids[order].tolist(), scores[order].tolist(), boxes)]
 
     def _yolo_box_to_pos(self, x1, y1, x2, y2, relative):
         """将YOLO检测框坐标转换为与其他find方法一致的 (top_left, bottom_right) 格式。"""
@@ -655,30 +1169,140 @@ class Automation(metaclass=SingletonMeta):
         bottom_right = (int(x2 / scale_factor) + offset_x, int(y2 / scale_factor) + offset_y)
         return top_left, bottom_right
 
+    @staticmethod
+    def _yolo_tiles(region, tile_size, overlap=YOLO_TILE_OVERLAP):
+        """
+        将区域按模型输入尺寸划分为相互重叠的分块，分块在原分辨率下推理，不再缩小。
+        :param region: 像素区域 (x0, y0, x1, y1)。
+        :param tile_size: 分块尺寸 (width, height)。
+        :return: [(x0, y0, x1, y1), ...]
+        """
+        def spans(start, end, size):
+            length = end - start
+            if length <= size:
+                return [(start, end)]
+            count = math.ceil((length - size) / (size * (1 - overlap))) + 1
+            positions = [start + round((length - size) * i / (count - 1)) for i in range(count)]
+            return [(position, position + size) for position in positions]
+
+        x0, y0, x1, y1 = region
+        tile_w, tile_h = tile_size
+        return [(tx0, ty0, tx1, ty1) for ty0, ty1 in spans(y0, y1, tile_h) for tx0, tx1 in spans(x0, x1, tile_w)]
+
+    def _run_yolo_regions(self, session, input_size, rois, tile):
+        """
+        对截图中的多个区域分别推理，结果合并为截图像素坐标下的端到端格式 (N, 6)。
+        :param rois: 区域列表，每项为相对于当前截图的比例 (x, y, w, h)。
+        :param tile: 是否将区域划分为原分辨率的分块，否则每个区域缩放到模型输入尺寸推理一次。
+        """
+        img = self.screenshot.bgr
+        height, width = img.shape[:2]
+        input_w, input_h = input_size
+        buffer = session.input_buffer((1, 3, input_h, input_w))
+
+        regions = []
+        for x, y, w, h in rois:
+            region = (max(0, int(x * width)), max(0, int(y * height)), min(width, int((x + w) * width)), min(height, int((y + h) * height)))
+            if region[2] <= region[0] or region[3] <= region[1]:
+                continue
+            regions.extend((part, region) for part in (self._yolo_tiles(region, input_size) if tile else [region]))
+
+        parts, cut = [], []
+        for (x0, y0, x1, y1), bounds in regions:
+            input_tensor, scale = self._yolo_preprocess(img[y0:y1, x0:x1], input_size, out=buffer)
+            boxes, scores, cls_ids, _ = self._yolo_decode(session.run(input_tensor)[0][0])
+            keep = scores >= YOLO_TILE_MIN_SCORE
+            boxes = boxes[keep] / scale + np.array([x0, y0, x0, y0], dtype=np.float32)
+            parts.append(np.column_stack([boxes, scores[keep], cls_ids[keep]]).astype(np.float32))
+            # 贴着分块内部边缘的框可能只是目标的一部分
+            m = YOLO_TILE_EDGE_MARGIN
+            cut.append(((x0 > bounds[0]) & (boxes[:, 0] <= x0 + m)) | ((x1 < bounds[2]) & (boxes[:, 2] >= x1 - m))
+                       | ((y0 > bounds[1]) & (boxes[:, 1] <= y0 + m)) | ((y1 < bounds[3]) & (boxes[:, 3] >= y1 - m)))
+        self.logger.debug(f"YOLO分区域推理：{len(regions)} 个区域")
+        if not parts:
+            return np.zeros((0, 6), dtype=np.float32)
+        merged, cut = np.concatenate(parts), np.concatenate(cut)
+        return merged[~self._yolo_covered(merged, cut)]
+
+    @staticmethod
+    def _yolo_covered(dets, cut):
+        """
+        找出被分块边缘截断、且大部分面积落在另一个完整的同类框内的检测框，即目标在相邻分块中的残缺部分。
+        :param dets: (N, 6) 的检测结果。
+        :param cut: (N,) 的布尔数组，标记被分块边缘截断的框。
+        """
+        covered = np.zeros(len(dets), dtype=bool)
+        whole = np.flatnonzero(~cut)
+        for i in np.flatnonzero(cut):
+            others = whole[dets[whole, 5] == dets[i, 5]]
+            if not len(others):
+                continue
+            x1, y1, x2, y2 = dets[i, :4]
+            iw = np.clip(np.minimum(x2, dets[others, 2]) - np.maximum(x1, dets[others, 0]), 0, None)
+            ih = np.clip(np.minimum(y2, dets[others, 3]) - np.maximum(y1, dets[others, 1]), 0, None)
+            area = max((x2 - x1) * (y2 - y1), 1e-6)
+            covered[i] = (iw * ih / area).max() >= YOLO_TILE_COVER_RATIO
+        return covered
+
+    def detect_yolo(self, model_path, input_size=None, rois=None, tile=False):
+        """
+        对当前截图运行YOLO推理，返回未经筛选的原始检测结果。
+        同一帧、同一截图区域、同一模型和输入尺寸的推理结果会被缓存，按不同类别多次查询时只推理一次。
+        :param model_path: 模型路径。
+        :param input_size: 模型输入尺寸，动态模型时生效。
+        :param rois: 感兴趣区域列表，每项为相对于当前截图的比例 (x, y, w, h)。为None时对整张截图推理。
+        :param tile: 是否将感兴趣区域划分为与模型输入尺寸相同的原分辨率分块推理，小目标不会因整图缩小而丢失细节。
+        :return: (检测张量, 缩放比例)。检测张量的格式见 _yolo_decode，坐标除以缩放比例后为截图像素坐标。
+                 指定 rois 时各区域的结果已合并为截图像素坐标下的端到端格式，缩放比例为 1，跨分块的重复框需由后处理的NMS去除。
+        """
+        session = self._get_yolo_session(model_path)
+        input_size = self._resolve_yolo_input_size(session, input_size)
+        rois = tuple(tuple(roi) for roi in rois) if rois else None
+        key = (self.frame_generation, tuple(self.screenshot_crop), model_path, input_size, rois, bool(tile))
+        if not self._screenshot_edited and key in self._yolo_results:
+            self.logger.debug(f"复用同一帧的YOLO检测结果：{model_path}")
+            return self._yolo_results[key]
+
+        if rois:
+            result = (self._run_yolo_regions(session, input_size, rois, tile), 1.0)
+        else:
+            input_w, input_h = input_size
+            input_tensor, scale = self._yolo_preprocess(self.screenshot.bgr, input_size, out=session.input_buffer((1, 3, input_h, input_w)))
+            outputs = session.run(input_tensor)
+            result = (outputs[0][0], scale)
+
+        if not self._screenshot_edited:
+            # 只保留当前帧的结果
+            for stale in [k for k in self._yolo_results if k[0] != self.frame_generation]:
+                del self._yolo_results[stale]
+            self._yolo_results[key] = result
+        return result
+
+    def _find_yolo(self, target, threshold):
+        """使用YOLO模型查找目标，返回按置信度降序排列的检测结果列表。"""
+        model_path, names, target_class, input_size = self._get_yolo_target_config(target)
+        rois = target.get("rois")
+        preds, scale = self.detect_yolo(model_path, input_size, rois, target.get("tile", False))
+        # 多个区域或分块的结果可能在接缝处重复，默认执行NMS
+        nms = target.get("nms", True if rois else None)
+        results = self._yolo_postprocess(preds, scale, names, target_class, threshold,
+                                         nms, target.get("nms_iou", YOLO_NMS_IOU_THRESHOLD), raw=False if rois else None)
+        if not results:
+            target_desc = ', '.join(target_class) if target_class else 'any'
+            self.logger.debug(f"YOLO未检测到目标：{target_desc} 阈值：{threshold}")
+        return results
+
     def find_yolo_element(self, target, threshold=0.25, relative=False):
         """
         使用YOLO模型查找置信度最高的目标对象。
-        :param target: dict，包含 model_path（模型路径）, names（类别名列表）, target_class（目标类名，str或list，可选）, input_size（模型输入尺寸，可选，动态模型时生效）。
+        :param target: dict，包含 model_path（模型路径）, names（类别名列表）, target_class（目标类名，str或list，可选）, input_size（模型输入尺寸，可选，动态模型时生效）, rois（感兴趣区域列表，可选，每项为相对于截图的比例 (x, y, w, h)）, tile（是否将感兴趣区域分块后按原分辨率推理，可选）, nms（是否执行NMS，可选，默认只对未经NMS导出的模型或指定了 rois 时执行）, nms_iou（NMS的IoU阈值，可选）。
         :param threshold: 置信度阈值。
         :param relative: 是否返回相对位置。
         :return: (top_left, bottom_right) 或 (None, None)。
         """
         try:
-            model_path, names, target_class, input_size = self._get_yolo_target_config(target)
-
-            session = self._get_yolo_session(model_path)
-            img = cv2.cvtColor(np.array(self.screenshot), cv2.COLOR_RGB2BGR)
-            input_size = self._resolve_yolo_input_size(session, input_size)
-            input_tensor, scale = self._yolo_preprocess(img, input_size)
-
-            input_name = session.get_inputs()[0].name
-            outputs = session.run(None, {input_name: input_tensor})
-            preds = outputs[0][0]
-
-            results = self._yolo_postprocess(preds, scale, names, target_class, threshold)
+            results = self._find_yolo(target, threshold)
             if not results:
-                target_desc = ', '.join(target_class) if target_class else 'any'
-                self.logger.debug(f"YOLO未检测到目标：{target_desc} 阈值：{threshold}")
                 return None, None
 
             cls_name, score, x1, y1, x2, y2 = results[0]
@@ -691,28 +1315,13 @@ class Automation(metaclass=SingletonMeta):
     def find_yolo_with_multiple_targets(self, target, threshold=0.25, relative=False):
         """
         使用YOLO模型查找所有匹配的目标对象。
-        :param target: dict，包含 model_path（模型路径）, names（类别名列表）, target_class（目标类名，str或list，可选）, input_size（模型输入尺寸，可选，动态模型时生效）。
+        :param target: dict，包含 model_path（模型路径）, names（类别名列表）, target_class（目标类名，str或list，可选）, input_size（模型输入尺寸，可选，动态模型时生效）, rois（感兴趣区域列表，可选，每项为相对于截图的比例 (x, y, w, h)）, tile（是否将感兴趣区域分块后按原分辨率推理，可选）, nms（是否执行NMS，可选，默认只对未经NMS导出的模型或指定了 rois 时执行）, nms_iou（NMS的IoU阈值，可选）。
         :param threshold: 置信度阈值。
         :param relative: 是否返回相对位置。
         :return: [(top_left, bottom_right), ...] 列表。
         """
         try:
-            model_path, names, target_class, input_size = self._get_yolo_target_config(target)
-
-            session = self._get_yolo_session(model_path)
-            img = cv2.cvtColor(np.array(self.screenshot), cv2.COLOR_RGB2BGR)
-            input_size = self._resolve_yolo_input_size(session, input_size)
-            input_tensor, scale = self._yolo_preprocess(img, input_size)
-
-            input_name = session.get_inputs()[0].name
-            outputs = session.run(None, {input_name: input_tensor})
-            preds = outputs[0][0]
-
-            results = self._yolo_postprocess(preds, scale, names, target_class, threshold)
-            if not results:
-                target_desc = ', '.join(target_class) if target_class else 'any'
-                self.logger.debug(f"YOLO未检测到目标：{target_desc} 阈值：{threshold}")
-                return []
+            results = self._find_yolo(target, threshold)
 
             matches = []
             for cls_name, score, x1, y1, x2, y2 in results:
@@ -723,7 +1332,7 @@ class Automation(metaclass=SingletonMeta):
             self.logger.error(f"YOLO查找出错：{e}")
             return []
 
-    def find_element(self, target, find_type, threshold=None, max_retries=1, crop=(0, 0, 1, 1), take_screenshot=True, relative=False, scale_range=None, include=None, need_ocr=True, source=None, source_type=None, pixel_bgr=None, position="bottom_right", retry_delay: float = 1.0, use_background_screenshot=None, prefer_frame_screenshot=True):
+    def find_element(self, target, find_type, threshold=None, max_retries=1, crop=(0, 0, 1, 1), take_screenshot=True, relative=False, scale_range=None, include=None, need_ocr=True, source=None, source_type=None, pixel_bgr=None, position="bottom_right", retry_delay: float = 1.0, use_background_screenshot=None, prefer_frame_screenshot=True, ocr_prefilter=True):
         """
         查找元素，并根据指定的查找类型执行不同的查找策略。
         :param target: 查找目标，可以是图像路径或文字。
@@ -742,6 +1351,7 @@ class Automation(metaclass=SingletonMeta):
         :param position: 查找方位，'top_left', 'top_right', 'bottom_left', 或 'bottom_right'。
         :param retry_delay: 每次重试之间的等待时间（秒），默认1.0秒。
         :param use_background_screenshot: 是否使用后台截图。为None时沿用配置文件设置。
+        :param ocr_prefilter: 文字查找时是否在OCR前做快速检查，区域内没有文字时不调用OCR。
         :return: 查找到的元素位置，或者在图像计数查找时返回计数。
         """
         take_screenshot = take_screenshot and need_ocr
@@ -758,9 +1368,9 @@ class Automation(metaclass=SingletonMeta):
                 if find_type in ['image', 'image_threshold']:
                     top_left, bottom_right, image_threshold = self.find_image_element(target, threshold, scale_range, relative)
                 elif find_type == 'text':
-                    top_left, bottom_right = self.find_text_element(target, include, need_ocr, relative)
+                    top_left, bottom_right = self.find_text_element(target, include, need_ocr, relative, ocr_prefilter)
                 elif find_type == 'min_distance_text':
-                    top_left, bottom_right = self.find_min_distance_text_element(target, source, source_type, include, need_ocr, position)
+                    top_left, bottom_right = self.find_min_distance_text_element(target, source, source_type, include, need_ocr, position, ocr_prefilter)
                 elif find_type == 'crop':
                     scale_factor = self.screenshot_scale_factor if not relative else 1
                     offset_x = self.screenshot_pos[0] * (not relative)
@@ -854,7 +1464,7 @@ class Automation(metaclass=SingletonMeta):
 
         return True
 
-    def click_element(self, target, find_type, threshold=None, max_retries=1, crop=(0, 0, 1, 1), take_screenshot=True, relative=False, scale_range=None, include=None, need_ocr=True, source=None, source_type=None, pixel_bgr=None, position="bottom_right", offset=(0, 0), action="click", retry_delay: float = 1.0, use_background_screenshot=None, press_duration: float = 0.0, prefer_frame_screenshot=True):
+    def click_element(self, target, find_type, threshold=None, max_retries=1, crop=(0, 0, 1, 1), take_screenshot=True, relative=False, scale_range=None, include=None, need_ocr=True, source=None, source_type=None, pixel_bgr=None, position="bottom_right", offset=(0, 0), action="click", retry_delay: float = 1.0, use_background_screenshot=None, press_duration: float = 0.0, prefer_frame_screenshot=True, ocr_prefilter=True):
         """
         查找并点击屏幕上的元素。
 
@@ -869,12 +1479,12 @@ class Automation(metaclass=SingletonMeta):
         如果找到元素并点击成功，则返回True；否则返回False。
         """
         coordinates = self.find_element(target, find_type, threshold, max_retries, crop, take_screenshot, relative, scale_range, include,
-                                        need_ocr, source, source_type, pixel_bgr, position, retry_delay, use_background_screenshot, prefer_frame_screenshot)
+                                        need_ocr, source, source_type, pixel_bgr, position, retry_delay, use_background_screenshot, prefer_frame_screenshot, ocr_prefilter)
         if coordinates:
             return self.click_element_with_pos(coordinates, offset, action, press_duration=press_duration)
         return False
 
-    def get_single_line_text(self, crop=(0, 0, 1, 1), blacklist=None, max_retries=3, retry_delay=0.0):
+    def get_single_line_text(self, crop=(0, 0, 1, 1), blacklist=None, max_retries=3, retry_delay=0.0, line_only=False):
         """
         尝试多次获取屏幕截图中的单行文本。
 
@@ -883,13 +1493,15 @@ class Automation(metaclass=SingletonMeta):
         blacklist: 需要过滤掉的字符列表。
         max_retries: 尝试识别的最大次数。
         retry_delay: 每次重试之间的等待时间（秒），默认0.0秒。
+        line_only: 裁剪区域内只有一行文本时可设为True，跳过文字检测只运行识别模型，速度更快。
 
         返回:
         识别到的文本，如果多次尝试后仍未识别到，则返回None。
         """
+        recognize = ocr.recognize_line if line_only else ocr.recognize_single_line
         for i in range(max_retries):
             self.take_screenshot(crop)
-            ocr_result = ocr.recognize_single_line(np.array(self.screenshot), blacklist)
+            ocr_result = recognize(self.screenshot.rgb, blacklist)
             if ocr_result:
                 return ocr_result[0]
             if retry_delay > 0 and i < max_retries - 1:
@@ -939,7 +1551,7 @@ class Automation(metaclass=SingletonMeta):
         if take_screenshot:
             self.take_screenshot(crop)
 
-        img_np = np.array(self.screenshot)
+        img_np = self.screenshot.rgb
         if img_np.size == 0:
             self.logger.warning("截图为空，无法计算 RGB 占比")
             return False
@@ -972,11 +1584,11 @@ class Automation(metaclass=SingletonMeta):
         - use_background_screenshot: 是否使用后台截图。为None时沿用配置文件设置。
 
         返回:
-        - 处理后的截图对象（PIL Image）。
+        - 处理后的截图对象（Frame）。
         """
         self.take_screenshot((0, 0, 1, 1), use_background_screenshot)
 
-        img_np = np.array(self.screenshot).copy()
+        img_np = self.screenshot.rgb.copy()
         h, w = img_np.shape[:2]
 
         is_single_crop = (
@@ -1026,5 +1638,6 @@ class Automation(metaclass=SingletonMeta):
         if not has_valid_crop:
             self.logger.warning("未找到有效的 crop 区域，截图未修改")
 
-        self.screenshot = Image.fromarray(img_np)
+        self.screenshot = Frame.from_rgb(img_np)
+        self._screenshot_edited = True
         return self.screenshot
@@ -7,6 +7,7 @@ from .screenshot import Screenshot
 from utils.logger.logger import Logger
 from typing import Optional
 from utils.image_utils import ImageUtils
+from utils.template_store import TemplateStore
 from module.game import get_game_controller
 from module.ocr import ocr
 
@@ -26,6 +27,7 @@ class LauncherAutomation():
         self.screenshot = None
         self._init_input()
         self.img_cache = {}
+        self.template_store = TemplateStore(TemplateStore.DEFAULT_PACK_PATH, logger)
 
     def _init_input(self):
         """
@@ -84,6 +86,23 @@ class LauncherAutomation():
         bottom_right = (top_left[0] + int(width / scale_factor), top_left[1] + int(height / scale_factor))
         return top_left, bottom_right
 
+    def _load_template(self, target, cacheable=True, key='template'):
+        """
+        读取模板图片及其掩码，可缓存。优先从预解码模板包中读取。
+        :param target: 目标图像路径。
+        :param key: 模板类型，'template' 为彩色图，'gray' 为灰度图。
+        :return: (template, mask)。
+        """
+        if cacheable and target in self.img_cache:
+            entry = self.img_cache[target]
+        else:
+            entry = self.template_store.get(target)
+            if entry is None:
+                raise ValueError(f"读取图片失败：{target}")
+            if cacheable:
+                self.img_cache[target] = entry
+        return entry[key], entry['mask']
+
     def find_image_element(self, target, threshold, scale_range, relative=False, cacheable=True):
         """
         查找图像元素。
@@ -94,17 +113,8 @@ class LauncherAutomation():
         :return: 最佳匹配位置和相似度。
         """
         try:
-            if cacheable and target in self.img_cache:
-                mask = self.img_cache[target]['mask']
-                template = self.img_cache[target]['template']
-            else:
-                mask = ImageUtils.read_template_with_mask(target)  # 读取模板图片掩码
-                template = ImageUtils.read_image(target)  # 读取模板图片
-                if template is None:
-                    raise ValueError(f"读取图片失败：{target}")
-                if cacheable:
-                    self.img_cache[target] = {'mask': mask, 'template': template}
-            screenshot = cv2.cvtColor(np.array(self.screenshot), cv2.COLOR_BGR2RGB)  # 将截图转换为RGB
+            template, mask = self._load_template(target, cacheable)  # 读取模板图片及其掩码
+            screenshot = self.screenshot.bgr  # 与模板相同的 BGR 格式，直接共用截图数据
             if mask is not None:
                 matchVal, matchLoc = ImageUtils.scale_and_match_template(screenshot, template, threshold, scale_range, mask)  # 执行缩放并匹配模板
             else:
@@ -148,7 +158,7 @@ class LauncherAutomation():
         返回:
         - 黑白图数组。
         """
-        screenshot = cv2.cvtColor(np.array(self.screenshot), cv2.COLOR_BGR2RGB)
+        screenshot = self.screenshot.bgr
         bw_map = np.zeros(screenshot.shape[:2], dtype=np.uint8)
         bw_map[np.sum((screenshot - pixel_bgr) ** 2, axis=-1) <= 800] = 255
         return bw_map
@@ -165,9 +175,7 @@ class LauncherAutomation():
         - 匹配的数量，或在出错时返回 None。
         """
         try:
-            template = ImageUtils.read_image(target, cv2.IMREAD_GRAYSCALE)
-            if template is None:
-                raise ValueError(f"读取图片失败：{target}")
+            template, _ = self._load_template(target, key='gray')
             bw_map = self.generate_black_white_map(pixel_bgr)
             return ImageUtils.count_template_matches(bw_map, template, threshold)
         except Exception as e:
@@ -176,10 +184,8 @@ class LauncherAutomation():
 
     def find_image_with_multiple_targets(self, target, threshold, scale_range, relative=False):
         try:
-            template = ImageUtils.read_image(target, cv2.IMREAD_GRAYSCALE)
-            if template is None:
-                raise ValueError(f"读取图片失败：{target}")
-            screenshot = cv2.cvtColor(np.array(self.screenshot), cv2.COLOR_BGR2GRAY)
+            template, _ = self._load_template(target, key='gray')
+            screenshot = self.screenshot.gray
             matches = ImageUtils.scale_and_match_template_with_multiple_targets(screenshot, template, threshold, scale_range)
             if len(matches) == 0:
                 return []
@@ -250,7 +256,7 @@ class LauncherAutomation():
     def perform_ocr(self):
         """执行OCR识别，并更新OCR结果列表。如果未识别到文字，保留ocr_result为一个空列表。"""
         try:
-            self.ocr_result = ocr.recognize_multi_lines(np.array(self.screenshot))
+            self.ocr_result = ocr.recognize_multi_lines(self.screenshot.rgb)
             if not self.ocr_result:
                 self.logger.debug(f"未识别出任何文字")
                 self.ocr_result = []
@@ -483,7 +489,7 @@ class LauncherAutomation():
         """
         for i in range(max_retries):
             self.take_screenshot(crop)
-            ocr_result = ocr.recognize_single_line(np.array(self.screenshot), blacklist)
+            ocr_result = ocr.recognize_single_line(self.screenshot.rgb, blacklist)
             if ocr_result:
                 return ocr_result[0]
             if retry_delay > 0 and i < max_retries - 1:
@@ -1,14 +1,191 @@
-from io import BytesIO
-from PIL import Image
+import atexit
+import threading
+import numpy as np
 from module.config import cfg
+from utils.frame import Frame
+
+
+class CaptureSession:
+    """
+    长期保持的截图会话。
+
+    缓存窗口句柄和几何信息，每次截图只通过 GetWindowRect 检查窗口是否移动、缩放或关闭，变化时才重新计算；
+    mss 实例和后台截图使用的 DC、位图也会一直保留到窗口变化为止，每帧只需拷贝像素。
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._local = threading.local()  # mss 实例只能在创建它的线程中使用
+        self._mss_instances = []
+        self._windows = {}  # title -> window
+        self._geometry = {}  # hwnd -> (window_rect, real_resolution, region)
+        self._dc = None  # (hwnd, width, height, hwndDC, mfcDC, saveDC, bitmap)
+
+    def get_window(self, title):
+        """返回标题完全匹配的窗口，窗口仍然有效时直接使用缓存。"""
+        import win32gui
+        with self._lock:
+            window = self._windows.get(title)
+            if window is not None:
+                hwnd = window._hWnd
+                if win32gui.IsWindow(hwnd) and win32gui.GetWindowText(hwnd) == title:
+                    return window
+                self.invalidate(hwnd)
+                self._windows.pop(title, None)
+
+            import pyautogui
+            for window in pyautogui.getWindowsWithTitle(title):
+                if window.title == title:
+                    self._windows[title] = window
+                    return window
+        return False
+
+    def get_geometry(self, window):
+        """
+        返回窗口客户区的几何信息，窗口矩形不变时直接使用缓存。
+        :return: (real_resolution, region)，分别为客户区实际分辨率 (width, height) 和客户区屏幕区域 (left, top, width, height)。
+        """
+        import win32gui
+        hwnd = window._hWnd
+        window_rect = win32gui.GetWindowRect(hwnd)
+        with self._lock:
+            cached = self._geometry.get(hwnd)
+            if cached is not None and cached[0] == window_rect:
+                return cached[1], cached[2]
+
+            import pyautogui
+            left, top, right, bottom = window_rect
+            window_width, window_height = right - left, bottom - top
+            client_left, client_top, client_right, client_bottom = win32gui.GetClientRect(hwnd)
+            real_width, real_height = client_right - client_left, client_bottom - client_top
+            if (window_width, window_height) == tuple(pyautogui.size()):
+                region = (left, top, window_width, window_height)
+            else:
+                other_border = (window_width - real_width) // 2
+                up_border = window_height - real_height - other_border
+                region = (left + other_border, top + up_border, window_width - other_border - other_border, window_height - up_border - other_border)
+            self._geometry[hwnd] = (window_rect, (real_width, real_height), region)
+            if cached is not None:
+                self._release_dc()
+            return (real_width, real_height), region
+
+    def get_mss(self):
+        """返回当前线程的 mss 实例。"""
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            import mss
+            sct = mss.mss()
+            self._local.sct = sct
+            with self._lock:
+                self._mss_instances.append(sct)
+        return sct
+
+    def grab(self, monitor):
+        """使用复用的 mss 实例截取屏幕区域，返回 BGRA 数组。"""
+        screenshot = self.get_mss().grab(monitor)
+        return np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(screenshot.height, screenshot.width, 4)
+
+    def print_window(self, hwnd, width, height):
+        """
+        使用 PrintWindow 后台截取窗口，DC 与位图在窗口尺寸不变时复用。
+        :return: BGRX 数组，截图失败时返回 None。
+        """
+        import ctypes
+        import win32gui
+        import win32con
+        with self._lock:
+            dc = self._dc
+            if dc is None or dc[:3] != (hwnd, width, height):
+                dc = self._create_dc(hwnd, width, height)
+            saveDC, saveBitMap = dc[5], dc[6]
+
+            # 使用 PrintWindow 截取后台内容
+            win32gui.SendMessage(hwnd, win32con.WM_PAINT, 0, 0)  # 触发重绘
+            # 0	默认模式，抓取整个窗口（含边框）
+            # 1	只抓取客户区，不含标题栏
+            # 2	强制完整渲染（部分游戏需要这个标志）
+            # 3	强制渲染 + 只抓客户区
+            result = ctypes.windll.user32.PrintWindow(hwnd, saveDC.GetSafeHdc(), 3)
+            if result != 1:
+                return None  # 截图失败
+
+            bmpinfo = saveBitMap.GetInfo()
+            bmpstr = saveBitMap.GetBitmapBits(True)
+        return np.frombuffer(bmpstr, dtype=np.uint8).reshape(bmpinfo['bmHeight'], bmpinfo['bmWidth'], 4)
+
+    def _create_dc(self, hwnd, width, height):
+        import win32gui
+        import win32ui
+        self._release_dc()
+        hwndDC = win32gui.GetWindowDC(hwnd)
+        mfcDC = win32ui.CreateDCFromHandle(hwndDC)
+        saveDC = mfcDC.CreateCompatibleDC()
+        saveBitMap = win32ui.CreateBitmap()
+        saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
+        saveDC.SelectObject(saveBitMap)
+        self._dc = (hwnd, width, height, hwndDC, mfcDC, saveDC, saveBitMap)
+        return self._dc
+
+    def _release_dc(self):
+        if self._dc is None:
+            return
+        import win32gui
+        hwnd, _, _, hwndDC, mfcDC, saveDC, saveBitMap = self._dc
+        self._dc = None
+        try:
+            win32gui.DeleteObject(saveBitMap.GetHandle())
+            saveDC.DeleteDC()
+            mfcDC.DeleteDC()
+            win32gui.ReleaseDC(hwnd, hwndDC)
+        except Exception:
+            pass
+
+    def invalidate(self, hwnd=None):
+        """清除缓存的窗口几何信息和 DC，hwnd 为 None 时清除全部（包括窗口句柄）。"""
+        with self._lock:
+            if hwnd is None:
+                self._windows.clear()
+                self._geometry.clear()
+                self._release_dc()
+                return
+            self._geometry.pop(hwnd, None)
+            if self._dc is not None and self._dc[0] == hwnd:
+                self._release_dc()
+
+    def close(self):
+        """释放所有截图资源。"""
+        with self._lock:
+            self.invalidate()
+            for sct in self._mss_instances:
+                try:
+                    sct.close()
+                except Exception:
+                    pass
+            self._mss_instances.clear()
+        self._local = threading.local()
 
 
 class Screenshot:
+    session = CaptureSession()
+
+    @staticmethod
+    def prefers_region_capture():
+        """截图来源只截取部分区域比截取整个画面后裁剪更快时返回 True，目前只有云游戏回退为浏览器截图时如此。"""
+        if cfg.cloud_game_enable:
+            from module.game import cloud_game
+            return cloud_game.is_browser_screenshot_fallback()
+        return False
+
     @staticmethod
     def _decode_cloud_game_screenshot(screenshot_bytes):
-        screenshot = Image.open(BytesIO(screenshot_bytes))
-        screenshot.load()
-        return screenshot.copy()
+        # 推送画面已在后台解码
+        if isinstance(screenshot_bytes, Frame):
+            return screenshot_bytes
+        import cv2
+        bgr = cv2.imdecode(np.frombuffer(screenshot_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if bgr is None:
+            raise ValueError("无法解码截图数据")
+        return Frame(bgr)
 
     @staticmethod
     def is_application_fullscreen(window):
@@ -22,33 +199,19 @@ class Screenshot:
     def get_window_real_resolution(window):
         if cfg.cloud_game_enable:
             return 1920, 1080
-        import win32gui  # 延迟导入，避免非 Windows 平台报错
-        left, top, right, bottom = win32gui.GetClientRect(window._hWnd)
-        return right - left, bottom - top
+        return Screenshot.session.get_geometry(window)[0]
 
     @staticmethod
     def get_window_region(window):
         if cfg.cloud_game_enable:
             return (0, 0, 1920, 1080)
-        if Screenshot.is_application_fullscreen(window):
-            return (window.left, window.top, window.width, window.height)
-        else:
-            real_width, real_height = Screenshot.get_window_real_resolution(window)
-            other_border = (window.width - real_width) // 2
-            up_border = window.height - real_height - other_border
-            return (window.left + other_border, window.top + up_border, window.width - other_border - other_border, window.height - up_border - other_border)
+        return Screenshot.session.get_geometry(window)[1]
 
     @staticmethod
     def get_window(title):
         if cfg.cloud_game_enable:
             return False  # TODO
-        import pyautogui
-        windows = pyautogui.getWindowsWithTitle(title)
-        if windows:
-            for window in windows:
-                if window.title == title:
-                    return window
-        return False
+        return Screenshot.session.get_window(title)
 
     # @staticmethod
     # def get_virtual_screen_offset():
@@ -62,11 +225,8 @@ class Screenshot:
 
     @staticmethod
     def capture_screen_with_mss(region):
-        import mss
-
-        with mss.mss() as sct:
-            screenshot = sct.grab(region)
-            return Image.frombytes('RGB', screenshot.size, screenshot.rgb)
+        # 直接使用 BGRA 原始缓冲区，只做一次转换得到连续的 BGR 数组
+        return Frame.from_bgra(Screenshot.session.grab(region))
 
     @staticmethod
     def capture_window_background(hwnd, region, crop_params, offset=(0, 0)):
@@ -75,46 +235,12 @@ class Screenshot:
         crop_params: (left_ratio, top_ratio, width_ratio, height_ratio)
         offset: (offset_x, offset_y)
         """
-        import win32gui
-        import win32ui
-        import win32con
-        from PIL import Image
-
         # 获取窗口坐标
         # left, top, right, bot = win32gui.GetWindowRect(hwnd)
         left, top, width, height = region
 
-        # 创建设备上下文
-        hwndDC = win32gui.GetWindowDC(hwnd)
-        mfcDC = win32ui.CreateDCFromHandle(hwndDC)
-        saveDC = mfcDC.CreateCompatibleDC()
-
-        # 创建位图对象
-        saveBitMap = win32ui.CreateBitmap()
-        saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
-        saveDC.SelectObject(saveBitMap)
-
-        # 使用 PrintWindow 截取后台内容
-        win32gui.SendMessage(hwnd, win32con.WM_PAINT, 0, 0)  # 触发重绘
-        import ctypes
-        # 0	默认模式，抓取整个窗口（含边框）
-        # 1	只抓取客户区，不含标题栏
-        # 2	强制完整渲染（部分游戏需要这个标志）
-        # 3	强制渲染 + 只抓客户区
-        result = ctypes.windll.user32.PrintWindow(hwnd, saveDC.GetSafeHdc(), 3)
-
-        # 转换为 PIL 图像
-        bmpinfo = saveBitMap.GetInfo()
-        bmpstr = saveBitMap.GetBitmapBits(True)
-        img = Image.frombuffer('RGB', (bmpinfo['bmWidth'], bmpinfo['bmHeight']), bmpstr, 'raw', 'BGRX', 0, 1)
-
-        # 清理内存
-        win32gui.DeleteObject(saveBitMap.GetHandle())
-        saveDC.DeleteDC()
-        mfcDC.DeleteDC()
-        win32gui.ReleaseDC(hwnd, hwndDC)
-
-        if result != 1:
+        img = Screenshot.session.print_window(hwnd, width, height)
+        if img is None:
             return None  # 截图失败
 
         # 执行原来的 crop 逻辑
@@ -123,7 +249,38 @@ class Screenshot:
         crop_width = int(width * crop_params[2])
         crop_height = int(height * crop_params[3])
 
-        return img.crop((crop_left, crop_top, crop_left + crop_width, crop_top + crop_height))
+        return Frame.from_bgra(img[max(0, crop_top):crop_top + crop_height, max(0, crop_left):crop_left + crop_width])
+
+    @staticmethod
+    def crop_frame(frame_result, crop=(0, 0, 1, 1)):
+        """
+        从整帧截图结果中裁剪出指定区域，返回值格式与 take_screenshot 一致。
+        frame_result: take_screenshot(crop=(0, 0, 1, 1)) 的返回值
+        crop: (left_ratio, top_ratio, width_ratio, height_ratio)
+        """
+        screenshot, screenshot_pos, screenshot_scale_factor = frame_result
+        if tuple(crop) == (0, 0, 1, 1):
+            return screenshot, screenshot_pos, screenshot_scale_factor
+
+        # screenshot_pos 中的宽高已乘以缩放因子，这里还原为窗口实际尺寸，保证与直接裁剪截图时的坐标一致
+        left, top, scaled_width, scaled_height = screenshot_pos
+        width = scaled_width / screenshot_scale_factor
+        height = scaled_height / screenshot_scale_factor
+
+        frame_width, frame_height = screenshot.size
+        crop_left = int(frame_width * crop[0])
+        crop_top = int(frame_height * crop[1])
+        crop_width = int(frame_width * crop[2])
+        crop_height = int(frame_height * crop[3])
+        cropped = screenshot.crop((crop_left, crop_top, crop_left + crop_width, crop_top + crop_height))
+
+        cropped_pos = (
+            int(left + width * crop[0]),
+            int(top + height * crop[1]),
+            int(width * crop[2] * screenshot_scale_factor),
+            int(height * crop[3] * screenshot_scale_factor)
+        )
+        return cropped, cropped_pos, screenshot_scale_factor
 
     @staticmethod
     def take_screenshot(title, crop=(0, 0, 1, 1), use_background_screenshot=None, prefer_frame_screenshot=True):
@@ -237,3 +394,6 @@ class Screenshot:
             return screenshot, screenshot_pos, screenshot_scale_factor
 
         return False
+
+
+atexit.register(Screenshot.session.close)
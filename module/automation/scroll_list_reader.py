@@ -0,0 +1,139 @@
+from module.ocr import ocr
+from utils.image_utils import ImageUtils
+
+
+# 上一帧中距离画面边缘不超过此像素数的文字可能被截断，滚动后重新识别
+SCROLL_LIST_EDGE_MARGIN = 4
+# 新出现区域与沿用结果之间额外重新识别的像素数，避免恰好跨过分界线的一行识别不完整
+SCROLL_LIST_BAND_MARGIN = 8
+# 新出现区域的最小高度，过矮的图片会被 OCR 跳过文字检测（Global.min_height）
+SCROLL_LIST_MIN_BAND_HEIGHT = 160
+
+
+class ScrollListReader:
+    """
+    滚动列表的增量 OCR。
+
+    每次滚动后估计列表内容相对上一帧的纵向偏移，只识别新出现的行，其余行沿用上一帧的识别结果并平移坐标；
+    识别过的行按在列表中的位置拼接成一份去重的列表。无法对齐时识别整个区域。
+    """
+
+    def __init__(self, automation, crop):
+        """
+        :param automation: Automation 实例。
+        :param crop: 列表区域，格式与 take_screenshot 的 crop 参数相同。
+        """
+        self.auto = automation
+        self.crop = tuple(crop)
+        self.rows = []  # 拼接后的 [box, (text, score)]，纵坐标相对于第一帧的列表顶部
+        self.scrolled = 0  # 当前帧相对第一帧向下滚动的像素数
+        self.ocr_pixels = 0  # 实际送入 OCR 的像素数
+        self.frame_pixels = 0  # 每帧都完整识别时需要的像素数
+        self._previous = None
+        self._visible = []
+
+    def read(self, take_screenshot=True):
+        """
+        识别当前帧，并将 auto.ocr_result 更新为当前帧完整的识别结果，格式与 perform_ocr 相同。
+        :param take_screenshot: 是否先截取列表区域，为 False 时使用 auto 中已有的截图，截图区域需为 crop。
+        :return: 本次新识别的行，坐标为当前截图中的像素坐标。
+        """
+        auto = self.auto
+        if take_screenshot:
+            auto.take_screenshot(self.crop)
+        gray = auto.screenshot.gray
+        height, width = gray.shape
+
+        shift = ImageUtils.estimate_vertical_shift(self._previous, gray) if self._previous is not None else None
+        if shift is None:
+            if self._previous is not None:
+                auto.logger.debug("列表滚动偏移估计失败，重新识别整个区域")
+            kept, top, bottom = [], 0, height
+        else:
+            kept, top, bottom = self._reuse_visible(shift, height)
+
+        new = []
+        if bottom > top:
+            try:
+                new = ocr.recognize_regions(auto.screenshot, [(0, top, width, bottom)])[0]
+            except Exception as e:
+                auto.logger.error(f"OCR识别失败：{e}")
+            self.ocr_pixels += (bottom - top) * width
+        self.frame_pixels += height * width
+
+        self._stitch(new, shift)
+        self._previous = gray
+        self._visible = sorted(kept + new, key=lambda line: (line[0][0][1], line[0][0][0]))
+        auto.ocr_result = self._visible
+        auto.logger.debug(f"滚动列表偏移：{shift}，识别区域：{top}~{bottom}/{height}，沿用 {len(kept)} 行，新识别 {len(new)} 行")
+        return new
+
+    def _reuse_visible(self, shift, height):
+        """
+        平移上一帧的识别结果，返回 (仍完整可见的行, 需要识别的区域顶部, 需要识别的区域底部)。
+        被画面边缘截断的行和与新出现区域相邻的行都交给新区域重新识别，识别区域随之扩展到这些行。
+        """
+        if shift == 0:
+            return list(self._visible), 0, 0
+
+        kept, boundary = [], None
+        # 上一帧边缘之外可能还有未检测到的半行文字，新区域额外多识别一行的高度
+        margin = max([SCROLL_LIST_BAND_MARGIN] + [box[2][1] - box[0][1] for box, _ in self._visible])
+        for box, text in self._visible:
+            top, bottom = box[0][1] - shift, box[2][1] - shift
+            if bottom <= 0 or top >= height:
+                continue
+            truncated = box[0][1] <= SCROLL_LIST_EDGE_MARGIN or box[2][1] >= height - SCROLL_LIST_EDGE_MARGIN
+            if truncated:
+                # 截断的行只有靠内一侧的边界可信
+                edge = top if shift > 0 else bottom
+                boundary = edge if boundary is None else (min(boundary, edge) if shift > 0 else max(boundary, edge))
+                continue
+            kept.append([[[x, y - shift] for x, y in box], text])
+
+        if shift > 0:
+            band_top = min(height - shift - margin, height - SCROLL_LIST_MIN_BAND_HEIGHT)
+            if boundary is not None:
+                band_top = min(band_top, boundary)
+            # 与新出现区域重叠的行交给新区域重新识别，识别区域随之向上扩展到该行顶部
+            for line in sorted(kept, key=lambda line: -line[0][2][1]):
+                if line[0][2][1] > band_top - SCROLL_LIST_BAND_MARGIN:
+                    band_top = min(band_top, line[0][0][1])
+            band_top = max(0, band_top - SCROLL_LIST_BAND_MARGIN)
+            kept = [line for line in kept if line[0][2][1] <= band_top]
+            return kept, band_top, height
+
+        band_bottom = max(-shift + margin, SCROLL_LIST_MIN_BAND_HEIGHT)
+        if boundary is not None:
+            band_bottom = max(band_bottom, boundary)
+        for line in sorted(kept, key=lambda line: line[0][0][1]):
+            if line[0][0][1] < band_bottom + SCROLL_LIST_BAND_MARGIN:
+                band_bottom = max(band_bottom, line[0][2][1])
+        band_bottom = min(height, band_bottom + SCROLL_LIST_BAND_MARGIN)
+        kept = [line for line in kept if line[0][0][1] >= band_bottom]
+        return kept, 0, band_bottom
+
+    def _stitch(self, new, shift):
+        """将新识别的行按列表中的位置并入 rows，与已有行重叠的视为同一行，以新结果为准。"""
+        if shift is not None:
+            self.scrolled += shift
+        elif self.rows:
+            # 无法对齐时只能按文本去重，未出现过的行接在列表末尾
+            seen = {text for _, (text, _) in self._visible}
+            new = [line for line in new if line[1][0] not in seen]
+            if new:
+                self.scrolled = self.rows[-1][0][2][1] + 1 - min(line[0][0][1] for line in new)
+
+        for box, text in new:
+            box = [[x, y + self.scrolled] for x, y in box]
+            self.rows = [row for row in self.rows if not self._same_line(row[0], box)]
+            self.rows.append([box, text])
+        self.rows.sort(key=lambda row: (row[0][0][1], row[0][0][0]))
+
+    @staticmethod
+    def _same_line(a, b):
+        """两个文本框水平方向相交，且纵向重叠超过较矮一个的一半时视为同一行文字。"""
+        if a[2][0] <= b[0][0] or b[2][0] <= a[0][0]:
+            return False
+        overlap = min(a[2][1], b[2][1]) - max(a[0][1], b[0][1])
+        return overlap > min(a[2][1] - a[0][1], b[2][1] - b[0][1]) / 2
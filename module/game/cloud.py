@@ -26,10 +26,12 @@ from selenium.common.exceptions import WebDriverException
 
 from module.config import Config
 from module.game.base import GameControllerBase
+from module.game.cloud_screencast import CloudScreencast
 from module.logger import Logger
 # from utils.encryption import wdp_encrypt, wdp_decrypt
 
 from utils.console import is_docker_started
+from utils.frame import Frame
 
 
 class CloudGameController(GameControllerBase):
@@ -93,6 +95,10 @@ class CloudGameController(GameControllerBase):
         else:  # Linux
             return os.path.join(browser_install_path, "chromedriver", platform_dir, browser_version, "chromedriver")  # 未验证
     MAX_RETRIES = 3  # 网页加载重试次数，0=不重试
+    SCREENCAST_FIRST_FRAME_TIMEOUT = 2  # 开始推送画面后等待第一帧的最长时间（秒）
+    SCREENCAST_INPUT_WAIT = 0.1  # 输入后等待新画面的最长时间（秒），超时说明画面没有变化
+    SCREENCAST_RETRY_INTERVAL = 30  # 推送画面启动失败后，重新尝试前使用浏览器截图的时间（秒）
+    SCREENCAST_MAX_FRAME_AGE = 3  # 推送画面的最长有效时间（秒），超过后改用浏览器截图
     PERFERENCES = {
         "profile": {
             "content_settings": {
@@ -121,6 +127,12 @@ class CloudGameController(GameControllerBase):
         self._qr_notify_last_sent_ts = 0.0
         self._qr_notify_min_interval_sec = 60
 
+        # 画面推送
+        self._screencast = None
+        self._screencast_retry_at = 0.0
+        self._screencast_frame_used = False  # 最近一次截图是否使用了推送画面
+        self._last_input_time = None  # 最近一次输入且尚未等到新画面的时间（time.monotonic）
+
         atexit.register(self._clean_at_exit)
 
     def _wait_game_page_loaded(self, timeout=5) -> None:
@@ -1324,8 +1336,40 @@ class CloudGameController(GameControllerBase):
         _, encoded = data_url.split(",", 1)
         return base64.b64decode(encoded), (int(result["sourceWidth"]), int(result["sourceHeight"]))
 
-    def _take_browser_screenshot(self) -> bytes | None:
-        """使用浏览器原生截图能力作为回退方案。"""
+    def _get_screenshot_clip(self, crop) -> tuple[dict, tuple[int, int]]:
+        """
+        将截图区域换算为 Page.captureScreenshot 的 clip 参数。
+        crop 为相对于整页截图的比例，整页截图的像素尺寸为页面可视区域的 CSS 尺寸乘以设备像素比（即 browser_scale_factor）。
+        :return: (clip, (整页截图宽度, 整页截图高度))
+        """
+        metrics = self.driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+        viewport = metrics["cssVisualViewport"]
+        css_width, css_height = viewport["clientWidth"], viewport["clientHeight"]
+        # visualViewport 为设备像素，与 CSS 尺寸之比即实际的设备像素比；缺少该字段时按配置的缩放比计算
+        device_viewport = metrics.get("visualViewport")
+        if device_viewport and css_width:
+            scale_factor = device_viewport["clientWidth"] / css_width
+        else:
+            scale_factor = float(self.cfg.browser_scale_factor)
+
+        source_width, source_height = round(css_width * scale_factor), round(css_height * scale_factor)
+        # 与 Screenshot.take_screenshot 裁剪整页截图时的取整方式一致
+        left, top = int(source_width * crop[0]), int(source_height * crop[1])
+        width, height = max(1, int(source_width * crop[2])), max(1, int(source_height * crop[3]))
+        clip = {
+            "x": viewport.get("pageX", 0) + left / scale_factor,
+            "y": viewport.get("pageY", 0) + top / scale_factor,
+            "width": width / scale_factor,
+            "height": height / scale_factor,
+            "scale": 1,
+        }
+        return clip, (source_width, source_height)
+
+    def _take_browser_screenshot(self, crop=(0, 0, 1, 1)) -> bytes | tuple[bytes, tuple[int, int]] | None:
+        """
+        使用浏览器原生截图能力作为回退方案。
+        crop 不是整页时只截取该区域，返回 (截图数据, (整页截图宽度, 整页截图高度))；CDP 截图失败时回退为整页截图。
+        """
         if not self.driver:
             return None
 
@@ -1340,10 +1384,16 @@ class CloudGameController(GameControllerBase):
             self._ensure_window_not_minimized_for_frame_capture()
             # 未知原因，PNG 格式截图特别慢，改用 JPEG 格式可以显著提升截图速度
             # result = self.driver.execute_cdp_cmd("Page.captureScreenshot", {"format": "png"})
-            result = self.driver.execute_cdp_cmd("Page.captureScreenshot", {"format": "jpeg", "quality": 100})
+            params = {"format": "jpeg", "quality": 100}
+            source_size = None
+            if tuple(crop) != (0, 0, 1, 1):
+                # 小区域只编码、传输和解码该区域，不再截取整页后裁剪
+                params["clip"], source_size = self._get_screenshot_clip(crop)
+            result = self.driver.execute_cdp_cmd("Page.captureScreenshot", params)
             data = result.get("data") if result else None
             if data:
-                return base64.b64decode(data)
+                data = base64.b64decode(data)
+                return (data, source_size) if source_size else data
         except Exception as e:
             self.log_debug(f"CDP 截图失败，回退 WebDriver 截图: {e}")
 
@@ -1368,12 +1418,77 @@ class CloudGameController(GameControllerBase):
         except Exception as e:
             self.log_debug(f"恢复云游戏窗口失败，继续尝试截图: {e}")
 
-    def take_screenshot(self, crop=(0, 0, 1, 1), prefer_frame=True) -> bytes | tuple[bytes, tuple[int, int]] | None:
-        """浏览器内截图"""
+    def _take_screencast_frame(self) -> Frame | None:
+        """读取推送画面中的最新一帧，推送未启用或不可用时返回 None。"""
+        frame = self._read_screencast_frame()
+        self._screencast_frame_used = frame is not None
+        return frame
+
+    def is_browser_screenshot_fallback(self) -> bool:
+        """
+        最近一次截图是否使用了浏览器截图（推送画面未启用、不可用或已冻结）。
+        此时浏览器截图可以只截取需要的区域，比截取整页后裁剪更快，见 _take_browser_screenshot。
+        """
+        return self.driver is not None and not self._screencast_frame_used
+
+    def _read_screencast_frame(self) -> Frame | None:
+        """读取推送画面的最新一帧，必要时启动推送。"""
+        if not self.cfg.get_value('cloud_game_screencast_enable', True):
+            return None
+
+        screencast = self._screencast
+        timeout = self.SCREENCAST_INPUT_WAIT
+        if screencast is None or not screencast.running:
+            if time.monotonic() < self._screencast_retry_at:
+                return None
+            self._stop_screencast()
+            screencast = CloudScreencast(
+                self.cfg.browser_debug_port,
+                self.driver.current_window_handle,
+                self.logger,
+                quality=self.cfg.get_value('cloud_game_screencast_quality', 100),
+            )
+            try:
+                screencast.start()
+            except Exception as e:
+                self.log_debug(f"启动画面推送失败，使用浏览器截图: {e}")
+                screencast.stop()
+                self._screencast_retry_at = time.monotonic() + self.SCREENCAST_RETRY_INTERVAL
+                return None
+            self._screencast = screencast
+            self.log_debug("已启动画面推送")
+            timeout = self.SCREENCAST_FIRST_FRAME_TIMEOUT
+
+        self._ensure_window_not_minimized_for_frame_capture()
+        # 输入之后优先等待新画面，画面没有变化时等待超时后沿用最新一帧
+        # 窗口被遮挡或页面被隐藏时浏览器会停止合成画面，推送的最新一帧可能已经冻结，超过有效时间后本次改用浏览器截图
+        max_age = self.cfg.get_value('cloud_game_screencast_max_frame_age', self.SCREENCAST_MAX_FRAME_AGE)
+        frame = screencast.latest(newer_than=self._last_input_time, timeout=timeout, max_age=max_age or None)
+        self._last_input_time = None
+        if frame is None:
+            if screencast.running:
+                self.log_debug(f"推送画面超过 {max_age} 秒未更新，本次使用浏览器截图")
+            else:
+                self.log_debug("画面推送未收到画面，使用浏览器截图")
+                self._stop_screencast()
+                self._screencast_retry_at = time.monotonic() + self.SCREENCAST_RETRY_INTERVAL
+        return frame
+
+    def _stop_screencast(self) -> None:
+        if self._screencast is not None:
+            self._screencast.stop()
+            self._screencast = None
+
+    def take_screenshot(self, crop=(0, 0, 1, 1), prefer_frame=True) -> bytes | tuple[bytes, tuple[int, int]] | Frame | None:
+        """浏览器内截图，优先使用推送画面中的最新一帧"""
         if not self.driver:
             return None
 
-        return self._take_browser_screenshot()
+        frame = self._take_screencast_frame()
+        if frame is not None:
+            return frame
+
+        return self._take_browser_screenshot(crop)
 
         # 帧截图有内存占用问题，暂不使用
         if prefer_frame:
@@ -1387,10 +1502,13 @@ class CloudGameController(GameControllerBase):
             except Exception as e:
                 self.log_debug(f"游戏画面元素截图失败，回退浏览器截图: {e}")
 
-        return self._take_browser_screenshot()
+        return self._take_browser_screenshot(crop)
 
     def execute_cdp_cmd(self, cmd: str, cmd_args: dict):
-        return self.driver.execute_cdp_cmd(cmd, cmd_args)
+        result = self.driver.execute_cdp_cmd(cmd, cmd_args)
+        if cmd.startswith("Input."):
+            self._last_input_time = time.monotonic()
+        return result
 
     def get_window_handle(self) -> int:
         if sys.platform != "win32":
@@ -1466,6 +1584,8 @@ class CloudGameController(GameControllerBase):
         except Exception as e:
             self.log_debug(f"删除二维码图片失败（可忽略）: {e}")
 
+        self._stop_screencast()
+        self._screencast_retry_at = 0.0
         if self.driver:
             try:
                 self.driver.execute(Command.CLOSE)
@@ -0,0 +1,173 @@
+import base64
+import json
+import threading
+import time
+
+import numpy as np
+
+from utils.frame import Frame
+
+
+# 连接 DevTools 调试地址的超时时间（秒）
+SCREENCAST_CONNECT_TIMEOUT = 5
+
+
+class CloudScreencast:
+    """
+    通过 CDP Page.startScreencast 持续接收云游戏页面的画面。
+
+    浏览器只在画面变化时推送新帧。接收线程收到帧后立即确认，让浏览器继续推送；
+    编码数据放入只保留最新一帧的槽位，由解码线程解码为 Frame，解码跟不上时直接丢弃较旧的帧，
+    内存中最多只有一帧编码数据和一帧解码后的画面。截图时直接读取最新画面，不必每次请求浏览器截图。
+
+    与 WebDriver 各自独立连接到同一页面，不占用 WebDriver 的命令通道。
+    """
+
+    def __init__(self, debug_port, target_id, logger, quality=100):
+        """
+        :param debug_port: 浏览器远程调试端口。
+        :param target_id: 页面的 DevTools 目标 ID，即 WebDriver 的窗口句柄。
+        :param logger: 日志记录器。
+        :param quality: 推送帧的 JPEG 质量。
+        """
+        self.debug_port = debug_port
+        self.target_id = target_id
+        self.logger = logger
+        self.quality = quality
+        self._ws = None
+        self._send_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._message_id = 0
+        self._running = False
+        self._pending = None  # 最新一帧尚未解码的 base64 数据
+        self._frame = None  # 最新一帧解码后的画面
+        self._frame_time = 0.0  # 最新一帧解码完成的时间（time.monotonic）
+
+    @property
+    def running(self):
+        return self._running
+
+    def _get_websocket_url(self):
+        """从调试端口查询页面的 WebSocket 地址。"""
+        import requests
+
+        targets = requests.get(f"http://127.0.0.1:{self.debug_port}/json/list", timeout=SCREENCAST_CONNECT_TIMEOUT).json()
+        for target in targets:
+            if target.get("id") == self.target_id and target.get("webSocketDebuggerUrl"):
+                return target["webSocketDebuggerUrl"]
+        raise RuntimeError(f"未找到页面的调试地址: {self.target_id}")
+
+    def start(self):
+        """连接页面并开始接收画面，连接失败时抛出异常。"""
+        import websocket
+
+        # 不发送 Origin 头，否则浏览器需要以 --remote-allow-origins 启动才允许连接
+        self._ws = websocket.create_connection(self._get_websocket_url(), timeout=SCREENCAST_CONNECT_TIMEOUT, suppress_origin=True)
+        self._ws.settimeout(None)
+        self._running = True
+        threading.Thread(target=self._receive_loop, name="CloudScreencastReceiver", daemon=True).start()
+        threading.Thread(target=self._decode_loop, name="CloudScreencastDecoder", daemon=True).start()
+        # 页面刷新后推送会停止，需要监听页面加载事件重新开始
+        self._send("Page.enable")
+        self._start_screencast()
+
+    def stop(self):
+        """停止接收画面并断开连接。"""
+        with self._cond:
+            was_running = self._running
+            self._running = False
+            self._pending = None
+            self._frame = None
+            self._cond.notify_all()
+        if self._ws is None:
+            return
+        if was_running:
+            try:
+                self._send("Page.stopScreencast")
+            except Exception:
+                pass
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+        self._ws = None
+
+    def latest(self, newer_than=None, timeout=0.0, max_age=None):
+        """
+        返回最新一帧画面，连接已断开、超时仍未收到画面或画面过旧时返回 None。
+        返回的 Frame 可能同时被多次截图共用，调用方不应直接修改其像素。
+        :param newer_than: 希望画面晚于此时间（time.monotonic），例如最近一次输入的时间。
+        :param timeout: 等待满足条件的画面的最长时间（秒），超时后返回已有的最新画面。
+        :param max_age: 画面的最长有效时间（秒），为 None 时不限制。
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._running and (self._frame is None or (newer_than is not None and self._frame_time <= newer_than)):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if not self._running:
+                return None
+            if max_age is not None and time.monotonic() - self._frame_time > max_age:
+                return None
+            return self._frame
+
+    def _start_screencast(self):
+        self._send("Page.startScreencast", {"format": "jpeg", "quality": int(self.quality)})
+
+    def _send(self, method, params=None):
+        with self._send_lock:
+            self._message_id += 1
+            self._ws.send(json.dumps({"id": self._message_id, "method": method, "params": params or {}}))
+
+    def _receive_loop(self):
+        try:
+            while self._running:
+                message = self._ws.recv()
+                if not message:
+                    break
+                message = json.loads(message)
+                method = message.get("method")
+                if method == "Page.screencastFrame":
+                    params = message["params"]
+                    # 先确认再交给解码线程，浏览器收到确认后才会推送下一帧
+                    self._send("Page.screencastFrameAck", {"sessionId": params["sessionId"]})
+                    with self._cond:
+                        self._pending = params["data"]
+                        self._cond.notify_all()
+                elif method == "Page.loadEventFired":
+                    self._start_screencast()
+                elif method == "Inspector.detached":
+                    break
+                elif "error" in message:
+                    self.logger.debug(f"云游戏画面推送命令失败: {message['error']}")
+        except Exception as e:
+            if self._running:
+                self.logger.debug(f"云游戏画面推送连接断开: {e}")
+        finally:
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+
+    def _decode_loop(self):
+        import cv2
+
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                data, self._pending = self._pending, None
+            try:
+                bgr = cv2.imdecode(np.frombuffer(base64.b64decode(data), dtype=np.uint8), cv2.IMREAD_COLOR)
+            except Exception:
+                bgr = None
+            if bgr is None:
+                self.logger.debug("云游戏推送画面解码失败，已丢弃")
+                continue
+            with self._cond:
+                self._frame = Frame(bgr)
+                self._frame_time = time.monotonic()
+                self._cond.notify_all()
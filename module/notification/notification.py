@@ -3,6 +3,7 @@ from PIL import Image
 from typing import Optional
 from utils.logger.logger import Logger
 from utils.singleton import SingletonMeta
+from utils.frame import Frame
 from .notifier import Notifier
 
 
@@ -139,7 +140,7 @@ class Notification(metaclass=SingletonMeta):
         """
         将各种类型的图片转换为PIL.Image对象。
 
-        :param image: 可以是io.BytesIO对象、文件路径字符串或PIL.Image对象，可选。
+        :param image: 可以是io.BytesIO对象、文件路径字符串、PIL.Image对象或Frame对象，可选。
         :return: PIL.Image对象或None。
         """
         if isinstance(image, str):
@@ -159,6 +160,8 @@ class Notification(metaclass=SingletonMeta):
                 return None
         elif isinstance(image, Image.Image):
             return image
+        elif isinstance(image, Frame):
+            return image.to_image()
         return None
 
     def _get_processed_image(self, image: Optional[io.BytesIO | str | Image.Image], image_already_processed: bool = False) -> Optional[io.BytesIO | str | Image.Image]:
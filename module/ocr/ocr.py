@@ -5,8 +5,16 @@ import time
 import platform
 import re
 import subprocess
+import json
+import hashlib
+import threading
+import heapq
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from utils.logger.logger import Logger
 from typing import Optional
+from module.ocr.ocr_result import OCRResult
+from module.ocr.onnx_session import get_rapidocr_thread_params
 from PIL import Image
 import atexit
 import gc
@@ -14,14 +22,18 @@ import gc
 
 # OCR 耗时阈值（秒），超过此值时自动禁用 DML
 OCR_SLOW_THRESHOLD = 5.0
-# 固定图片压测表明，RapidOCR 在连续多次识别时会创建大量中间 ndarray、
-# RapidOCROutput、以及 to_json 生成的 Python 容器对象。它们并非真正泄漏，
-# 但往往要等到 full GC 才会集中回收，所以任务管理器里会表现为 RSS 快速
-# 爬升、达到高点后瞬间回落的锯齿。这里通过周期性 full GC 优先压低峰值内存。
-#
-# 这个值越小，峰值越低，但 full GC 触发越频繁；这里先取一个对 OCR 热路径
-# 较低侵入的经验值 20，优先解决长时间任务中的内存峰值问题。
-OCR_PERIODIC_FULL_GC_INTERVAL = 20
+# OCR 结果缓存：相同像素的图片直接返回上次的识别结果，按条数和存活时间淘汰
+OCR_CACHE_SIZE = 64
+OCR_CACHE_MAX_AGE = 30.0
+# 单行快速识别的最低置信度，低于此值时改用完整的检测+识别流程
+OCR_LINE_MIN_SCORE = 0.5
+# 多区域批量识别：每个区域四周的填充像素，以及拼接图的最大高度（超过后分批，避免检测模型缩小图片）
+OCR_REGION_PADDING = 16
+OCR_REGION_BATCH_MAX_HEIGHT = 2000
+# 运行环境检测结果（引擎是否可用、OpenVINO CPU/系统支持情况）的缓存文件，环境指纹不变时跳过检测
+OCR_ENV_CACHE_PATH = "./assets/ocr_env.json"
+# 预热使用的图片尺寸 (宽, 高)，高度需不低于 Global.min_height，否则会跳过文字检测
+OCR_WARMUP_IMAGE_SIZE = (320, 192)
 # OpenVINO 存在内存泄漏问题，每隔此时间（秒）重新初始化一次 OCR 实例以释放内存
 OCR_OPENVINO_REINIT_INTERVAL = 240
 
@@ -57,24 +69,21 @@ class OCR:
         self._cfg = None  # 配置对象引用，延迟获取避免循环导入
         self.ocr_time = 0.0
         self.ocr_count = 0
-        self._periodic_gc_interval = OCR_PERIODIC_FULL_GC_INTERVAL
         self._openvino_last_reinit = 0.0  # 上次 OpenVINO 重初始化的时间戳
-
-    def _maybe_collect_garbage(self):
-        """在长时间 OCR 循环下定期触发 full GC，优先压低峰值内存。
-
-        根据固定图复现结果，内存的快速上涨主要不是输入图片被重复拷贝，
-        而是 RapidOCR 在输出构造阶段堆积了大量短生命周期对象。这些对象
-        在引用关系彻底断开前，RSS 会维持在高位，看起来像“内存泄漏”；
-        实际上执行一次 full GC 后会明显回落。
-
-        因此这里不在每次 OCR 后都强制回收，而是按次数做周期性 full GC，
-        在控制峰值内存和避免过高额外开销之间做折中。
-        """
-        if self._periodic_gc_interval <= 0 or self.ocr_count <= 0:
-            return
-        if self.ocr_count % self._periodic_gc_interval == 0:
-            gc.collect()
+        self._cache = OrderedDict()  # 缓存键 -> (写入时间, 识别结果)
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._replacement_source = None  # 编译替换规则时使用的 replacements 对象
+        self._replacement_rules = None  # 编译后的替换规则，见 _get_replacement_rules
+        self._run_lock = threading.RLock()  # 当前进程内的 OCR 引擎同一时间只执行一次识别
+        self._pool = None  # OCR 子进程池，配置 ocr_worker_processes 大于 0 时启用
+        self._pool_checked = False
+        self._pool_lock = threading.Lock()
+        self._executor = None  # submit 使用的线程池
+        self._environment = None  # 运行环境检测结果
+        self._phase_times = {}  # 初始化和预热各阶段耗时（秒）
+        self._warmup_thread = None
 
     def _is_memory_low(self, threshold_gb: float = 1.0) -> bool:
         """检查当前可用物理内存是否低于阈值（默认 1GB）。"""
@@ -481,21 +490,90 @@ class OCR:
 
         return True, ""
 
+    @staticmethod
+    def _processor_identifier():
+        """CPU 型号，OpenVINO 是否可用取决于 CPU 支持的指令集，便携版复制到其他电脑后需要重新检测"""
+        identifier = os.environ.get("PROCESSOR_IDENTIFIER") or platform.processor()
+        if sys.platform.startswith("linux"):
+            # Linux 下 platform.processor() 通常只返回架构名
+            try:
+                with open("/proc/cpuinfo", encoding="utf-8", errors="ignore") as f:
+                    for line in f:
+                        if line.startswith("model name"):
+                            return line.split(":", 1)[1].strip()
+            except OSError:
+                pass
+        return identifier
+
+    def _environment_fingerprint(self):
+        """运行环境指纹：系统、CPU、Python 和推理相关包的版本，任一变化时重新检测"""
+        from importlib import metadata
+
+        packages = {}
+        for name in ("rapidocr", "onnxruntime", "onnxruntime-directml", "openvino"):
+            try:
+                packages[name] = metadata.version(name)
+            except Exception:
+                packages[name] = None
+        return {
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "processor": self._processor_identifier(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "packages": packages,
+        }
+
+    def _detect_environment(self):
+        """检测 DML、ONNXRuntime、OpenVINO 是否可用"""
+        import importlib.util
+
+        environment = {
+            "windows_supported": self._check_windows_version(),
+            "has_onnxruntime": importlib.util.find_spec("onnxruntime") is not None,
+            "has_openvino": importlib.util.find_spec("openvino") is not None,
+            "openvino_supported": False,
+            "openvino_reason": "",
+        }
+        if environment["has_openvino"]:
+            environment["openvino_supported"], environment["openvino_reason"] = self._can_use_openvino_fallback()
+        return environment
+
+    def _get_environment(self):
+        """获取运行环境检测结果，优先使用内存和磁盘缓存"""
+        if self._environment is not None:
+            return self._environment
+        fingerprint = self._environment_fingerprint()
+        try:
+            with open(OCR_ENV_CACHE_PATH, "r", encoding="utf-8") as file:
+                cached = json.load(file)
+            if cached.get("fingerprint") == fingerprint:
+                self._environment = cached["environment"]
+                self.logger.debug("使用缓存的OCR运行环境检测结果")
+                return self._environment
+        except Exception:
+            pass
+
+        self._environment = self._detect_environment()
+        try:
+            with open(OCR_ENV_CACHE_PATH, "w", encoding="utf-8") as file:
+                json.dump({"fingerprint": fingerprint, "environment": self._environment}, file, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.logger.debug(f"保存OCR运行环境检测结果失败：{e}")
+        return self._environment
+
     def _resolve_engine(self, selected_mode, force_cpu=False, force_onnx=False):
         """根据配置模式和运行环境解析实际引擎与 DML 开关。"""
         from rapidocr import EngineType
-        import importlib.util
 
-        windows_supported = self._check_windows_version()
-        has_onnxruntime = importlib.util.find_spec("onnxruntime") is not None
-        has_openvino = importlib.util.find_spec("openvino") is not None
-        openvino_fallback_supported = False
-        openvino_unsupported_reason = ""
+        environment = self._get_environment()
+        windows_supported = environment["windows_supported"]
+        has_onnxruntime = environment["has_onnxruntime"]
+        has_openvino = environment["has_openvino"]
+        openvino_fallback_supported = environment["openvino_supported"]
+        openvino_unsupported_reason = environment["openvino_reason"]
         openvino_warning_emitted = False
 
-        if has_openvino:
-            openvino_fallback_supported, openvino_unsupported_reason = self._can_use_openvino_fallback()
-
         def choose_cpu_fallback_engine():
             nonlocal openvino_warning_emitted
             if openvino_fallback_supported:
@@ -562,6 +640,8 @@ class OCR:
                 self.logger.debug("开始初始化OCR...")
                 start_time = time.monotonic()
                 from rapidocr import EngineType, LangDet, ModelType, OCRVersion, RapidOCR
+                phase_time = time.monotonic()
+                self._phase_times["import"] = phase_time - start_time
                 self._selected_mode = self._get_selected_mode()
                 prefer_engine, use_dml, resolved_mode = self._resolve_engine(
                     self._selected_mode,
@@ -569,6 +649,7 @@ class OCR:
                     force_onnx=force_onnx,
                 )
                 self._resolved_mode = resolved_mode
+                self._phase_times["environment"] = time.monotonic() - phase_time
 
                 if force_cpu:
                     self._dml_fallback = True
@@ -586,6 +667,7 @@ class OCR:
                     self._disable_openvino_telemetry()
                     self._disable_openvino_runtime_cache()
 
+                phase_time = time.monotonic()
                 params = {
                     # "Global.use_det": False,
                     "Global.use_cls": False,
@@ -607,6 +689,8 @@ class OCR:
                     "Cls.engine_type": prefer_engine,
                     "Rec.engine_type": prefer_engine,
                 }
+                # 线程数与 YOLO 等其他 ONNXRuntime 会话共用同一配置
+                params.update(get_rapidocr_thread_params())
 
                 # 891
                 machine = platform.machine().lower()
@@ -629,8 +713,10 @@ class OCR:
                         raise
 
                 self.logger.debug("初始化OCR完成")
+                self._phase_times["load"] = time.monotonic() - phase_time
                 elapsed_time = time.monotonic() - start_time
-                self.logger.debug(f"OCR初始化耗时: {elapsed_time:.2f} 秒")
+                self.logger.debug(f"OCR初始化耗时: {elapsed_time:.2f} 秒（导入 {self._phase_times['import']:.2f} 秒，"
+                                  f"环境检测 {self._phase_times['environment']:.2f} 秒，模型加载 {self._phase_times['load']:.2f} 秒）")
                 if self._using_openvino:
                     self._openvino_last_reinit = time.monotonic()
                     # 初始化后立即检查可用内存，不足 1GB 则降级
@@ -640,6 +726,47 @@ class OCR:
                 self.logger.error(f"初始化OCR失败：{e}")
                 raise Exception("初始化OCR失败")
 
+    def warm_up(self):
+        """
+        加载 OCR 模型，并分别对完整识别和仅识别流程各执行一次推理，使首次识别不再承担初始化和首次推理的开销。
+        启用子进程池时由子进程各自预热。
+        """
+        if self._get_pool() is not None:
+            return
+        import cv2
+        import numpy as np
+        from rapidocr.ch_ppocr_rec import TextRecInput
+
+        width, height = OCR_WARMUP_IMAGE_SIZE
+        image = np.full((height, width, 3), 255, dtype=np.uint8)
+        cv2.putText(image, "0123456789", (16, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+        with self._run_lock:
+            start_time = time.monotonic()
+            self.instance_ocr()
+            phase_time = time.monotonic()
+            self.ocr(image)
+            self.ocr.text_rec(TextRecInput(img=[image[height // 2 - 40:height // 2 + 16]]))
+            self._phase_times["warmup"] = time.monotonic() - phase_time
+        if "load" in self._phase_times:
+            self.logger.info(f"OCR预热完成，耗时 {time.monotonic() - start_time:.2f} 秒（导入 {self._phase_times['import']:.2f} 秒，"
+                             f"环境检测 {self._phase_times['environment']:.2f} 秒，模型加载 {self._phase_times['load']:.2f} 秒，"
+                             f"首次推理 {self._phase_times['warmup']:.2f} 秒）")
+
+    def warm_up_async(self):
+        """在后台线程中预热 OCR，与启动游戏等操作并行；预热期间发起的识别会等待预热完成"""
+        if self._warmup_thread is not None:
+            return self._warmup_thread
+
+        def target():
+            try:
+                self.warm_up()
+            except Exception as e:
+                self.logger.warning(f"OCR预热失败：{e}")
+
+        self._warmup_thread = threading.Thread(target=target, name="OCRWarmUp", daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+
     def exit_ocr(self):
         """退出OCR实例，清理资源"""
         if self.ocr is not None:
@@ -657,24 +784,176 @@ class OCR:
                 self.ocr_count = 0
 
     def convert_format(self, result):
-        """转换OCR结果格式，返回统一的数据格式"""
+        """转换OCR结果格式，返回统一的数据格式。OCRResult 本身即按 [box, (text, score)] 访问，直接返回"""
         if result is None:
             return False
+        if isinstance(result, OCRResult):
+            return result
         return [[item['box'], (item['txt'], item['score'])] for item in result]
 
-    def run(self, img, max_retries=3):
-        """执行OCR识别，支持Image对象、文件路径和np.ndarray对象"""
-        self.instance_ocr()
+    @staticmethod
+    def _cache_key(img, mode):
+        """根据图片像素计算缓存键，无法计算时返回 None"""
         try:
-            # start_time = time.monotonic()
-            if not isinstance(img, Image.Image):
-                if isinstance(img, str):
-                    img = Image.open(os.path.abspath(img))
-                # else:  # 默认为 np.ndarray，避免需要import numpy
-                #     image = Image.fromarray(image)
-            # elapsed_time = time.monotonic() - start_time
-            # self.logger.debug(f"图像预处理耗时: {elapsed_time:.2f} 秒")
+            if isinstance(img, Image.Image):
+                return mode, img.mode, img.size, hashlib.blake2b(img.tobytes(), digest_size=16).digest()
+            flags = getattr(img, "flags", None)
+            if flags is None:
+                return None
+            # 连续数组直接哈希底层缓冲区，裁剪得到的视图才需要拷贝
+            data = memoryview(img) if flags["C_CONTIGUOUS"] else img.tobytes()
+            return mode, img.shape, str(img.dtype), hashlib.blake2b(data, digest_size=16).digest()
+        except Exception:
+            return None
+
+    @staticmethod
+    def _copy_results(results):
+        """复制识别结果，避免调用方修改缓存中的数据"""
+        if isinstance(results, OCRResult):
+            return results.copy()
+        if isinstance(results, list):
+            return [dict(item) if isinstance(item, dict) else item for item in results]
+        return results
 
+    def _cache_get(self, key):
+        """读取缓存，未命中或已过期时返回 (False, None)"""
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and now - entry[0] > OCR_CACHE_MAX_AGE:
+                del self._cache[key]
+                entry = None
+            if entry is None:
+                self.cache_misses += 1
+                return False, None
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return True, self._copy_results(entry[1])
+
+    def _cache_put(self, key, results):
+        """写入缓存，超出容量时淘汰最久未使用的结果"""
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), self._copy_results(results))
+            self._cache.move_to_end(key)
+            while len(self._cache) > OCR_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        """清空OCR结果缓存"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _prepare_image(img):
+        """将文件路径和 Frame 转换为 RapidOCR 可直接处理的图片"""
+        if isinstance(img, str):
+            return Image.open(os.path.abspath(img))
+        if hasattr(img, 'bgr'):  # utils.frame.Frame，直接使用 BGR 数组，与 RapidOCR 处理 PIL 图片的结果一致
+            return img.bgr
+        return img
+
+    def _get_pool(self):
+        """按配置创建 OCR 子进程池，未启用或子进程池已失效时返回 None"""
+        with self._pool_lock:
+            if not self._pool_checked:
+                self._pool_checked = True
+                cfg = self._get_config()
+                processes = cfg.get_value("ocr_worker_processes", 0) if cfg is not None else 0
+                if processes and processes > 0:
+                    from module.ocr.ocr_pool import OCRWorkerPool, OCR_WORKER_MAX_REQUESTS, OCR_WORKER_MAX_MEMORY_MB
+                    try:
+                        self._pool = OCRWorkerPool(
+                            processes,
+                            self.logger,
+                            self.replacements,
+                            max_requests=cfg.get_value("ocr_worker_max_requests", OCR_WORKER_MAX_REQUESTS),
+                            max_memory_mb=cfg.get_value("ocr_worker_max_memory_mb", OCR_WORKER_MAX_MEMORY_MB),
+                        )
+                        atexit.register(self._pool.close)
+                    except Exception as e:
+                        self.logger.warning(f"启动OCR子进程池失败：{e}，将在当前进程中执行OCR")
+            if self._pool is not None and self._pool.closed:
+                self.logger.warning("OCR子进程池已停止，改为在当前进程中执行OCR")
+                self._pool = None
+            return self._pool
+
+    @staticmethod
+    def _to_array(img):
+        """将图片转换为可写入共享内存的 np.ndarray，PIL 图片与 RapidOCR 的处理方式一致转换为 BGR"""
+        import numpy as np
+
+        if isinstance(img, Image.Image):
+            return np.ascontiguousarray(np.asarray(img.convert("RGB"))[:, :, ::-1])
+        return np.ascontiguousarray(img)
+
+    def _execute(self, img, max_retries=3):
+        """执行一次不使用缓存的识别：启用子进程池时在子进程中执行，否则在当前进程中执行"""
+        pool = self._get_pool()
+        if pool is not None:
+            try:
+                return pool.submit(self._to_array(img)).result()
+            except Exception as e:
+                self.logger.error(e)
+                return "{}"
+        with self._run_lock:
+            return self._run(img, max_retries)
+
+    def _execute_and_cache(self, img, max_retries, key):
+        results = self._execute(img, max_retries)
+        if key is not None and results != "{}":
+            self._cache_put(key, results)
+        return results
+
+    def _lookup(self, img, mode):
+        """
+        预处理图片并查询缓存，返回 (图片, 缓存键, 是否命中, 缓存结果)。
+        图片无法读取时与识别失败一样以 "{}" 作为结果直接返回，不再识别。
+        """
+        try:
+            img = self._prepare_image(img)
+        except Exception as e:
+            self.logger.error(e)
+            return img, None, True, "{}"
+        key = self._cache_key(img, mode) if OCR_CACHE_SIZE > 0 else None
+        if key is not None:
+            hit, results = self._cache_get(key)
+            if hit:
+                self.logger.debug(f"OCR缓存命中（命中 {self.cache_hits} 次，未命中 {self.cache_misses} 次）")
+                self.log_results(results)
+                return img, key, True, results
+        return img, key, False, None
+
+    def run(self, img, max_retries=3, mode="det_rec"):
+        """
+        执行OCR识别，支持Image对象、Frame对象、文件路径和np.ndarray对象。
+        像素完全相同的图片在 OCR_CACHE_MAX_AGE 秒内直接返回缓存的识别结果。
+        :param mode: 识别模式，作为缓存键的一部分。
+        """
+        img, key, hit, results = self._lookup(img, mode)
+        if hit:
+            return results
+        return self._execute_and_cache(img, max_retries, key)
+
+    def submit(self, img, max_retries=3, mode="det_rec"):
+        """
+        异步执行OCR识别，立即返回 Future，结果与 run 相同。
+        启用子进程池时在子进程中识别，否则在后台线程中识别，调用方可以在等待结果时继续截图。
+        """
+        img, key, hit, results = self._lookup(img, mode)
+        if hit:
+            future = Future()
+            future.set_result(results)
+            return future
+        if self._executor is None:
+            cfg = self._get_config()
+            workers = cfg.get_value("ocr_worker_processes", 0) if cfg is not None else 0
+            self._executor = ThreadPoolExecutor(max_workers=max(1, workers or 1), thread_name_prefix="OCR")
+        return self._executor.submit(self._execute_and_cache, img, max_retries, key)
+
+    def _run(self, img, max_retries=3):
+        """执行OCR识别，不使用缓存"""
+        self.instance_ocr()
+        try:
             # image_stream = io.BytesIO()
             # image.save(image_stream, format="PNG")
             # image_bytes = image_stream.getvalue()
@@ -688,11 +967,10 @@ class OCR:
                 try:
                     # 记录开始时间，用于检测 DML 是否过慢
                     start_time = time.monotonic()
-                    # 连续 OCR 压测表明，峰值内存主要就在这一条调用链里产生：
-                    # RapidOCR 会先构造包含原图引用和中间结果的输出对象，再转换
-                    # 为 JSON 风格的 Python 结构。后续 replace_strings/convert_format
-                    # 只是在此基础上继续处理，并不是主要的内存来源。
-                    original_dict = self.ocr(img).to_json()
+                    # RapidOCR 的输出对象引用了原图和中间结果，这里只取出检测框、文本和置信度，
+                    # 不再经过 to_json 和 convert_format 构造多层 Python 容器，输出对象随即由引用计数释放，
+                    # 长时间循环识别时内存不再依赖周期性 full GC 回落
+                    original_dict = OCRResult.from_output(self.ocr(img))
                     elapsed_time = time.monotonic() - start_time
                     # self.logger.debug(f"OCR执行耗时: {elapsed_time:.2f} 秒")
                     self.ocr_time += elapsed_time
@@ -705,13 +983,10 @@ class OCR:
                         self.exit_ocr()
                         self.instance_ocr(force_cpu=True)
                         # 用 CPU 模式重新执行一次
-                        original_dict = self.ocr(img).to_json()
+                        original_dict = OCRResult.from_output(self.ocr(img))
                         self.logger.info("已切换到 CPU 模式")
 
                     results = self.replace_strings(original_dict)
-                    # 成功路径最适合触发周期性回收：此时本轮 OCR 的业务处理已经完成，
-                    # 主流程通常不会再需要 RapidOCR 生成的中间对象，可以优先压低峰值。
-                    self._maybe_collect_garbage()
                     # 临时关闭 OpenVINO 定期重初始化入口，保留函数以便后续恢复。
                     # self._maybe_reinit_openvino()
                     # OpenVINO 执行后检查可用内存，不足 1GB 则降级
@@ -731,13 +1006,9 @@ class OCR:
                             self.exit_ocr()
                             self.instance_ocr(force_cpu=True)
                             try:
-                                original_dict = self.ocr(img).to_json()
+                                original_dict = OCRResult.from_output(self.ocr(img))
                                 self.logger.info("CPU 模式执行成功")
-                                results = self.replace_strings(original_dict)
-                                # 降级到 CPU 后仍会走同样的输出构造流程，因此同样保留
-                                # 周期性 full GC 以控制长时间循环时的峰值内存。
-                                self._maybe_collect_garbage()
-                                return results
+                                return self.replace_strings(original_dict)
                             except Exception as cpu_e:
                                 self.logger.error(f"CPU 模式仍然失败: {cpu_e}")
                                 raise
@@ -747,11 +1018,9 @@ class OCR:
                         self.exit_ocr()
                         self.instance_ocr(force_onnx=True)
                         try:
-                            original_dict = self.ocr(img).to_json()
+                            original_dict = OCRResult.from_output(self.ocr(img))
                             self.logger.info("已切换到 ONNXRuntime 模式")
-                            results = self.replace_strings(original_dict)
-                            self._maybe_collect_garbage()
-                            return results
+                            return self.replace_strings(original_dict)
                         except Exception as onnx_e:
                             self.logger.error(f"ONNXRuntime 模式仍然失败: {onnx_e}")
                             raise
@@ -764,7 +1033,7 @@ class OCR:
                 self.exit_ocr()
                 self.instance_ocr(force_cpu=True)
                 try:
-                    original_dict = self.ocr(img).to_json()
+                    original_dict = OCRResult.from_output(self.ocr(img))
                     self.logger.info("CPU 模式执行成功")
                     return self.replace_strings(original_dict)
                 except Exception as e:
@@ -779,58 +1048,136 @@ class OCR:
             self.logger.error(e)
             return "{}"
 
+    @staticmethod
+    def _compile_replacement_group(rules, ordered_by_length):
+        """
+        将一组替换规则的原字符串编译为带命名分组的正则，分组名 r{i} 对应规则下标 i。
+        ordered_by_length 为 True 时长的原字符串优先，并包在前瞻中以便找出每个位置上的匹配（包括重叠的）；
+        否则按规则顺序排列，用于 sub 一次扫描。没有规则时返回 None。
+        """
+        indexes = [i for i, (old_str, _) in enumerate(rules) if old_str]
+        if not indexes:
+            return None
+        if ordered_by_length:
+            indexes.sort(key=lambda i: len(rules[i][0]), reverse=True)
+        alternation = "|".join(f"(?P<r{i}>{re.escape(rules[i][0])})" for i in indexes)
+        return re.compile(f"(?=(?:{alternation}))" if ordered_by_length else alternation)
+
+    def _get_replacement_rules(self):
+        """
+        编译替换规则，replacements 变化时重新编译，返回
+        (直接替换正则, 各直接规则 (原字符串, 目标字符串, 替换结果), 条件替换正则, 各条件规则 (原字符串, 目标字符串, 包含的规则, 后续规则))。
+
+        直接替换按配置顺序逐条执行，规则 i 的目标字符串还会被排在它之后的规则继续替换，
+        因此预先算出规则 i 经后续规则替换后的结果，扫描时每个匹配直接换成该结果。
+        条件替换需要检查整行文本，只对文本中出现的规则按配置顺序执行：
+        前瞻扫描在每个位置只报告最长的原字符串，其余原字符串是它的子串，由“包含的规则”补上；
+        某条规则替换后，目标字符串中出现的排在它之后的规则由“后续规则”补上。
+        """
+        if self._replacement_source is not self.replacements:
+            direct = [(old_str, new_str) for old_str, new_str in (self.replacements.get("direct", {}) or {}).items() if old_str]
+            conditional = [(old_str, new_str) for old_str, new_str in (self.replacements.get("conditional", {}) or {}).items() if old_str]
+
+            direct_rules = []
+            for i, (old_str, new_str) in enumerate(direct):
+                output = new_str
+                for later_old, later_new in direct[i + 1:]:
+                    output = output.replace(later_old, later_new)
+                direct_rules.append((old_str, new_str, output))
+
+            conditional_rules = []
+            for i, (old_str, new_str) in enumerate(conditional):
+                contained = tuple(j for j, (other, _) in enumerate(conditional) if j != i and other in old_str)
+                followers = tuple(j for j in range(i + 1, len(conditional)) if conditional[j][0] in new_str)
+                conditional_rules.append((old_str, new_str, contained, followers))
+
+            self._replacement_rules = (
+                self._compile_replacement_group(direct, False),
+                direct_rules,
+                self._compile_replacement_group(conditional, True),
+                conditional_rules,
+            )
+            self._replacement_source = self.replacements
+        return self._replacement_rules
+
+    def _replace_text(self, orig, rules):
+        """按替换规则替换单行文本，返回替换后的文本"""
+        direct_pattern, direct_rules, conditional_pattern, conditional_rules = rules
+        new_text = orig
+        details = []
+
+        # 直接替换：一次扫描，每个匹配按命名分组分派到对应规则
+        if direct_pattern is not None:
+            counts = {}
+
+            def dispatch(match):
+                index = int(match.lastgroup[1:])
+                counts[index] = counts.get(index, 0) + 1
+                return direct_rules[index][2]
+
+            new_text = direct_pattern.sub(dispatch, new_text)
+            for index in sorted(counts):
+                old_str, new_str, _ = direct_rules[index]
+                details.append(f'direct: "{old_str}" -> "{new_str}" ({counts[index]}次)')
+
+        # 条件替换：仅在目标替换字符串不已存在时才执行，只检查文本中出现的规则，按配置顺序执行
+        if conditional_pattern is not None:
+            pending = set()
+            for match in conditional_pattern.finditer(new_text):
+                index = int(match.lastgroup[1:])
+                pending.add(index)
+                pending.update(conditional_rules[index][2])
+            heap = list(pending)
+            heapq.heapify(heap)
+            while heap:
+                old_str, new_str, _, followers = conditional_rules[heapq.heappop(heap)]
+                # 只有在 new_str 不在文本中且 old_str 存在时才替换
+                if new_str not in new_text and old_str in new_text:
+                    count = new_text.count(old_str)
+                    new_text = new_text.replace(old_str, new_str)
+                    details.append(f'conditional: "{old_str}" -> "{new_str}" ({count}次)')
+                    for follower in followers:
+                        if follower not in pending:
+                            pending.add(follower)
+                            heapq.heappush(heap, follower)
+
+        # 如果发生了替换，记录详细信息
+        if new_text != orig:
+            try:
+                self.logger.debug(f'OCR文本已替换: 原始内容 "{orig}" 替换内容 "{new_text}"')
+                self.logger.debug(f'替换细节: {details}')
+            except Exception:
+                # 避免日志记录本身抛出异常影响流程
+                self.logger.debug(f'OCR文本已替换 (日志格式化失败)')
+        return new_text
+
     def replace_strings(self, results):
-        """替换OCR结果中的错误字符串，并记录所有替换详情到日志"""
+        """替换OCR结果中的错误字符串，并记录所有替换详情到日志。支持 OCRResult 和 {"txt": ...} 字典列表"""
         if results is None or len(results) == 0:
             self.logger.debug("OCR识别结果为空")
             return results
 
         if self.replacements is not None:
-            direct = self.replacements.get("direct", {}) or {}
-            conditional = self.replacements.get("conditional", {}) or {}
-            for item in results:
-                # 跳过没有文本键的项
-                if not isinstance(item, dict) or "txt" not in item:
-                    continue
-                orig = item["txt"]
-                new_text = orig
-                details = []
-
-                # 直接替换：无条件替换所有匹配项
-                for old_str, new_str in direct.items():
-                    if not old_str:
-                        continue
-                    count = new_text.count(old_str)
-                    if count > 0:
-                        new_text = new_text.replace(old_str, new_str)
-                        details.append(f'direct: "{old_str}" -> "{new_str}" ({count}次)')
-
-                # 条件替换：仅在目标替换字符串不已存在时才执行
-                for old_str, new_str in conditional.items():
-                    if not old_str:
+            rules = self._get_replacement_rules()
+            if isinstance(results, OCRResult):
+                txts = results.txts
+                for i, orig in enumerate(txts):
+                    txts[i] = self._replace_text(orig, rules)
+            else:
+                for item in results:
+                    # 跳过没有文本键的项
+                    if not isinstance(item, dict) or "txt" not in item:
                         continue
-                    # 只有在 new_str 不在文本中且 old_str 存在时才替换
-                    if new_str not in new_text and old_str in new_text:
-                        count = new_text.count(old_str)
-                        new_text = new_text.replace(old_str, new_str)
-                        details.append(f'conditional: "{old_str}" -> "{new_str}" ({count}次)')
-
-                # 如果发生了替换，更新并记录详细信息
-                if new_text != orig:
-                    item["txt"] = new_text
-                    try:
-                        self.logger.debug(f'OCR文本已替换: 原始内容 "{orig}" 替换内容 "{new_text}"')
-                        self.logger.debug(f'替换细节: {details}')
-                    except Exception:
-                        # 避免日志记录本身抛出异常影响流程
-                        self.logger.debug(f'OCR文本已替换 (日志格式化失败)')
+                    item["txt"] = self._replace_text(item["txt"], rules)
 
         self.log_results(results)
         return results
 
     def log_results(self, modified_dict):
         """记录OCR识别结果"""
-        if modified_dict and len(modified_dict) > 0 and "txt" in modified_dict[0]:
+        if isinstance(modified_dict, OCRResult):
+            self.logger.debug(f"OCR识别结果: {modified_dict.txts}")
+        elif modified_dict and len(modified_dict) > 0 and "txt" in modified_dict[0]:
             print_list = [item["txt"] for item in modified_dict]
             self.logger.debug(f"OCR识别结果: {print_list}")
         else:
@@ -848,3 +1195,135 @@ class OCR:
     def recognize_multi_lines(self, image):
         """识别图片中的多行文本"""
         return self.convert_format(self.run(image))
+
+    def _run_rec(self, images):
+        """
+        仅运行文字识别模型（跳过文字检测和方向分类），所有图片在一次调用中批量识别。
+        启用子进程池时整批交给一个子进程识别，主进程不加载识别模型。
+        """
+        pool = self._get_pool()
+        if pool is not None:
+            return pool.submit([self._to_array(img) for img in images], mode="rec").result()
+
+        from rapidocr.ch_ppocr_rec import TextRecInput
+
+        with self._run_lock:
+            self.instance_ocr()
+            # 识别模型内部会把每张图片缩放到固定高度，并按宽高比排序后分批推理
+            imgs = [self.ocr.load_img(img) for img in images]
+            start_time = time.monotonic()
+            rec_res = self.ocr.text_rec(TextRecInput(img=imgs))
+            self.ocr_time += time.monotonic() - start_time
+            self.ocr_count += 1
+        txts = rec_res.txts or [""] * len(imgs)
+        return [{"txt": txt, "score": float(score)} for txt, score in zip(txts, rec_res.scores)]
+
+    def recognize_lines(self, images, blacklist=None):
+        """
+        识别多张只包含单行文本的图片（如已知位置的标题、数值），跳过文字检测，一次推理完成。
+        识别结果为空、置信度过低或命中黑名单的图片改用 recognize_single_line 完整识别。
+        :param images: 图片列表，支持的类型与 run 相同。
+        :param blacklist: 需要过滤掉的文本列表。
+        :return: 与 images 一一对应的 (text, score) 或 None 列表。
+        """
+        images = [self._prepare_image(img) for img in images]
+        keys = [self._cache_key(img, "rec") if OCR_CACHE_SIZE > 0 else None for img in images]
+        items = [None] * len(images)
+        pending = []
+        for i, key in enumerate(keys):
+            if key is not None:
+                hit, cached = self._cache_get(key)
+                if hit:
+                    items[i] = cached[0]
+                    continue
+            pending.append(i)
+
+        if pending:
+            try:
+                rec_items = self._run_rec([images[i] for i in pending])
+            except Exception as e:
+                self.logger.debug(f"单行快速识别失败，改用完整识别：{e}")
+                rec_items = [None] * len(pending)
+            for i, item in zip(pending, rec_items):
+                if item is not None:
+                    item = self.replace_strings([item])[0]
+                    if keys[i] is not None:
+                        self._cache_put(keys[i], [item])
+                items[i] = item
+
+        lines = []
+        for image, item in zip(images, items):
+            text = item["txt"].strip() if item else ""
+            if text and item["score"] >= OCR_LINE_MIN_SCORE and (not blacklist or text not in blacklist):
+                lines.append((text, item["score"]))
+            else:
+                lines.append(self.recognize_single_line(image, blacklist))
+        return lines
+
+    def recognize_line(self, image, blacklist=None):
+        """识别只包含单行文本的图片，跳过文字检测，详见 recognize_lines"""
+        return self.recognize_lines([image], blacklist)[0]
+
+    def recognize_regions(self, image, regions):
+        """
+        在同一张图片上识别多个区域的文本。各区域四周填充后纵向拼接成一张图，只运行一次检测和识别。
+        :param image: 图片，支持的类型与 run 相同（文件路径除外）。
+        :param regions: 区域列表，每项为像素坐标 (x0, y0, x1, y1)。
+        :return: 与 regions 一一对应的识别结果列表，每项格式与 recognize_multi_lines 相同，坐标为原图坐标。
+        """
+        import cv2
+        import numpy as np
+
+        image = self._prepare_image(image)
+        if isinstance(image, Image.Image):
+            image = cv2.cvtColor(np.asarray(image.convert("RGB")), cv2.COLOR_RGB2BGR)
+        height, width = image.shape[:2]
+        pad = OCR_REGION_PADDING
+
+        tiles = []
+        for x0, y0, x1, y1 in regions:
+            x0, y0 = max(0, int(x0)), max(0, int(y0))
+            x1, y1 = min(width, int(x1)), min(height, int(y1))
+            if x1 <= x0 or y1 <= y0:
+                tiles.append(None)
+                continue
+            tile = cv2.copyMakeBorder(image[y0:y1, x0:x1], pad, pad, pad, pad, cv2.BORDER_REPLICATE)
+            tiles.append((tile, (x0, y0, x1, y1)))
+
+        # 按最大高度分批拼接
+        batches, batch, batch_height = [], [], 0
+        for index, tile in enumerate(tiles):
+            if tile is None:
+                continue
+            tile_height = tile[0].shape[0]
+            if batch and batch_height + tile_height > OCR_REGION_BATCH_MAX_HEIGHT:
+                batches.append(batch)
+                batch, batch_height = [], 0
+            batch.append(index)
+            batch_height += tile_height
+        if batch:
+            batches.append(batch)
+
+        results = [[] for _ in regions]
+        for batch in batches:
+            canvas_width = max(tiles[i][0].shape[1] for i in batch)
+            canvas_height = sum(tiles[i][0].shape[0] for i in batch)
+            canvas = np.zeros((canvas_height, canvas_width, 3), dtype=np.uint8)
+            offsets = []
+            offset_y = 0
+            for i in batch:
+                tile = tiles[i][0]
+                canvas[offset_y:offset_y + tile.shape[0], :tile.shape[1]] = tile
+                offsets.append((i, offset_y, offset_y + tile.shape[0]))
+                offset_y += tile.shape[0]
+
+            for item in self.convert_format(self.run(canvas)) or []:
+                box, text = item
+                center_y = sum(point[1] for point in box) / len(box)
+                for i, top, bottom in offsets:
+                    if top <= center_y < bottom:
+                        x0, y0, x1, y1 = tiles[i][1]
+                        mapped = [[min(max(point[0] - pad + x0, x0), x1), min(max(point[1] - top - pad + y0, y0), y1)] for point in box]
+                        results[i].append([mapped, text])
+                        break
+        return results
@@ -0,0 +1,313 @@
+import time
+import itertools
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+import numpy as np
+import psutil
+
+
+# 子进程处理多少次请求后重启，0 表示不限制
+OCR_WORKER_MAX_REQUESTS = 500
+# 子进程内存（RSS，MB）超过此值后重启，0 表示不限制
+OCR_WORKER_MAX_MEMORY_MB = 1500
+# 结果收集线程检查子进程存活状态的间隔（秒）
+OCR_WORKER_POLL_INTERVAL = 0.5
+# 子进程连续多少次未完成任何请求就退出后放弃子进程池（通常是子进程中无法初始化 OCR）
+OCR_WORKER_MAX_START_FAILURES = 3
+
+
+def _worker_main(task_conn, result_conn, replacements, max_requests, max_memory_mb):
+    """
+    OCR 子进程入口：持有独立的 RapidOCR 实例，从共享内存读取图片并返回识别结果。
+    模式为 "det_rec" 时完整识别一张图片，为 "rec" 时对多张单行图片只运行识别模型。
+    达到请求次数或内存上限后在返回结果时通知主进程并退出，由主进程重新启动。
+    """
+    from module.logger import log
+    from module.ocr.ocr import OCR
+
+    ocr = OCR(log, replacements)
+    ocr._pool_checked = True  # 子进程内直接识别，不再创建子进程池
+    ocr.warm_up()
+    process = psutil.Process()
+    block = None
+    handled = 0
+    try:
+        while True:
+            task = task_conn.recv()
+            if task is None:
+                break
+            request_id, mode, shm_name, layout = task
+            try:
+                if block is None or block.name != shm_name:
+                    if block is not None:
+                        block.close()
+                    block = shared_memory.SharedMemory(name=shm_name)
+                images = [np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset) for offset, shape, dtype in layout]
+                try:
+                    results = ocr._run_rec(images) if mode == "rec" else ocr._run(images[0])
+                    error = None
+                finally:
+                    del images  # 释放对共享内存的引用，否则无法关闭
+            except Exception as e:
+                results, error = None, f"{type(e).__name__}: {e}"
+
+            handled += 1
+            recycle = max_requests > 0 and handled >= max_requests
+            if not recycle and max_memory_mb > 0:
+                recycle = process.memory_info().rss > max_memory_mb * 1024 * 1024
+            result_conn.send((request_id, results, error, recycle))
+            if recycle:
+                break
+    finally:
+        if block is not None:
+            block.close()
+        ocr.exit_ocr()
+
+
+class _OCRWorker:
+    """主进程中记录的单个 OCR 子进程状态。"""
+
+    def __init__(self, process, conn, result_conn):
+        self.process = process
+        self.conn = conn
+        self.result_conn = result_conn
+        self.shm = None  # 向该子进程传递图片的共享内存
+        self.request = None  # 正在处理的 (请求编号, Future)
+        self.handled = 0
+
+
+class OCRWorkerPool:
+    """
+    OCR 子进程池。
+
+    每个子进程持有独立的 RapidOCR 实例，图片通过 multiprocessing.shared_memory 传递，不序列化像素数据；
+    识别结果通过 Future 返回，调用方可以在等待识别时继续截图或处理其他逻辑。
+    每个子进程使用独立的管道返回结果，不共用 multiprocessing.Queue：子进程在写入共享队列时崩溃会一直占用队列的写锁，
+    导致其他子进程的结果都无法返回。
+    子进程达到请求次数或内存上限后自动重启，OpenVINO 等引擎的内存增长被限制在子进程内。
+    """
+
+    def __init__(self, processes, logger, replacements=None,
+                 max_requests=OCR_WORKER_MAX_REQUESTS, max_memory_mb=OCR_WORKER_MAX_MEMORY_MB):
+        """
+        :param processes: 子进程数量。
+        :param logger: 日志记录器。
+        :param replacements: OCR 文本替换规则，在子进程中应用。
+        :param max_requests: 子进程处理多少次请求后重启，0 表示不限制。
+        :param max_memory_mb: 子进程内存超过多少 MB 后重启，0 表示不限制。
+        """
+        self.logger = logger
+        self.replacements = replacements
+        self.max_requests = max_requests
+        self.max_memory_mb = max_memory_mb
+        # 使用 spawn 保证各平台行为一致，也避免 fork 复制主进程中已加载的引擎
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._pending = deque()  # 等待空闲子进程的 (请求编号, 模式, 图片列表, Future)
+        self._request_ids = itertools.count()
+        self._closed = False
+        self._start_failures = 0
+        self._workers = [self._start_worker(i) for i in range(max(1, int(processes)))]
+        self._collector = threading.Thread(target=self._collect, name="OCRWorkerPool", daemon=True)
+        self._collector.start()
+        self.logger.debug(f"OCR 子进程池已启动，进程数：{len(self._workers)}")
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def _start_worker(self, worker_id):
+        parent_conn, child_conn = self._context.Pipe()
+        result_recv, result_send = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, result_send, self.replacements, self.max_requests, self.max_memory_mb),
+            name=f"OCRWorker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        result_send.close()
+        return _OCRWorker(process, parent_conn, result_recv)
+
+    def submit(self, image, mode="det_rec"):
+        """
+        提交图片进行识别。
+        :param image: mode 为 "det_rec" 时为一张 BGR 或灰度格式的 np.ndarray，为 "rec" 时为多张单行图片的列表。
+        :param mode: "det_rec" 完整识别，"rec" 只运行识别模型。
+        :return: Future，结果与 OCR._run 或 OCR._run_rec 的返回值相同。
+        """
+        images = [np.ascontiguousarray(img) for img in (image if mode == "rec" else [image])]
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("OCR 子进程池已关闭")
+            self._pending.append((next(self._request_ids), mode, images, future))
+            self._dispatch()
+        return future
+
+    def _dispatch(self):
+        """将等待中的请求分配给空闲子进程，调用方需持有锁。"""
+        for worker in self._workers:
+            if not self._pending:
+                return
+            if worker.request is not None or not worker.process.is_alive():
+                continue
+            request_id, mode, images, future = self._pending.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                layout = self._write_images(worker, images)
+                worker.conn.send((request_id, mode, worker.shm.name, layout))
+                worker.request = (request_id, future)
+            except Exception as e:
+                future.set_exception(e)
+
+    @staticmethod
+    def _write_images(worker, images):
+        """
+        将图片依次写入子进程对应的共享内存，容量不足时重新分配。
+        :return: 每张图片的 (偏移, 形状, 数据类型)。
+        """
+        layout, size = [], 0
+        for image in images:
+            layout.append((size, image.shape, image.dtype.str))
+            size += -(-image.nbytes // 8) * 8  # 按 8 字节对齐
+        if worker.shm is None or worker.shm.size < size:
+            if worker.shm is not None:
+                worker.shm.close()
+                worker.shm.unlink()
+            worker.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for image, (offset, shape, dtype) in zip(images, layout):
+            np.ndarray(shape, dtype=dtype, buffer=worker.shm.buf, offset=offset)[...] = image
+        return layout
+
+    def _collect(self):
+        """结果收集线程：完成 Future、重启需要回收或异常退出的子进程。"""
+        last_check = time.monotonic()
+        while True:
+            if time.monotonic() - last_check >= OCR_WORKER_POLL_INTERVAL:
+                if not self._check_workers():
+                    return
+                last_check = time.monotonic()
+            with self._lock:
+                if self._closed:
+                    return
+                conns = {worker.result_conn: worker_id for worker_id, worker in enumerate(self._workers)}
+            try:
+                ready = wait(list(conns), timeout=OCR_WORKER_POLL_INTERVAL)
+            except (OSError, ValueError):
+                continue  # 池关闭时管道已被关闭，下一轮循环退出
+            for conn in ready:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    # 子进程已退出，等待退出码后立即检查并重启，避免管道一直处于可读状态导致空转
+                    self._workers[conns[conn]].process.join(OCR_WORKER_POLL_INTERVAL)
+                    if not self._check_workers():
+                        return
+                    last_check = time.monotonic()
+                    break
+                self._handle_result(conns[conn], *message)
+
+    def _handle_result(self, worker_id, request_id, results, error, recycle):
+        """完成子进程返回的请求，达到回收条件时重启该子进程。"""
+        stale = None
+        with self._lock:
+            worker = self._workers[worker_id]
+            if worker.request is None or worker.request[0] != request_id:
+                return  # 子进程已被判定为异常退出并重启，丢弃过期的结果
+            future = worker.request[1]
+            worker.request = None
+            worker.handled += 1
+            if recycle and not self._closed:
+                self.logger.debug(f"OCR 子进程 {worker_id} 已处理 {worker.handled} 次请求，正在重启以释放内存")
+                stale = self._restart_worker(worker_id)
+            self._dispatch()
+        if stale is not None:
+            self._stop_worker(stale)
+
+        if error is None:
+            future.set_result(results)
+        else:
+            future.set_exception(RuntimeError(f"OCR 子进程识别失败：{error}"))
+
+    def _check_workers(self):
+        """重启异常退出的子进程，池已关闭时返回 False。"""
+        failed, stale = [], []
+        with self._lock:
+            if self._closed:
+                return False
+            for worker_id, worker in enumerate(self._workers):
+                # 正常退出（退出码 0）是达到回收条件，由收到结果时重启
+                if worker.process.is_alive() or worker.process.exitcode == 0:
+                    continue
+                self.logger.warning(f"OCR 子进程 {worker_id} 异常退出（退出码 {worker.process.exitcode}），正在重启")
+                if worker.request is not None:
+                    failed.append(worker.request[1])
+                    worker.request = None
+                self._start_failures = self._start_failures + 1 if worker.handled == 0 else 0
+                if self._start_failures >= OCR_WORKER_MAX_START_FAILURES:
+                    self.logger.error(f"OCR 子进程连续 {self._start_failures} 次启动失败，停止使用子进程池")
+                    break
+                stale.append(self._restart_worker(worker_id))
+            else:
+                self._dispatch()
+        for worker in stale:
+            self._stop_worker(worker)
+        for future in failed:
+            future.set_exception(RuntimeError("OCR 子进程异常退出"))
+        if self._start_failures >= OCR_WORKER_MAX_START_FAILURES:
+            self.close()
+            return False
+        return True
+
+    def _restart_worker(self, worker_id):
+        """
+        用新的子进程替换旧的子进程，调用方需持有锁。
+        :return: 被替换的旧子进程，调用方需在释放锁后调用 _stop_worker，避免等待旧进程退出时阻塞其他请求。
+        """
+        old = self._workers[worker_id]
+        self._workers[worker_id] = self._start_worker(worker_id)
+        return old
+
+    @staticmethod
+    def _stop_worker(worker, timeout=5):
+        try:
+            worker.conn.send(None)
+        except Exception:
+            pass
+        worker.process.join(timeout)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join(timeout)
+        worker.conn.close()
+        worker.result_conn.close()
+        if worker.shm is not None:
+            worker.shm.close()
+            worker.shm.unlink()
+            worker.shm = None
+
+    def close(self):
+        """关闭所有子进程，未完成的请求以异常结束。"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            pending = [future for _, _, _, future in self._pending]
+            pending += [worker.request[1] for worker in self._workers if worker.request is not None]
+            self._pending.clear()
+            for worker in self._workers:
+                worker.request = None
+            workers = list(self._workers)
+        for worker in workers:
+            self._stop_worker(worker)
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("OCR 子进程池已关闭"))
+        self.logger.debug("OCR 子进程池已关闭")
@@ -0,0 +1,56 @@
+class OCRResult:
+    """
+    一次 OCR 识别的结果。
+
+    直接保存 RapidOCR 输出中的检测框数组、文本和置信度，不再通过 to_json 为每一行构造字典，
+    也不再转换为嵌套列表。按下标或遍历访问时才生成 [box, (text, score)] 格式的行，
+    与 recognize_multi_lines 原先返回的列表兼容。
+    """
+
+    __slots__ = ('boxes', 'txts', 'scores')
+
+    def __init__(self, boxes, txts, scores):
+        """
+        :param boxes: 检测框，形状为 (N, 4, 2) 的 np.ndarray。
+        :param txts: 文本列表，文本替换直接修改此列表。
+        :param scores: 置信度序列。
+        """
+        self.boxes = boxes
+        self.txts = txts
+        self.scores = scores
+
+    @classmethod
+    def from_output(cls, output):
+        """
+        从 RapidOCR 的输出创建，未识别到文字时返回 None（与 to_json 一致）。
+        只保留检测框、文本和置信度，输出中的原图和中间结果随 output 一起释放。
+        """
+        if output is None or output.boxes is None or output.txts is None or output.scores is None:
+            return None
+        return cls(output.boxes, list(output.txts), tuple(output.scores))
+
+    def _line(self, i):
+        return [self.boxes[i].tolist(), (self.txts[i], self.scores[i])]
+
+    def __len__(self):
+        return len(self.txts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._line(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("OCRResult index out of range")
+        return self._line(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._line(i)
+
+    def copy(self):
+        """复制结果，检测框数组不会被修改，与原结果共用"""
+        return OCRResult(self.boxes, list(self.txts), self.scores)
+
+    def __repr__(self):
+        return f"OCRResult({self.txts!r})"
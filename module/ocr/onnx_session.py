@@ -0,0 +1,188 @@
+import os
+import glob
+import hashlib
+import platform
+import threading
+
+import numpy as np
+
+
+# 保存图优化后模型的目录，再次加载时跳过大部分图优化
+ONNX_OPTIMIZED_MODEL_DIR = "./assets/model/optimized"
+# 预先分配输出缓冲区支持的输出类型
+ONNX_OUTPUT_DTYPES = {
+    "tensor(float)": np.float32,
+    "tensor(float16)": np.float16,
+    "tensor(int64)": np.int64,
+    "tensor(int32)": np.int32,
+}
+
+
+def get_onnx_thread_counts():
+    """
+    ONNXRuntime 会话的线程数，OCR 引擎和 YOLO 会话共用，避免两个运行时各自按核心数创建线程池而争抢 CPU。
+    :return: (intra_op_num_threads, inter_op_num_threads)
+    """
+    try:
+        from module.config import cfg
+        threads = int(cfg.get_value('onnx_intra_op_threads', 0) or 0)
+    except Exception:
+        threads = 0
+    if threads <= 0:
+        # 默认各占一半逻辑核心，与 ONNXRuntime 默认按物理核心数创建线程大致相当
+        threads = max(1, (os.cpu_count() or 2) // 2)
+    # 模型均为顺序执行的单分支网络，算子间并行没有收益
+    return threads, 1
+
+
+def get_rapidocr_thread_params():
+    """返回传给 RapidOCR 的线程配置，与 create_session_options 使用相同的线程数。"""
+    intra_op_threads, inter_op_threads = get_onnx_thread_counts()
+    return {
+        "EngineConfig.onnxruntime.intra_op_num_threads": intra_op_threads,
+        "EngineConfig.onnxruntime.inter_op_num_threads": inter_op_threads,
+        "EngineConfig.openvino.inference_num_threads": intra_op_threads,
+    }
+
+
+def create_session_options(optimized_model_path=None):
+    """
+    创建共用配置的 SessionOptions。
+    :param optimized_model_path: 保存图优化后模型的路径，为 None 时不保存。
+    """
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads, options.inter_op_num_threads = get_onnx_thread_counts()
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    # 与 RapidOCR 一致关闭内存池，避免不同输入尺寸下内存只增不减
+    options.enable_cpu_mem_arena = False
+    if optimized_model_path:
+        # 只保存与硬件无关的优化结果，布局相关的优化在每次加载时重新执行
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+        options.optimized_model_filepath = optimized_model_path
+    else:
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return options
+
+
+class OnnxSession:
+    """
+    封装 onnxruntime.InferenceSession。
+
+    使用 create_session_options 的共用配置；首次加载时保存图优化后的模型，模型文件和 ONNXRuntime 版本不变时直接加载优化后的模型；
+    输入输出通过 IO 绑定传递：输入缓冲区在多次推理之间复用，调用方直接把预处理结果写入缓冲区；
+    形状固定的输出预先分配缓冲区并只绑定一次。
+    """
+
+    def __init__(self, model_path, logger, providers=None):
+        """
+        :param model_path: 模型路径。
+        :param logger: 日志记录器。
+        :param providers: 执行提供程序列表，默认使用 CPU。
+        """
+        import onnxruntime as ort
+
+        self.model_path = model_path
+        self.logger = logger
+        self.providers = providers or ["CPUExecutionProvider"]
+        self._lock = threading.Lock()
+        self._input_buffers = {}  # {形状: np.ndarray}
+        self.session = self._load(ort)
+        self._input_name = self.session.get_inputs()[0].name
+        self._output_buffers = []
+        self._binding = self.session.io_binding()
+        for output in self.session.get_outputs():
+            dtype = ONNX_OUTPUT_DTYPES.get(output.type)
+            if dtype is not None and all(isinstance(dim, int) and dim > 0 for dim in output.shape):
+                buffer = np.empty(output.shape, dtype=dtype)
+                self._binding.bind_output(output.name, "cpu", 0, dtype, buffer.shape, buffer.ctypes.data)
+                self._output_buffers.append(buffer)
+            else:
+                # 动态形状的输出由 ONNXRuntime 每次分配
+                self._binding.bind_output(output.name, "cpu")
+
+    def _optimized_model_path(self, ort):
+        """优化后模型的缓存路径，模型文件、ONNXRuntime 版本、平台或执行提供程序变化时路径随之变化。"""
+        from module.config import cfg
+
+        if not cfg.get_value('onnx_optimized_model_cache', True):
+            return None
+        stat = os.stat(self.model_path)
+        fingerprint = "|".join(str(part) for part in (
+            os.path.abspath(self.model_path), stat.st_size, stat.st_mtime_ns,
+            ort.__version__, platform.system(), platform.machine(), ",".join(self.providers),
+        ))
+        stem = os.path.splitext(os.path.basename(self.model_path))[0]
+        digest = hashlib.md5(fingerprint.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(ONNX_OPTIMIZED_MODEL_DIR, f"{stem}.{digest}.onnx")
+
+    def _load(self, ort):
+        try:
+            optimized_path = self._optimized_model_path(ort)
+        except OSError:
+            optimized_path = None
+
+        if optimized_path and os.path.exists(optimized_path):
+            try:
+                session = ort.InferenceSession(optimized_path, create_session_options(), providers=self.providers)
+                self.logger.debug(f"已加载优化后的模型：{optimized_path}")
+                return session
+            except Exception as e:
+                self.logger.warning(f"加载优化后的模型失败，改用原模型：{e}")
+                self._remove(optimized_path)
+
+        if optimized_path:
+            stem = os.path.splitext(os.path.basename(self.model_path))[0]
+            # 清理同一模型旧版本的优化结果
+            for stale in glob.glob(os.path.join(ONNX_OPTIMIZED_MODEL_DIR, f"{stem}.*.onnx")):
+                self._remove(stale)
+            try:
+                os.makedirs(ONNX_OPTIMIZED_MODEL_DIR, exist_ok=True)
+                return ort.InferenceSession(self.model_path, create_session_options(optimized_path), providers=self.providers)
+            except Exception as e:
+                self.logger.warning(f"保存优化后的模型失败：{e}")
+                self._remove(optimized_path)
+
+        return ort.InferenceSession(self.model_path, create_session_options(), providers=self.providers)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get_inputs(self):
+        return self.session.get_inputs()
+
+    def get_outputs(self):
+        return self.session.get_outputs()
+
+    def input_buffer(self, shape, dtype=np.float32):
+        """
+        获取可复用的输入缓冲区，调用方写入预处理结果后调用 run 推理。
+        同一形状的缓冲区在多次推理之间复用，写入与推理需在同一线程中完成。
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+        buffer = self._input_buffers.get(key)
+        if buffer is None:
+            buffer = np.empty(shape, dtype=dtype)
+            self._input_buffers[key] = buffer
+        return buffer
+
+    def run(self, input_tensor):
+        """
+        使用 IO 绑定执行推理。
+        :param input_tensor: 输入张量，通常为 input_buffer 返回的缓冲区。
+        :return: 各输出的 np.ndarray 列表，不与后续推理共用内存。
+        """
+        input_tensor = np.ascontiguousarray(input_tensor)
+        with self._lock:
+            self._binding.bind_cpu_input(self._input_name, input_tensor)
+            try:
+                self.session.run_with_iobinding(self._binding)
+                # 输出缓冲区会被下一次推理覆盖，返回副本
+                return self._binding.copy_outputs_to_cpu()
+            finally:
+                self._binding.clear_binding_inputs()
@@ -0,0 +1,79 @@
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class OCRTextIndex:
+    """
+    OCR 识别结果的文本索引，用于在同一份结果中多次查找文本。
+
+    精确匹配通过 文本 -> 行号 字典直接查找；包含匹配在所有文本以换行拼接成的字符串上用 str.find 扫描，
+    再按每行的起始偏移二分定位行号，未命中的目标只需一次 C 层扫描即可返回。
+    返回的行号均为升序，与按顺序遍历 OCR 结果的匹配顺序一致。
+    """
+
+    def __init__(self, ocr_result):
+        """
+        :param ocr_result: OCR 识别结果，OCRResult 或 [[box, (text, score)], ...]。
+        """
+        # OCRResult 直接提供文本列表，无需逐行生成 [box, (text, score)]
+        texts = getattr(ocr_result, "txts", None)
+        self.texts = list(texts) if texts is not None else [item[1][0] for item in ocr_result]
+        # 每行在拼接字符串中的起始偏移；OCR 文本不含换行，目标文本跨越两行时不会被误判为包含
+        self._starts = [0, *accumulate(len(text) + 1 for text in self.texts[:-1])]
+        self._joined = "\n".join(self.texts)
+        self._exact = None  # 精确匹配字典，首次精确查找时构建
+
+    def _exact_lines(self, target):
+        if self._exact is None:
+            self._exact = {}
+            for i, text in enumerate(self.texts):
+                self._exact.setdefault(text, []).append(i)
+        return self._exact.get(target)
+
+    def find(self, target, include):
+        """
+        查找匹配目标文本的行。
+        :param target: 目标文本。
+        :param include: 为True时查找包含目标文本的行，否则查找与目标文本完全相同的行。
+        :return: 行号列表（升序）。
+        """
+        if not include:
+            return self._exact_lines(target) or []
+        if not self.texts or "\n" in target:
+            return []
+
+        lines = []
+        pos = self._joined.find(target)
+        while pos != -1:
+            line = bisect_right(self._starts, pos) - 1
+            lines.append(line)
+            if line + 1 >= len(self._starts):
+                break
+            pos = self._joined.find(target, self._starts[line + 1])
+        return lines
+
+    def find_first(self, targets, include):
+        """
+        按目标顺序查找，返回第一个有匹配的目标及其第一个匹配行。
+        :return: (目标文本, 行号)，未找到时返回 (None, None)。
+        """
+        for target in targets:
+            if include:
+                pos = self._joined.find(target) if self.texts and "\n" not in target else -1
+                if pos != -1:
+                    return target, bisect_right(self._starts, pos) - 1
+            else:
+                lines = self._exact_lines(target)
+                if lines:
+                    return target, lines[0]
+        return None, None
+
+    def find_any(self, targets, include):
+        """
+        查找匹配任一目标文本的行。
+        :return: 行号列表（升序）。
+        """
+        lines = set()
+        for target in targets:
+            lines.update(self.find(target, include))
+        return sorted(lines)
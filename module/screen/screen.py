@@ -3,6 +3,8 @@ import time
 import json
 import threading
 from collections import deque
+import cv2
+import numpy as np
 from utils.color import green
 from utils.singleton import SingletonMeta
 from utils.logger.logger import Logger
@@ -17,6 +19,11 @@ class Screen(metaclass=SingletonMeta):
     """
 
     SCREEN_MATCH_THRESHOLD = 0.88
+    SCREEN_WATCH_TIMEOUT = 10  # 等待界面切换的时间（秒），只累计截图间隔的等待时间，与原先 20 次检查、每次间隔 0.5 秒一致
+    SCREEN_WATCH_INTERVAL = 0.1  # 等待界面切换时的截图间隔（秒）
+    SCREEN_WATCH_FULL_CHECK_INTERVAL = 1.0  # 只在预期区域内匹配时，每隔此时间（秒）搜索一次整张截图，避免预期区域不准确时一直等到超时
+    SCREEN_CHANGE_THRESHOLD = 8  # 缩略图任一像素的灰度变化超过此值时才重新匹配界面
+    SCREEN_SIGNATURE_SIZE = 160  # 缩略图长边的最大像素数
 
     def __init__(self, config_path, logger: Optional[Logger] = None):
         """
@@ -29,18 +36,23 @@ class Screen(metaclass=SingletonMeta):
         self.current_screen_threshold = 0  # 当前界面的阈值
         self.screen_map = {}  # 存储界面信息的字典
         self.wait_screen_change_time = 0.5
+        self.transition_times = {}  # (起始界面, 目标界面) -> [切换次数, 总耗时]
         self.lock = threading.Lock()  # 创建一个锁，用于线程同步
         self._setup_screens_from_config(config_path)
 
-    def _add_screen(self, id, name, image_path, actions):
+    def _add_screen(self, id, name, image_path, actions, region=None):
         """
         添加一个新界面到界面管理器。
         :param id: 新界面的唯一标识。
         :param name: 新界面的名称。
         :param image_path: 用于识别界面的图片路径，可以是字符串或字符串列表（任一匹配即可）。
         :param actions: 可切换的目标界面及操作序列。
+        :param region: 识别图片的预期出现区域 (x, y, w, h)，相对于整个画面的比例，可选。
         """
         self.screen_map[id] = {'name': name, 'image_path': image_path, 'actions': actions}
+        if region is not None:
+            for path in (image_path if isinstance(image_path, (list, tuple)) else [image_path]):
+                auto.set_expected_region(path, region)
 
     def _setup_screens_from_config(self, config_path):
         """
@@ -51,7 +63,7 @@ class Screen(metaclass=SingletonMeta):
             with open(config_path, 'r', encoding='utf-8') as file:
                 configs = json.load(file)
                 for config in configs:
-                    self._add_screen(config["id"], config["name"], config["image_path"], config["actions"])
+                    self._add_screen(config["id"], config["name"], config["image_path"], config["actions"], config.get("region"))
         except FileNotFoundError:
             self.logger.error(f"配置文件不存在：{config_path}")
             raise
@@ -132,6 +144,36 @@ class Screen(metaclass=SingletonMeta):
             auto.click_element("./assets/images/zh_CN/base/confirm.png", "image", 0.9, take_screenshot=False)
             time.sleep(20)
 
+    def _get_screen_image_paths(self, screen_name):
+        """
+        获取界面的识别图片路径列表。
+        :param screen_name: 界面的唯一标识。
+        :return: 图片路径列表。
+        """
+        image_path = self.screen_map[screen_name]['image_path']
+        if isinstance(image_path, (list, tuple)):
+            return list(image_path)
+        return [image_path]
+
+    def _match_all_screens(self):
+        """
+        在当前截图上一次性匹配所有界面的识别图片，按 screen_map 的顺序返回第一个通过阈值的界面，与逐个界面检查时的结果一致。
+        带透明通道的模板使用 TM_SQDIFF 匹配，匹配值越小越好，与其他模板的匹配值不可比较，因此不按匹配值选取。
+        :return: (界面标识, 匹配值)，未识别到时返回 (None, 0)。
+        """
+        image_paths = []
+        for screen_name in self.screen_map:
+            image_paths.extend(self._get_screen_image_paths(screen_name))
+
+        results = auto.match_many(image_paths, self.SCREEN_MATCH_THRESHOLD, take_screenshot=False)
+
+        for screen_name in self.screen_map:
+            for image_path in self._get_screen_image_paths(screen_name):
+                top_left, bottom_right, match_val = results.get(image_path, (None, None, None))
+                if top_left and bottom_right:
+                    return screen_name, match_val
+        return None, 0
+
     def get_current_screen(self, autotry=True, max_retries=10):
         """
         通过多次尝试来识别并获取当前界面。
@@ -139,32 +181,6 @@ class Screen(metaclass=SingletonMeta):
         :param max_retries: 最大重试次数。
         :return: 如果成功识别到界面则返回True，否则返回False。
         """
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-
-        found_event = threading.Event()
-
-        # 定义内部函数用于在线程中识别界面
-        def find_screen(screen_name, screen):
-            if found_event.is_set():
-                return None
-            try:
-                result = self._find_image(
-                    screen['image_path'],
-                    "image_threshold",
-                    self.SCREEN_MATCH_THRESHOLD,
-                    take_screenshot=False,
-                )
-                if result and not found_event.is_set():
-                    with self.lock:
-                        if not self.current_screen or self.current_screen_threshold < result:
-                            self.current_screen = screen_name
-                            self.current_screen_threshold = result
-                    found_event.set()
-                    return screen_name
-            except Exception as e:
-                self.logger.debug(f"识别界面出错：{e}")
-            return None
-
         if self.current_screen is not None and self._find_image(
             self.screen_map[self.current_screen]['image_path'],
             "image_threshold",
@@ -175,27 +191,17 @@ class Screen(metaclass=SingletonMeta):
         for i in range(max_retries):
             auto.take_screenshot()
             self._reset_screen_state()
-            found_event.clear()
-
-            import psutil
-            mem = psutil.virtual_memory()
-            if mem.available > 2 * 1024**3:
-                executor = ThreadPoolExecutor(max_workers=len(self.screen_map))
-                futures = [executor.submit(find_screen, name, screen) for name, screen in self.screen_map.items()]
-
-                for future in as_completed(futures):
-                    if future.result() is not None:
-                        executor.shutdown(wait=False, cancel_futures=True)
-                        break
-                else:
-                    executor.shutdown(wait=False)
-            else:
-                for name, screen in self.screen_map.items():
-                    find_screen(name, screen)
-                    if self.current_screen:
-                        break
 
-            if self.current_screen:
+            try:
+                screen_name, threshold = self._match_all_screens()
+            except Exception as e:
+                self.logger.debug(f"识别界面出错：{e}")
+                screen_name, threshold = None, 0
+
+            if screen_name:
+                with self.lock:
+                    self.current_screen = screen_name
+                    self.current_screen_threshold = threshold
                 return True
 
             if autotry:
@@ -380,35 +386,111 @@ class Screen(metaclass=SingletonMeta):
             except Exception as e:
                 self.logger.debug(f"未知的操作: {e}")
 
-    def wait_for_screen_change(self, next_screen, max_recursion=2, timeout_operations=None):
+    def _get_watch_region(self, image_paths):
+        """
+        获取监视界面切换时的检测区域，即所有识别图片预期区域的并集。
+        :param image_paths: 识别图片路径列表。
+        :return: (x0, y0, x1, y1)，相对于整个画面的比例；任一图片没有声明预期区域时返回 None。
+        """
+        regions = [auto.get_expected_region(image_path) for image_path in image_paths]
+        if not regions or any(region is None for region in regions):
+            return None
+        return (
+            min(x for x, _, _, _ in regions),
+            min(y for _, y, _, _ in regions),
+            max(x + w for x, _, w, _ in regions),
+            max(y + h for _, y, _, h in regions),
+        )
+
+    def _get_watch_signature(self, region):
+        """
+        获取当前截图检测区域的缩略灰度图，用于判断画面是否变化。
+        :param region: _get_watch_region 的返回值，为 None 时使用整张截图。
+        """
+        frame = auto.screenshot
+        if region is not None:
+            width, height = frame.size
+            x0, y0, x1, y1 = region
+            frame = frame.crop((x0 * width, y0 * height, max(x0 * width + 1, x1 * width), max(y0 * height + 1, y1 * height)))
+        height, width = frame.gray.shape[:2]
+        scale = min(1.0, self.SCREEN_SIGNATURE_SIZE / max(width, height))
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return cv2.resize(frame.gray, size, interpolation=cv2.INTER_AREA)
+
+    def _watch_screen(self, next_screen, timeout=SCREEN_WATCH_TIMEOUT):
+        """
+        监视界面切换：以较高频率截图，只有检测区域的画面发生变化时才重新匹配目标界面的识别图片，匹配成功立即返回。
+        识别图片都声明了预期区域时，缩略图和匹配都只在预期区域内进行，并每隔 SCREEN_WATCH_FULL_CHECK_INTERVAL 秒
+        以及超时前搜索一次整张截图；否则使用整张截图。
+        :param next_screen: 目标界面。
+        :param timeout: 等待时间（秒），只累计截图间隔的等待时间，不包括截图和匹配的耗时。
+        :return: 切换到目标界面返回True，超时返回False。
+        """
+        image_paths = self._get_screen_image_paths(next_screen)
+        region = self._get_watch_region(image_paths)
+        matched_signature = None
+        last_full_check = time.monotonic()
+        waited = 0.0
+        while True:
+            auto.invalidate_frame_cache()
+            auto.take_screenshot()
+            timed_out = waited >= timeout
+            full_check = region is None or timed_out or time.monotonic() - last_full_check >= self.SCREEN_WATCH_FULL_CHECK_INTERVAL
+            signature = self._get_watch_signature(region)
+            changed = matched_signature is None or int(np.max(cv2.absdiff(matched_signature, signature))) > self.SCREEN_CHANGE_THRESHOLD
+            if changed or (region is not None and full_check):
+                self.logger.debug(f"等待：{self.get_name(next_screen)}")
+                results = auto.match_many(image_paths, self.SCREEN_MATCH_THRESHOLD, take_screenshot=False, region_only=not full_check)
+                if any(results.get(image_path, (None,))[0] for image_path in image_paths):
+                    self.current_screen = next_screen
+                    return True
+                matched_signature = signature
+                if full_check:
+                    last_full_check = time.monotonic()
+            if timed_out:
+                return False
+            time.sleep(self.SCREEN_WATCH_INTERVAL)
+            waited += self.SCREEN_WATCH_INTERVAL
+
+    def _record_transition(self, current_screen, next_screen, start_time):
+        """记录并输出界面切换耗时。"""
+        if current_screen is None or start_time is None:
+            return
+        elapsed = time.monotonic() - start_time
+        stats = self.transition_times.setdefault((current_screen, next_screen), [0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+        self.logger.debug(f"界面切换耗时：{self.get_name(current_screen)} -> {self.get_name(next_screen)} {elapsed:.2f} 秒（平均 {stats[1] / stats[0]:.2f} 秒）")
+
+    def _on_screen_changed(self, next_screen, current_screen, start_time):
+        """切换成功后记录耗时，并等待画面稳定（最长 wait_screen_change_time 秒）。"""
+        self.logger.info(f"切换到：{green(self.get_name(next_screen))}")
+        self._record_transition(current_screen, next_screen, start_time)
+        auto.wait_for_stable(timeout=self.wait_screen_change_time)
+
+    def wait_for_screen_change(self, next_screen, max_recursion=2, timeout_operations=None, current_screen=None, start_time=None):
         """
         等待界面切换，如果未成功则根据重试次数决定是否重试
         :param timeout_operations: 超时后执行的可选操作列表，执行后会再次检测界面
-        """
-        for _ in range(20):
-            self.logger.debug(f"等待：{self.get_name(next_screen)}")
-            if self.check_screen(next_screen):
-                self.logger.info(f"切换到：{green(self.get_name(next_screen))}")
-                time.sleep(self.wait_screen_change_time)
-                break
-            time.sleep(0.5)
+        :param current_screen: 起始界面，用于记录切换耗时，可选。
+        :param start_time: 开始切换的时间（time.monotonic()），用于记录切换耗时，可选。
+        """
+        if self._watch_screen(next_screen):
+            self._on_screen_changed(next_screen, current_screen, start_time)
+            return
+
+        if timeout_operations:
+            self.logger.warning(f"切换到 {self.get_name(next_screen)} 超时，执行超时操作后重新检测")
+            self.perform_operations(timeout_operations)
+            if self._watch_screen(next_screen):
+                self._on_screen_changed(next_screen, current_screen, start_time)
+                return
+        self.wait_screen_change_time = 1
+        if max_recursion > 0:
+            self.logger.warning(f"切换到 {self.get_name(next_screen)} 超时，准备重试")
+            self.change_to(next_screen, max_recursion=max_recursion - 1)
         else:
-            if timeout_operations:
-                self.logger.warning(f"切换到 {self.get_name(next_screen)} 超时，执行超时操作后重新检测")
-                self.perform_operations(timeout_operations)
-                for _ in range(20):
-                    self.logger.debug(f"等待：{self.get_name(next_screen)}")
-                    if self.check_screen(next_screen):
-                        self.logger.info(f"切换到：{green(self.get_name(next_screen))}")
-                        time.sleep(self.wait_screen_change_time)
-                        return
-                    time.sleep(0.5)
-            self.wait_screen_change_time = 1
-            if max_recursion > 0:
-                self.logger.warning(f"切换到 {self.get_name(next_screen)} 超时，准备重试")
-                self.change_to(next_screen, max_recursion=max_recursion - 1)
-            else:
-                self.log_and_raise(f"无法切换到 {self.get_name(next_screen)}", "无法切换到指定游戏界面")
+            self.log_and_raise(f"无法切换到 {self.get_name(next_screen)}", "无法切换到指定游戏界面")
 
     def _switch_screen(self, current_screen, next_screen, max_recursion):
         """
@@ -416,8 +498,9 @@ class Screen(metaclass=SingletonMeta):
         """
         operations = self.get_operations(current_screen, next_screen)
         timeout_operations = self.get_timeout_operations(current_screen, next_screen)
+        start_time = time.monotonic()
         self.perform_operations(operations)
-        self.wait_for_screen_change(next_screen, max_recursion, timeout_operations or None)
+        self.wait_for_screen_change(next_screen, max_recursion, timeout_operations or None, current_screen, start_time)
 
     def _navigate_through_path(self, path, max_recursion):
         """
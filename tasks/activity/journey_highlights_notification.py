@@ -1,7 +1,7 @@
 import time
 import cv2
 import numpy as np
-from PIL import Image
+from utils.frame import Frame
 from module.logger import log
 from module.screen import screen
 from tasks.base.base import Base
@@ -18,7 +18,7 @@ def take_journey_highlights_screenshot():
 
     for _ in range(3):
         img, _, _ = auto.take_screenshot((375 / 1920, 300 / 1080, 1260 / 1920, 650 / 1080))
-        frame = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+        frame = img.bgr
 
         if anchor_template is not None:
             search_region = frame[: int(frame.shape[0] * 0.8), :]
@@ -44,7 +44,7 @@ def take_journey_highlights_screenshot():
         return None
 
     stitched = np.vstack(frames)
-    return Image.fromarray(cv2.cvtColor(stitched, cv2.COLOR_BGR2RGB))
+    return Frame(stitched)
 
 
 def send_journey_highlights_notification():
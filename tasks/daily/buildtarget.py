@@ -1,7 +1,5 @@
 import os
 import sys
-import cv2
-import numpy as np
 import json
 import time
 import datetime
@@ -10,6 +8,7 @@ from abc import ABC, abstractmethod
 from typing import Callable, Generator
 from module.screen import screen
 from module.automation import auto
+from module.automation.scroll_list_reader import ScrollListReader
 from module.logger import log
 from module.config import cfg
 from module.notification.notification import NotificationLevel
@@ -18,6 +17,10 @@ from tasks.base.base import Base
 from utils.image_utils import ImageUtils
 
 
+# 掉落物弹窗中掉落物名称到关闭按钮的区域，弹窗出现和关闭时都会变化
+DROP_MODAL_CROP = (783 / 1920, 222 / 1080, 803 / 1920, 236 / 1080)
+
+
 class BuildTargetHandler(ABC):
     """待刷副本的识别方案接口"""
 
@@ -41,7 +44,7 @@ class BuildTargetHandler(ABC):
             if anchor_template is not None:
                 for _ in range(3):
                     auto.take_screenshot(crop)
-                    screenshot = cv2.cvtColor(np.array(auto.screenshot), cv2.COLOR_BGR2RGB)
+                    screenshot = auto.screenshot.bgr
                     match_val, match_loc = ImageUtils.scale_and_match_template(screenshot, anchor_template, 0.8, None)
                     if match_val > 0.95:
                         paging_boundary_y = match_loc[1] + 64
@@ -75,7 +78,7 @@ class BuildTargetHandler(ABC):
             anchor_crop_top = crop[1] + last_enter_pos[0][1] * auto.screenshot_scale_factor / 1080.0
             anchor_crop = (crop[0], anchor_crop_top, crop[2], anchor_crop_height)
             anchor_template, _, _ = auto.take_screenshot(anchor_crop)
-            anchor_template = cv2.cvtColor(np.array(anchor_template.copy()), cv2.COLOR_RGB2BGR)
+            anchor_template = anchor_template.bgr.copy()
 
             auto.mouse_scroll(12)
             time.sleep(1)
@@ -89,10 +92,13 @@ class DefaultHandler(BuildTargetHandler):
     def __init__(self) -> None:
         super().__init__()
         self._valid_instance_names = get_raw_instance_names()
+        self._list_reader = None
 
     def collect(self) -> list[tuple[str, str]]:
         results = []
         page_crop = (688.0 / 1920, 286.0 / 1080, 969.0 / 1920, 676.0 / 1080)
+        # 滚动后只识别新出现的行，翻页前已识别的行沿用上一页的结果
+        self._list_reader = ScrollListReader(auto, page_crop)
 
         for instance in self._iter_scroll_windows(page_crop, self._capture_items_in_window):
             if not instance:
@@ -110,11 +116,13 @@ class DefaultHandler(BuildTargetHandler):
             else:
                 log.warning(f"目标副本识别错误，{instance} 不在任何已知副本列表中")
 
+        if self._list_reader.frame_pixels:
+            log.debug(f"培养目标列表实际识别区域占比：{self._list_reader.ocr_pixels / self._list_reader.frame_pixels:.0%}")
         return results
 
     def _capture_items_in_window(self, paging_boundary_y: float, screenshot_pos):
         positions = []
-        auto.perform_ocr()
+        self._list_reader.read(take_screenshot=False)
         for box, (text, _) in auto.ocr_result:
             match, _ = auto.is_text_match(text, ["进入", "传送"], True)
             if match and box[0][1] > paging_boundary_y:
@@ -251,7 +259,7 @@ class DefaultHandler(BuildTargetHandler):
                     log.error("尝试提取拟造花萼副本信息时失败，无法识别特定副本页面")
                     break
 
-                item_name = auto.get_single_line_text(crop=(783.0 / 1920, 318.0 / 1080, 204.0 / 1920, 55.0 / 1080), max_retries=3, retry_delay=0.5)
+                item_name = auto.get_single_line_text(crop=(783.0 / 1920, 318.0 / 1080, 204.0 / 1920, 55.0 / 1080), max_retries=3, retry_delay=0.5, line_only=True)
                 if not item_name or "信用点" in item_name:
                     log.error("尝试提取拟造花萼副本信息时失败，无法获取光锥晋阶材料信息")
                     break
@@ -353,22 +361,26 @@ class DropHandler(BuildTargetHandler):
             x1, y1 = screenshot_left + pos[0][0], screenshot_top + pos[0][1]
             x2, y2 = screenshot_left + pos[1][0], screenshot_top + pos[1][1]
 
+            reference = auto.get_region_signature(DROP_MODAL_CROP)
             if not auto.click_element_with_pos(((x1, y1), (x2, y2)), offset=(-510 * auto.screenshot_scale_factor, 0)):
                 log.error("尝试点击进入按钮时出错")
                 yield pos, None
                 return
 
-            if instance := self._get_instance_by_drop():
+            if instance := self._get_instance_by_drop(reference):
                 yield pos, (instance[0], instance[1])
             else:
                 yield pos, None
                 return
 
-    def _get_instance_by_drop(self) -> tuple[str, str, str, float] | None:
+    def _get_instance_by_drop(self, reference=None) -> tuple[str, str, str, float] | None:
         """
         识别掉落物名称，并匹配对应的副本信息，返回 (instance_type, instance_name, drop, similarity_score) 或 None
+        :param reference: 点击前由 auto.get_region_signature(DROP_MODAL_CROP) 取得的画面，用于判断弹窗是否已经出现
         """
-        time.sleep(0.5)
+        # 点击后等待掉落物弹窗出现，find_element 的重试负责弹窗较慢的情况
+        if auto.wait_for_change(crop=DROP_MODAL_CROP, timeout=0.5, reference=reference):
+            auto.wait_for_stable(crop=DROP_MODAL_CROP, timeout=0.5)
         if auto.find_element(
             "./assets/images/share/build_target/drop_modal_close.png",
             "image",
@@ -377,11 +389,14 @@ class DropHandler(BuildTargetHandler):
             retry_delay=0.5,
             crop=(1330 / 1920, 222 / 1080, 256 / 1920, 236 / 1080),
         ):
-            drop_name = auto.get_single_line_text(crop=(783 / 1920, 318 / 1080, 300 / 1920, 55 / 1080), max_retries=2, retry_delay=0.5)
+            drop_name = auto.get_single_line_text(crop=(783 / 1920, 318 / 1080, 300 / 1920, 55 / 1080), max_retries=2, retry_delay=0.5, line_only=True)
+            reference = auto.get_region_signature(DROP_MODAL_CROP)
             if auto.click_element(
                 "./assets/images/share/build_target/drop_modal_close.png", "image", 0.8, crop=(1330 / 1920, 222 / 1080, 256 / 1920, 236 / 1080)
             ):
-                time.sleep(1.0)
+                # 等待弹窗关闭
+                if auto.wait_for_change(crop=DROP_MODAL_CROP, timeout=1.0, reference=reference):
+                    auto.wait_for_stable(crop=DROP_MODAL_CROP, timeout=1.0)
             if drop_name:
                 log.debug(f"识别到掉落物: {drop_name}")
                 return self._match_instance(drop_name)
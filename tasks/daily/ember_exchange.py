@@ -206,6 +206,7 @@ class EmberExchange:
         auto.take_screenshot(cls.FULL_SCREEN_CROP)
         auto.perform_ocr()
 
+        candidates = []
         for box, (text, confidence) in auto.ocr_result:
             if item.display_name not in text:
                 continue
@@ -213,8 +214,12 @@ class EmberExchange:
             absolute_box = auto.calculate_text_position(box, False)
             relative_box = auto.calculate_text_position(box, True)
             log.debug(f"找到「{item.display_name}」文字：{text} 相似度：{confidence:.2f}")
+            candidates.append((absolute_box, cls._build_item_info_crop(relative_box)))
 
-            item_info = cls._inspect_item_info(item, relative_box, accept_sold_out=accept_sold_out)
+        # 所有候选商品上方的信息区域在同一帧截图上一次识别
+        info_results = auto.recognize_regions([info_crop for _, info_crop in candidates], take_screenshot=False)
+        for absolute_box, info_crop in candidates:
+            item_info = cls._inspect_item_info(item, info_results.get(info_crop, []), accept_sold_out=accept_sold_out)
             if not item_info:
                 continue
 
@@ -225,12 +230,8 @@ class EmberExchange:
         return None
 
     @classmethod
-    def _inspect_item_info(cls, item: EmberExchangeItem, relative_box, accept_sold_out=False):
-        info_crop = cls._build_item_info_crop(relative_box)
-        auto.take_screenshot(info_crop)
-        auto.perform_ocr()
-
-        texts = cls._collect_ordered_texts(auto.ocr_result)
+    def _inspect_item_info(cls, item: EmberExchangeItem, ocr_result, accept_sold_out=False):
+        texts = cls._collect_ordered_texts(ocr_result)
         merged_text = "\n".join(text.strip() for text in texts if text)
         sold_out_detected = any(any(target in text for target in cls.SOLD_OUT_TEXTS) for text in texts)
 
@@ -45,12 +45,18 @@ class RewardManager:
     def check_and_collect_rewards(self):
         log.hr("开始领取奖励", 0)
 
-        for reward_type, (image_path, confidence, crop) in self.reward_mapping.items():
-            if self._find_reward(image_path, confidence, crop):
-                self.reward_instances[reward_type].start()
-            else:
-                reward_name = self._get_reward_name(reward_type)
-                log.info(f"未检测到{reward_name}奖励")
+        pending = list(self.reward_mapping)
+        while pending:
+            # 领取某项奖励后可能出现新的奖励（如实训奖励带来勋礼经验），因此每次领取后重新扫描剩余项
+            found = self._scan_rewards(pending)
+            reward_type = next((t for t in pending if found.get(t)), None)
+            checked = pending if reward_type is None else pending[:pending.index(reward_type)]
+            for t in checked:
+                log.info(f"未检测到{self._get_reward_name(t)}奖励")
+            if reward_type is None:
+                break
+            self.reward_instances[reward_type].start()
+            pending = pending[pending.index(reward_type) + 1:]
 
         log.hr("完成", 2)
 
@@ -79,6 +85,26 @@ class RewardManager:
         screen.change_to('menu')
         return auto.find_element(image_path, "image", confidence, crop=crop)
 
+    def _scan_rewards(self, reward_types):
+        """在同一帧画面上检测多个奖励提示，返回 {奖励类型: 是否检测到}。"""
+        screen.change_to('menu')
+        groups = {}
+        for reward_type in reward_types:
+            image_path, confidence, crop = self.reward_mapping[reward_type]
+            groups.setdefault(crop, []).append((reward_type, image_path, confidence))
+
+        found = {}
+        for crop, items in groups.items():
+            results = auto.match_many(
+                [image_path for _, image_path, _ in items],
+                {image_path: confidence for _, image_path, confidence in items},
+                crop=crop,
+            )
+            for reward_type, image_path, _ in items:
+                top_left, bottom_right, _ = results[image_path]
+                found[reward_type] = bool(top_left and bottom_right)
+        return found
+
 
 def start():
     if not cfg.reward_enable:
@@ -5,6 +5,10 @@ from module.logger import log
 from .rewardtemplate import RewardTemplate
 
 
+# 领取委托奖励后弹出的奖励窗口区域
+REWARD_POPUP_CROP = (480 / 1920, 270 / 1080, 960 / 1920, 540 / 1080)
+
+
 class Dispatch(RewardTemplate):
     def run(self):
         # 适配低性能电脑，中间的界面不一定加载出了
@@ -18,11 +22,17 @@ class Dispatch(RewardTemplate):
 
     def _perform_dispatches(self):
         # 4.0 新界面适配
+        reference = auto.get_region_signature(REWARD_POPUP_CROP)
         if auto.click_element(("领取奖励", "委托派遣中，每小时可持续获得奖励帕！"), "text", max_retries=10, crop=(1194 / 1920, 866 / 1080, 610 / 1920, 156 / 1080), include=True):
             if auto.matched_text == "领取奖励":
-                time.sleep(2)
+                # 等待奖励弹窗出现并完成动画
+                if auto.wait_for_change(crop=REWARD_POPUP_CROP, timeout=2, reference=reference):
+                    auto.wait_for_stable(crop=REWARD_POPUP_CROP, timeout=2)
+                reference = auto.get_region_signature(REWARD_POPUP_CROP)
                 auto.click_element("./assets/images/zh_CN/base/click_close.png", "image", 0.8, max_retries=10)
-                time.sleep(2)
+                # 等待奖励弹窗关闭
+                if auto.wait_for_change(crop=REWARD_POPUP_CROP, timeout=2, reference=reference):
+                    auto.wait_for_stable(crop=REWARD_POPUP_CROP, timeout=2)
                 return True
             else:
                 log.info("委托派遣中，目前没有可领取的奖励帕！")
@@ -62,7 +62,7 @@ class ToolManager:
             log.info(f"截图完成，耗时 {(time.monotonic() - start_time) * 1000:.2f} 毫秒")
             if result:
                 log.debug(f"截图成功，图像尺寸: {result[0].size}")
-                self.screenshot_data = result[0]
+                self.screenshot_data = result[0].to_image()
                 return True
             else:
                 log.error("截图失败")
@@ -46,10 +46,9 @@ class SceneDetector:
         # 截取左上角区域用于 start 系列图标检测
         auto.take_screenshot(crop=Crop.DIALOG_START)
 
-        # 1. 检测 start 图标（键鼠 / PS5 / Xbox 任一命中即可）
-        for img_path in Img.START:
-            if auto.find_element(img_path, "image", Threshold.START_MATCH, take_screenshot=False):
-                return True
+        # 1. 检测 start 图标（键鼠 / PS5 / Xbox 任一命中即可，同一帧批量匹配）
+        if auto.find_any(Img.START, Threshold.START_MATCH, take_screenshot=False):
+            return True
 
         # 2. 检测 continue 箭头（底部中央）
         if auto.find_element(
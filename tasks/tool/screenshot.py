@@ -5,6 +5,7 @@ from PySide6.QtWidgets import QMainWindow, QLabel, QHBoxLayout, QWidget, QScroll
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QPixmap, QPainter, QPen, QImage, QColor
 from PIL import Image
+from utils.frame import Frame
 import cv2
 import numpy as np
 import pyperclip
@@ -646,9 +647,10 @@ class ScreenshotApp(QMainWindow):
         old_screenshot = auto.screenshot
         old_scale = getattr(auto, 'screenshot_scale_factor', 1)
         old_pos = getattr(auto, 'screenshot_pos', (0, 0))
-        auto.screenshot = self.screenshot
+        auto.screenshot = Frame.from_image(self.screenshot)
         auto.screenshot_scale_factor = 1
         auto.screenshot_pos = (0, 0)
+        auto._screenshot_edited = True  # 替换后的截图与当前帧的YOLO缓存结果不对应
         try:
             if method == "single":
                 return auto.find_yolo_element(target, threshold=threshold, relative=True)
@@ -992,13 +992,17 @@ class CurrencyWars:
             return
 
         def try_equip(from_position, to_position):
-            time.sleep(2)
+            auto.wait_for_stable(crop=equip_crop, timeout=2)
+            reference = auto.get_region_signature(equip_crop)
+            # 按下、移动、松开之间需要保持一段时间，否则游戏会当作点击而不是拖动
             auto.click_element_with_pos(from_position, action="down")
             time.sleep(1)
             auto.click_element_with_pos(to_position, action="move")
             time.sleep(1)
             auto.mouse_up()
-            time.sleep(2)
+            # 装备成功后装备栏会变化，等待变化完成；未变化时等到超时，与原来的固定等待相同
+            if auto.wait_for_change(crop=equip_crop, timeout=2, reference=reference):
+                auto.wait_for_stable(crop=equip_crop, timeout=2)
 
         # 员工投影仪和完美投影仪：阿格莱雅未三星时使用
         if not self.aglaea_three_star:
@@ -1137,13 +1141,17 @@ class CurrencyWars:
             return
 
         def try_equip(from_position, to_position):
-            time.sleep(2)
+            auto.wait_for_stable(crop=equip_crop, timeout=2)
+            reference = auto.get_region_signature(equip_crop)
+            # 按下、移动、松开之间需要保持一段时间，否则游戏会当作点击而不是拖动
             auto.click_element_with_pos(from_position, action="down")
             time.sleep(1)
             auto.click_element_with_pos(to_position, action="move")
             time.sleep(1)
             auto.mouse_up()
-            time.sleep(2)
+            # 装备成功后装备栏会变化，等待变化完成；未变化时等到超时，与原来的固定等待相同
+            if auto.wait_for_change(crop=equip_crop, timeout=2, reference=reference):
+                auto.wait_for_stable(crop=equip_crop, timeout=2)
 
         def try_synthesize(comp1_img, comp2_img, comp1_name, comp2_name):
             """尝试合成装备：将两个初级装备都拖到希儿身上，自动合成"""
@@ -1862,8 +1870,11 @@ class CurrencyWars:
         识别当前关卡阶段
         """
         stage_crop = (414 / 1920, 56 / 1080, 117 / 1920, 44 / 1080)
-        stage_text = auto.get_single_line_text(crop=stage_crop)
-        if stage_text and re.match(r"^\d-\d$", stage_text):
+        stage_text = auto.get_single_line_text(crop=stage_crop, line_only=True)
+        # 只识别文字的快速路径偶尔会在阶段前后多出零散的符号，只取其中的阶段编号
+        stage_match = re.search(r"(?<!\d)\d-\d(?!\d)", stage_text or "")
+        stage_text = stage_match.group() if stage_match else None
+        if stage_text:
             log.hr(f"当前阶段：{stage_text}", 2)
             if stage_text == self.current_stage:
                 self._stage_unchanged_count += 1
@@ -313,11 +313,12 @@ class DivergentUniverse:
             time.sleep(2)
 
         stage_crop = (57 / 1920, 15 / 1080, 260 / 1920, 27 / 1080)
-        stage_text = auto.get_single_line_text(crop=stage_crop)
+        stage_text = auto.get_single_line_text(crop=stage_crop, line_only=True)
         if not stage_text:
             return
 
-        stage_pattern = r"[（(]\s*(\d+)\s*/\s*(13|17|20)\s*[)）]\s*第\s*([一二三])\s*位面(?:\s*[-—－]\s*(.+))?"
+        # 只识别文字的快速路径偶尔会漏掉右括号，右括号可以缺失
+        stage_pattern = r"[（(]\s*(\d+)\s*/\s*(13|17|20)\s*[)）]?\s*第\s*([一二三])\s*位面(?:\s*[-—－]\s*(.+))?"
         keywords = ["战斗", "精英", "事件", "异常", "奖励", "财富", "冒险", "商店", "铸造", "空白", "首领", "休整", "转化"]
 
         def normalize_station(raw_station):
@@ -367,7 +368,7 @@ class DivergentUniverse:
                 if station == "未知":
                     for retry in range(3):
                         time.sleep(1)
-                        retry_stage_text = auto.get_single_line_text(crop=stage_crop)
+                        retry_stage_text = auto.get_single_line_text(crop=stage_crop, line_only=True)
                         if not retry_stage_text:
                             continue
 
@@ -892,9 +893,15 @@ class DivergentUniverse:
                     raise Exception("未找到继续进度按钮")
         log.error("多次尝试重新进入关卡失败")
 
-    def detect_random_door(self):
+    def detect_random_door(self, tile=True):
+        """
+        使用YOLO检测随意门，只在场景区域内推理。
+        远处的随意门很小，整张截图缩放到模型输入尺寸后容易漏检，因此默认将场景区域按原分辨率分块推理；
+        转向和走近随意门时门已足够大，传入 tile=False 只推理一次，避免循环中每次检测都推理多个分块。
+        """
+        scene_roi = (68 / 1920, 4 / 1080, 1718 / 1920, 818 / 1080)
         return auto.find_element(
-            target={"model_path": "./assets/model/divergent.onnx", "names": ["door", "event"], "target_class": "door"},
+            target={"model_path": "./assets/model/divergent.onnx", "names": ["door", "event"], "target_class": "door", "rois": [scene_roi], "tile": tile},
             find_type="yolo",
             threshold=0.01
         )
@@ -934,7 +941,7 @@ class DivergentUniverse:
                 start_time = time.monotonic()
                 while time.monotonic() - start_time < 10:
                     auto.press_key(key, wait_time=0.15)
-                    result = self.detect_random_door()
+                    result = self.detect_random_door(tile=False)
                     if not result:
                         return False
                     top_left, bottom_right = result
@@ -948,7 +955,7 @@ class DivergentUniverse:
                     start_time = time.monotonic()
                     while time.monotonic() - start_time < 10:
                         time.sleep(0.1)
-                        result = self.detect_random_door()
+                        result = self.detect_random_door(tile=False)
                         if not result:
                             return False
                         top_left, bottom_right = result
@@ -1013,7 +1020,7 @@ class DivergentUniverse:
                         time.sleep(0.5)
 
                 # 检测随意门位置，细微调整方向
-                result = self.detect_random_door()
+                result = self.detect_random_door(tile=False)
                 if not result:
                     return False
                 top_left, bottom_right = result
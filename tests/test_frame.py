@@ -0,0 +1,65 @@
+import cv2
+import numpy as np
+from PIL import Image
+
+from utils.frame import Frame
+
+
+def _image(width=97, height=61, seed=0):
+    rgb = np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    return Image.fromarray(rgb)
+
+
+def test_conversions_match_pil_screenshot():
+    image = _image()
+    frame = Frame.from_image(image)
+    rgb = np.array(image)
+    assert np.array_equal(frame.bgr, cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR))
+    assert np.array_equal(np.array(frame), rgb)
+    assert np.array_equal(frame.rgb, rgb)
+    assert np.array_equal(frame.gray, cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY))
+    assert np.array_equal(frame.hsv, cv2.cvtColor(cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR), cv2.COLOR_BGR2HSV))
+    assert frame.size == image.size
+    assert (frame.width, frame.height) == (image.width, image.height)
+
+
+def test_from_bgra_and_as_frame():
+    image = _image()
+    bgra = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGRA)
+    assert np.array_equal(np.array(Frame.from_bgra(bgra)), np.array(image))
+    frame = Frame.as_frame(image)
+    assert isinstance(frame, Frame)
+    assert Frame.as_frame(frame) is frame
+    assert Frame.as_frame(None) is None
+
+
+def test_crop_matches_pil():
+    image = _image()
+    frame = Frame.from_image(image)
+    for box in [(0, 0, 97, 61), (10, 5, 40, 30), (96, 60, 97, 61)]:
+        assert np.array_equal(np.array(frame.crop(box)), np.array(image.crop(box)))
+    # 超出画面的部分被截掉，PIL 则填充黑色
+    assert frame.crop((-3, -2, 20, 20)).size == (20, 20)
+    assert frame.crop((90, 50, 120, 80)).size == (7, 11)
+
+
+def test_resize_matches_pil():
+    image = _image(320, 180)
+    frame = Frame.from_image(image)
+    for size in [(160, 90), (640, 360), (123, 77)]:
+        resized = frame.resize(size)
+        assert resized.size == size
+        assert np.array_equal(np.array(resized), np.array(image.resize(size)))
+    # 缩放结果可以直接修改
+    frame.resize((160, 90)).bgr[0, 0] = 0
+
+
+def test_array_copy_does_not_modify_cache():
+    frame = Frame.from_image(_image())
+    array = np.array(frame)
+    array[:] = 0
+    assert frame.rgb.any()
+    assert np.array(frame, copy=False) is frame.rgb
+    copy = frame.copy()
+    copy.bgr[:] = 0
+    assert frame.bgr.any()
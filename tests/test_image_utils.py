@@ -0,0 +1,161 @@
+import cv2
+import numpy as np
+import pytest
+
+from utils.image_utils import ImageUtils
+
+
+def _filter_overlapping_matches_reference(locations, template_size):
+    """原先的实现：按 np.where 的顺序逐个调用 is_match_non_overlapping。"""
+    matches = []
+    width, height = template_size
+    for top_left in zip(*locations[::-1]):
+        if ImageUtils.is_match_non_overlapping(top_left, matches, width, height):
+            matches.append(top_left)
+    return matches
+
+
+def test_filter_overlapping_matches_same_as_reference():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        result = rng.random((rng.integers(20, 120), rng.integers(20, 120)))
+        threshold = rng.uniform(0.6, 0.99)
+        template_size = (int(rng.integers(1, 30)), int(rng.integers(1, 30)))
+        locations = np.where(result >= threshold)
+        expected = _filter_overlapping_matches_reference(locations, template_size)
+        actual = ImageUtils.filter_overlapping_matches(locations, template_size)
+        assert [tuple(map(int, m)) for m in actual] == [tuple(map(int, m)) for m in expected]
+
+
+def test_filter_overlapping_matches_empty():
+    locations = np.where(np.zeros((10, 10)) > 1)
+    assert ImageUtils.filter_overlapping_matches(locations, (5, 5)) == []
+
+
+def _list_image(rows=40, row_height=48, width=320, seed=0):
+    """模拟列表：每行背景相同，文字部分不同。"""
+    rng = np.random.default_rng(seed)
+    image = np.full((rows * row_height, width), 40, np.uint8)
+    for i in range(rows):
+        top = i * row_height
+        image[top:top + 2] = 90
+        cv2.putText(image, f"item {i} {rng.integers(1000, 9999)}", (10, top + 32), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 230, 2)
+    return image
+
+
+def test_estimate_vertical_shift():
+    content = _list_image()
+    height = 400
+    previous = content[100:100 + height]
+    for shift in (0, 1, 17, 48, 150, -30, -96):
+        current = content[100 + shift:100 + shift + height]
+        assert ImageUtils.estimate_vertical_shift(previous, current) == shift
+
+
+def test_estimate_vertical_shift_unrelated_frames():
+    previous = _list_image(seed=1)[:400]
+    current = np.random.default_rng(2).integers(0, 255, previous.shape, dtype=np.uint8)
+    assert ImageUtils.estimate_vertical_shift(previous, current) is None
+    assert ImageUtils.estimate_vertical_shift(previous, current[:300]) is None
+
+
+def _scale_and_match_template_reference(screenshot, template, threshold=None, scale_range=None):
+    """原先逐个缩放比例在原分辨率下完整搜索的实现（无掩码）。"""
+    result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    if scale_range and (np.isinf(max_val) or threshold is None or max_val < threshold):
+        for scale in np.arange(scale_range[0], scale_range[1] + 0.0001, 0.05):
+            scaled_template = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            result = cv2.matchTemplate(screenshot, scaled_template, cv2.TM_CCOEFF_NORMED)
+            _, local_max_val, _, local_max_loc = cv2.minMaxLoc(result)
+            if local_max_val > max_val:
+                max_val = local_max_val
+                max_loc = local_max_loc
+    return max_val, max_loc
+
+
+def _ui_screenshot(seed, size=(480, 270)):
+    """模拟游戏界面：渐变背景上的按钮、图标和文字。"""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    gradient = np.linspace(20, 90, width, dtype=np.float32)
+    image = np.dstack([np.tile(gradient, (height, 1))] * 3).astype(np.uint8)
+    for _ in range(20):
+        x, y = int(rng.integers(0, width - 60)), int(rng.integers(0, height - 40))
+        w, h = int(rng.integers(20, 100)), int(rng.integers(16, 60))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        if rng.random() < 0.5:
+            cv2.rectangle(image, (x, y), (x + w, y + h), color, -1)
+        else:
+            cv2.circle(image, (x + w // 2, y + h // 2), min(w, h) // 2, color, -1)
+        cv2.putText(image, f"{rng.integers(0, 99999)}", (x, y + h), cv2.FONT_HERSHEY_SIMPLEX, float(rng.uniform(0.4, 1.2)), (255, 255, 255), 1)
+    return image
+
+
+def _templates(screenshot, other, seed):
+    """从截图中截取并按 1/scale 缩放的模板（应匹配），以及从另一张截图截取的模板（通常不匹配）。"""
+    rng = np.random.default_rng(seed)
+    height, width = screenshot.shape[:2]
+    templates = []
+    for source, scale in [(screenshot, 0.8), (screenshot, 0.95), (screenshot, 1.1), (screenshot, 1.25), (other, 1.0), (other, 0.9)]:
+        w, h = int(rng.integers(30, 80)), int(rng.integers(30, 60))
+        x, y = int(rng.integers(0, width - w)), int(rng.integers(0, height - h))
+        crop = source[y:y + h, x:x + w]
+        templates.append(cv2.resize(crop, None, fx=1 / scale, fy=1 / scale, interpolation=cv2.INTER_AREA))
+    return templates
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_scale_and_match_template_same_decision_as_exhaustive(seed):
+    screenshot = _ui_screenshot(seed)
+    other = _ui_screenshot(seed + 100)
+    for template in _templates(screenshot, other, seed):
+        for scale_range in [(0.8, 1.3), (0.95, 0.95)]:
+            # 原实现在未缩放的模板达到阈值时直接返回，否则返回所有比例中的最佳结果
+            unscaled = _scale_and_match_template_reference(screenshot, template)
+            exhaustive = _scale_and_match_template_reference(screenshot, template, None, scale_range)
+            for threshold in [0.6, 0.75, 0.9]:
+                expected_val, expected_loc = unscaled if unscaled[0] >= threshold else exhaustive
+                val, loc = ImageUtils.scale_and_match_template(screenshot, template, threshold, scale_range)
+                assert (val >= threshold) == (expected_val >= threshold)
+                # 金字塔匹配只计算完整搜索中的部分位置，得分不会更高
+                assert val <= expected_val + 1e-6
+                if abs(val - threshold) <= ImageUtils.PYRAMID_EXHAUSTIVE_MARGIN:
+                    assert (val, loc) == (expected_val, expected_loc)
+
+
+def test_scale_and_match_template_without_threshold_is_exhaustive():
+    screenshot = _ui_screenshot(0)
+    for template in _templates(screenshot, _ui_screenshot(1), 0):
+        assert ImageUtils.scale_and_match_template(screenshot, template, None, (0.8, 1.3)) == \
+            _scale_and_match_template_reference(screenshot, template, None, (0.8, 1.3))
+
+
+def _masked_exhaustive(screenshot, template, mask, scales):
+    best_val, best_loc = None, None
+    for scale in scales:
+        scaled_template = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        scaled_mask = cv2.resize(mask, (scaled_template.shape[1], scaled_template.shape[0]), interpolation=cv2.INTER_NEAREST)
+        result = cv2.matchTemplate(screenshot, scaled_template, cv2.TM_SQDIFF, mask=scaled_mask)
+        val, _, loc, _ = cv2.minMaxLoc(result)
+        if best_val is None or val < best_val:
+            best_val, best_loc = val, loc
+    return best_val, best_loc
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_pyramid_match_template_with_mask(seed):
+    screenshot = _ui_screenshot(seed)
+    rng = np.random.default_rng(seed)
+    scales = np.arange(0.8, 1.3001, 0.05)
+    for scale in (0.85, 1.0, 1.2):
+        w, h = int(rng.integers(48, 80)), int(rng.integers(48, 64))
+        x, y = int(rng.integers(0, 480 - w)), int(rng.integers(0, 270 - h))
+        template = cv2.resize(screenshot[y:y + h, x:x + w], None, fx=1 / scale, fy=1 / scale, interpolation=cv2.INTER_AREA)
+        mask = np.zeros(template.shape[:2], np.uint8)
+        cv2.ellipse(mask, (template.shape[1] // 2, template.shape[0] // 2), (template.shape[1] // 2, template.shape[0] // 2), 0, 0, 360, 255, -1)
+        expected_val, expected_loc = _masked_exhaustive(screenshot, template, mask, scales)
+        val, loc = ImageUtils.pyramid_match_template(screenshot, template, scales, mask)
+        assert loc == expected_loc
+        # 在小窗口内计算的 TM_SQDIFF 与整张截图上计算的结果有浮点误差
+        assert val == pytest.approx(expected_val, rel=1e-4)
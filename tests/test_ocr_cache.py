@@ -0,0 +1,111 @@
+import importlib
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from module.ocr.ocr import OCR
+from module.ocr.ocr_result import OCRResult
+
+# module.ocr 包中的 ocr 属性是 OCR 实例，与子模块同名，因此通过 import_module 获取子模块
+ocr_module = importlib.import_module("module.ocr.ocr")
+
+
+class _Logger:
+    def debug(self, *args, **kwargs):
+        pass
+
+    info = warning = error = debug
+
+
+@pytest.fixture
+def ocr(monkeypatch):
+    instance = OCR(_Logger())
+    instance.executed = []
+
+    def execute(img, max_retries=3):
+        instance.executed.append(img)
+        boxes = np.zeros((1, 4, 2), dtype=np.float32)
+        return OCRResult(boxes, [f"text{len(instance.executed)}"], (0.9,))
+
+    monkeypatch.setattr(instance, "_execute", execute)
+    return instance
+
+
+def _image(value, shape=(20, 40, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_cache_key_depends_on_pixels_and_mode():
+    image = _image(10)
+    key = OCR._cache_key(image, "det_rec")
+    assert key == OCR._cache_key(image.copy(), "det_rec")
+    assert key != OCR._cache_key(image, "rec")
+    assert key != OCR._cache_key(_image(11), "det_rec")
+    assert key != OCR._cache_key(_image(10, (40, 20, 3)), "det_rec")
+    assert key != OCR._cache_key(image.astype(np.uint16), "det_rec")
+
+
+def test_cache_key_of_view_equals_contiguous_copy():
+    image = np.random.default_rng(0).integers(0, 256, (50, 60, 3), dtype=np.uint8)
+    view = image[5:25, 10:50]
+    assert not view.flags["C_CONTIGUOUS"]
+    assert OCR._cache_key(view, "det_rec") == OCR._cache_key(np.ascontiguousarray(view), "det_rec")
+
+
+def test_cache_key_of_pil_image():
+    image = Image.new("RGB", (30, 20), (1, 2, 3))
+    assert OCR._cache_key(image, "det_rec") == OCR._cache_key(image.copy(), "det_rec")
+    assert OCR._cache_key(image, "det_rec") != OCR._cache_key(Image.new("RGB", (30, 20), (1, 2, 4)), "det_rec")
+    assert OCR._cache_key(object(), "det_rec") is None
+
+
+def test_run_reuses_cached_result(ocr):
+    first = ocr.run(_image(1))
+    second = ocr.run(_image(1))
+    assert len(ocr.executed) == 1
+    assert list(second) == list(first)
+    assert (ocr.cache_hits, ocr.cache_misses) == (1, 1)
+    ocr.run(_image(1), mode="other")
+    assert len(ocr.executed) == 2
+
+
+def test_cached_result_is_not_modified_by_caller(ocr):
+    first = ocr.run(_image(1))
+    first.txts[0] = "modified"
+    assert ocr.run(_image(1)).txts == ["text1"]
+
+
+def test_cache_evicts_least_recently_used(ocr, monkeypatch):
+    monkeypatch.setattr(ocr_module, "OCR_CACHE_SIZE", 2)
+    ocr.run(_image(1))
+    ocr.run(_image(2))
+    ocr.run(_image(1))  # 命中，_image(1) 变为最近使用
+    ocr.run(_image(3))  # 淘汰 _image(2)
+    assert len(ocr.executed) == 3
+    ocr.run(_image(1))
+    assert len(ocr.executed) == 3
+    ocr.run(_image(2))
+    assert len(ocr.executed) == 4
+
+
+def test_cache_expires(ocr, monkeypatch):
+    monkeypatch.setattr(ocr_module, "OCR_CACHE_MAX_AGE", -1)
+    ocr.run(_image(1))
+    ocr.run(_image(1))
+    assert len(ocr.executed) == 2
+
+
+def test_failed_result_is_not_cached(ocr, monkeypatch):
+    calls = []
+    monkeypatch.setattr(ocr, "_execute", lambda img, max_retries=3: calls.append(img) or "{}")
+    ocr.run(_image(1))
+    ocr.run(_image(1))
+    assert len(calls) == 2
+
+
+def test_cache_disabled(ocr, monkeypatch):
+    monkeypatch.setattr(ocr_module, "OCR_CACHE_SIZE", 0)
+    ocr.run(_image(1))
+    ocr.run(_image(1))
+    assert len(ocr.executed) == 2
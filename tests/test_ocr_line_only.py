@@ -0,0 +1,84 @@
+import json
+import os
+import re
+
+import pytest
+from PIL import Image
+
+from module.ocr.ocr import OCR
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "line_only")
+
+# 与调用处的解析保持一致：tasks/weekly/divergent_universe.py check_stage 和 tasks/weekly/currency_wars.py identify_current_stage
+DIVERGENT_STAGE_PATTERN = r"[（(]\s*(\d+)\s*/\s*(13|17|20)\s*[)）]?\s*第\s*([一二三])\s*位面(?:\s*[-—－]\s*(.+))?"
+CURRENCY_STAGE_PATTERN = r"(?<!\d)\d-\d(?!\d)"
+
+# 按 1920x1080 下调用处的裁剪区域尺寸保存的截图：(文件名, 类型, 调用处解析后的期望结果)
+CASES = [
+    # 差分宇宙关卡标题，divergent_stage_3 在快速路径下会漏掉右括号
+    ("divergent_stage_1.png", "divergent_stage", ("3", "13", "一", "战斗")),
+    ("divergent_stage_2.png", "divergent_stage", ("11", "17", "二", "事件")),
+    ("divergent_stage_3.png", "divergent_stage", ("20", "20", "三", "首领")),
+    # 货币战争阶段，currency_stage_3 在快速路径下末尾会多出 "-"
+    ("currency_stage_1.png", "currency_stage", "2-3"),
+    ("currency_stage_2.png", "currency_stage", "5-1"),
+    ("currency_stage_3.png", "currency_stage", "6-2"),
+    # 培养目标中的光锥晋阶材料名和掉落物名称（tasks/daily/buildtarget.py）
+    ("calyx_item_1.png", "name", "永恒之花"),
+    ("calyx_item_2.png", "name", "炼形者雷枝"),
+    ("drop_name_1.png", "name", "熄灭原核"),
+    ("drop_name_2.png", "name", "铁狼碎齿"),
+]
+
+
+class _Logger:
+    def debug(self, *args, **kwargs):
+        pass
+
+    info = warning = error = debug
+
+
+@pytest.fixture(scope="module")
+def ocr():
+    pytest.importorskip("rapidocr")
+    with open(os.path.join(ROOT, "assets", "config", "ocr_replacements.json"), encoding="utf-8") as f:
+        instance = OCR(_Logger(), json.load(f))
+    try:
+        instance.instance_ocr()
+    except Exception as e:
+        pytest.skip(f"OCR引擎不可用：{e}")
+    return instance
+
+
+def _load(name):
+    return Image.open(os.path.join(FIXTURE_DIR, name)).convert("RGB")
+
+
+def _parse(kind, text):
+    if kind == "divergent_stage":
+        match = re.search(DIVERGENT_STAGE_PATTERN, text)
+        return match.groups() if match else None
+    if kind == "currency_stage":
+        match = re.search(CURRENCY_STAGE_PATTERN, text)
+        return match.group() if match else None
+    return text
+
+
+@pytest.mark.parametrize("name, kind, expected", CASES)
+def test_line_only_result_parses_at_call_site(ocr, monkeypatch, name, kind, expected):
+    def fallback(*args, **kwargs):
+        raise AssertionError("快速识别结果不可用，改用了完整识别")
+
+    monkeypatch.setattr(ocr, "recognize_single_line", fallback)
+    result = ocr.recognize_line(_load(name))
+    assert result is not None
+    assert _parse(kind, result[0]) == expected
+
+
+@pytest.mark.parametrize("name, kind, expected", CASES)
+def test_line_only_matches_full_recognition(ocr, name, kind, expected):
+    image = _load(name)
+    full = ocr.recognize_single_line(image)
+    line = ocr.recognize_line(image)
+    assert _parse(kind, full[0]) == _parse(kind, line[0]) == expected
@@ -0,0 +1,82 @@
+import itertools
+import json
+import os
+
+import numpy as np
+import pytest
+
+from module.ocr.ocr import OCR
+from module.ocr.ocr_result import OCRResult
+
+REPLACEMENTS_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "config", "ocr_replacements.json")
+
+
+class _Logger:
+    def debug(self, *args, **kwargs):
+        pass
+
+    info = warning = error = debug
+
+
+def _sequential_replace(text, replacements):
+    """原来的实现：按配置顺序逐条执行直接替换和条件替换"""
+    for old_str, new_str in (replacements.get("direct", {}) or {}).items():
+        if old_str and old_str in text:
+            text = text.replace(old_str, new_str)
+    for old_str, new_str in (replacements.get("conditional", {}) or {}).items():
+        if old_str and new_str not in text and old_str in text:
+            text = text.replace(old_str, new_str)
+    return text
+
+
+def _replace(replacements, texts):
+    results = [{"txt": text} for text in texts]
+    OCR(_Logger(), replacements).replace_strings(results)
+    return [item["txt"] for item in results]
+
+
+def _inputs(replacements):
+    rules = list((replacements.get("direct", {}) or {}).items()) + list((replacements.get("conditional", {}) or {}).items())
+    texts = ["", "普通文本", "使用"]
+    for old_str, new_str in rules:
+        texts += [old_str, new_str, f"前缀{old_str}后缀", f"{old_str}{old_str}", f"{new_str}{old_str}", f"{old_str}和{new_str}"]
+    keys = [old_str for old_str, _ in rules]
+    texts += [a + b for a, b in itertools.product(keys, repeat=2)]
+    return texts
+
+
+@pytest.fixture(scope="module")
+def table():
+    with open(REPLACEMENTS_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_matches_sequential_rules_over_replacement_table(table):
+    texts = _inputs(table)
+    assert _replace(table, texts) == [_sequential_replace(text, table) for text in texts]
+
+
+def test_order_dependent_rules():
+    replacements = {
+        "direct": {"甲": "乙丙", "丙": "丁", "戊": "甲"},
+        "conditional": {"日之形": "烬日之形", "子": "子丑", "蛀星的日": "蛀星的旧靥", "丑": "寅"},
+    }
+    texts = ["甲", "戊", "甲丙戊", "蛀星的日之形", "蛀星的日", "子", "子丑", "丑子", "日之形烬日之形"]
+    assert _replace(replacements, texts) == [_sequential_replace(text, replacements) for text in texts]
+
+
+def test_replaces_ocr_result_and_recompiles_on_new_table():
+    instance = OCR(_Logger(), {"direct": {"a": "b"}})
+    result = OCRResult(np.zeros((2, 4, 2), dtype=np.float32), ["aa", "c"], (0.9, 0.9))
+    instance.replace_strings(result)
+    assert list(result.txts) == ["bb", "c"]
+
+    instance.replacements = {"conditional": {"c": "d"}}
+    result = OCRResult(np.zeros((1, 4, 2), dtype=np.float32), ["ca"], (0.9,))
+    instance.replace_strings(result)
+    assert list(result.txts) == ["da"]
+
+
+def test_empty_keys_and_tables_are_ignored():
+    assert _replace({"direct": {"": "x"}, "conditional": {}}, ["abc"]) == ["abc"]
+    assert _replace({}, ["abc"]) == ["abc"]
@@ -0,0 +1,62 @@
+import numpy as np
+
+from module.ocr.ocr import OCR
+from module.ocr.ocr_result import OCRResult
+
+
+class _Output:
+    """与 RapidOCR 输出相同的字段和 to_json 格式。"""
+
+    def __init__(self, boxes, txts, scores):
+        self.boxes = boxes
+        self.txts = txts
+        self.scores = scores
+
+    def to_json(self):
+        if self.boxes is None or self.txts is None or self.scores is None:
+            return None
+        return [{'box': box.tolist(), 'txt': txt, 'score': score} for box, txt, score in zip(self.boxes, self.txts, self.scores)]
+
+
+def _output(count=3):
+    rng = np.random.default_rng(0)
+    boxes = rng.uniform(0, 500, (count, 4, 2)).astype(np.float32)
+    txts = tuple(f"第{i}行" for i in range(count))
+    scores = tuple(float(s) for s in rng.uniform(0.5, 1, count))
+    return _Output(boxes, txts, scores)
+
+
+def test_lines_equal_converted_json():
+    output = _output()
+    expected = OCR(None).convert_format(output.to_json())
+    result = OCRResult.from_output(output)
+    assert list(result) == expected
+    assert len(result) == len(expected)
+    assert [result[i] for i in range(len(result))] == expected
+    assert result[-1] == expected[-1]
+    assert result[1:] == expected[1:]
+    assert result[::-1] == expected[::-1]
+
+
+def test_empty_output():
+    assert OCRResult.from_output(_Output(None, None, None)) is None
+    assert OCRResult.from_output(None) is None
+
+
+def test_index_out_of_range():
+    result = OCRResult.from_output(_output(2))
+    for index in (2, -3):
+        try:
+            result[index]
+        except IndexError:
+            pass
+        else:
+            raise AssertionError(index)
+
+
+def test_copy_does_not_share_texts():
+    result = OCRResult.from_output(_output())
+    copy = result.copy()
+    copy.txts[0] = "changed"
+    assert result.txts[0] == "第0行"
+    assert copy.boxes is result.boxes
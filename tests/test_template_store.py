@@ -0,0 +1,88 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from utils.template_store import TemplateStore
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    rng = np.random.default_rng(0)
+    directory = tmp_path / "images"
+    (directory / "sub").mkdir(parents=True)
+    cv2.imwrite(str(directory / "a.png"), rng.integers(0, 256, (20, 30, 3), dtype=np.uint8))
+    bgra = rng.integers(0, 256, (16, 12, 4), dtype=np.uint8)
+    bgra[:4, :, 3] = 0
+    cv2.imwrite(str(directory / "sub" / "b.png"), bgra)
+    (directory / "note.txt").write_text("not an image")
+    return directory
+
+
+def _assert_same(entry, expected):
+    assert entry.keys() == expected.keys()
+    for kind, array in expected.items():
+        if array is None:
+            assert entry[kind] is None
+        else:
+            assert np.array_equal(entry[kind], array)
+
+
+def test_build_and_load(image_dir, tmp_path):
+    pack_path = str(tmp_path / "images.pack")
+    assert TemplateStore.build(str(image_dir), pack_path) == 2
+    store = TemplateStore(pack_path)
+    for name in ("a.png", os.path.join("sub", "b.png")):
+        path = str(image_dir / name)
+        entry = store.get(path)
+        _assert_same(entry, TemplateStore._decode(path))
+        # 从包中读取的是只读视图
+        assert not entry['template'].flags.writeable
+    assert store.get(str(image_dir / "sub" / "b.png"))['mask'] is not None
+    assert store.get(str(image_dir / "a.png"))['mask'] is None
+
+
+def test_missing_pack_falls_back_to_decoding(image_dir, tmp_path):
+    store = TemplateStore(str(tmp_path / "missing.pack"))
+    path = str(image_dir / "a.png")
+    _assert_same(store.get(path), TemplateStore._decode(path))
+
+
+def test_invalid_pack_falls_back_to_decoding(image_dir, tmp_path):
+    pack_path = tmp_path / "broken.pack"
+    pack_path.write_bytes(b"not a template pack")
+    store = TemplateStore(str(pack_path))
+    path = str(image_dir / "a.png")
+    _assert_same(store.get(path), TemplateStore._decode(path))
+
+
+def test_stale_image_is_decoded_again(image_dir, tmp_path):
+    pack_path = str(tmp_path / "images.pack")
+    TemplateStore.build(str(image_dir), pack_path)
+    path = str(image_dir / "a.png")
+    # 相同大小、不同内容
+    image = cv2.imread(path)
+    cv2.imwrite(path, 255 - image)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    entry = TemplateStore(pack_path).get(path)
+    assert np.array_equal(entry['template'], 255 - image)
+
+
+def test_touched_image_is_still_read_from_pack(image_dir, tmp_path):
+    pack_path = str(tmp_path / "images.pack")
+    TemplateStore.build(str(image_dir), pack_path)
+    path = str(image_dir / "a.png")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    store = TemplateStore(pack_path)
+    assert not store.get(path)['template'].flags.writeable
+
+
+def test_deleted_image_is_not_read_from_pack(image_dir, tmp_path):
+    pack_path = str(tmp_path / "images.pack")
+    TemplateStore.build(str(image_dir), pack_path)
+    path = str(image_dir / "a.png")
+    os.remove(path)
+    assert TemplateStore(pack_path).get(path) is None
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from module.automation.automation import Automation
+
+
+def _postprocess_reference(preds, scale, names, target_classes, threshold):
+    """原先逐行处理端到端输出的实现。"""
+    results = []
+    for det in preds:
+        x1, y1, x2, y2, score, cls_id = det
+        if score < threshold:
+            continue
+        cls_id = int(cls_id)
+        if cls_id >= len(names):
+            continue
+        cls_name = names[cls_id]
+        if target_classes is not None and cls_name not in target_classes:
+            continue
+        results.append((cls_name, float(score), x1 / scale, y1 / scale, x2 / scale, y2 / scale))
+    results.sort(key=lambda r: r[1], reverse=True)
+    return results
+
+
+@pytest.fixture
+def auto():
+    instance = object.__new__(Automation)
+    instance._yolo_class_ids = {}
+    return instance
+
+
+def _end_to_end_preds(count=300, num_classes=5, seed=0):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 600, (count, 2))
+    wh = rng.uniform(5, 80, (count, 2))
+    # 置信度取两位小数，包含相同置信度的情况
+    scores = np.round(rng.uniform(0, 1, (count, 1)), 2)
+    cls_ids = rng.integers(0, num_classes + 1, (count, 1))  # 包含超出类别数的编号
+    return np.hstack([xy, xy + wh, scores, cls_ids]).astype(np.float32)
+
+
+@pytest.mark.parametrize("target_classes", [None, ["b"], ["a", "d", "missing"]])
+@pytest.mark.parametrize("threshold", [0.0, 0.25, 0.9])
+def test_end_to_end_output_matches_reference(auto, target_classes, threshold):
+    names = ["a", "b", "c", "d", "e"]
+    preds = _end_to_end_preds()
+    scale = 0.75
+    expected = _postprocess_reference(preds, scale, names, target_classes, threshold)
+    actual = auto._yolo_postprocess(preds, scale, names, target_classes, threshold)
+    assert len(actual) == len(expected)
+    for result, reference in zip(actual, expected):
+        assert result[:2] == reference[:2]
+        assert np.allclose(result[2:], reference[2:])
+
+
+def test_empty_output(auto):
+    preds = np.zeros((0, 6), dtype=np.float32)
+    assert auto._yolo_postprocess(preds, 1.0, ["a"], None, 0.25) == []
+
+
+def test_raw_output_applies_nms(auto):
+    names = ["a", "b"]
+    # 原始输出 (4 + 类别数, 候选框数)，每列为 (cx, cy, w, h, 各类别得分)
+    candidates = [
+        (100, 100, 50, 50, 0.9, 0.1),
+        (102, 101, 50, 50, 0.8, 0.1),  # 与第一个框重叠，被 NMS 去除
+        (102, 101, 50, 50, 0.1, 0.7),  # 类别不同，保留
+        (300, 300, 40, 40, 0.6, 0.2),
+        (500, 500, 40, 40, 0.1, 0.2),  # 低于阈值
+    ]
+    preds = np.array(candidates, dtype=np.float32).T
+    preds = np.hstack([preds, np.zeros((6, 10), dtype=np.float32)])
+    results = auto._yolo_postprocess(preds, 0.5, names, None, 0.25)
+    assert [(name, round(score, 2)) for name, score, *_ in results] == [("a", 0.9), ("b", 0.7), ("a", 0.6)]
+    assert np.allclose(results[0][2:], (150, 150, 250, 250))
@@ -0,0 +1,117 @@
+import cv2
+import numpy as np
+from PIL import Image
+
+
+class Frame:
+    """
+    一帧截图。
+
+    底层为连续的 BGR ndarray，所有匹配方法直接共用，不再为每次查找复制整帧；
+    灰度图、HSV、RGB 按需生成并缓存，PIL 图片只在保存或推送通知时才生成。保留了常用的 PIL 接口
+    （size/width/height/crop/resize/save/copy），np.array(frame) 仍返回与 PIL 截图一致的 RGB 数组。
+    """
+
+    __slots__ = ('bgr', '_gray', '_hsv', '_rgb')
+
+    def __init__(self, bgr):
+        """
+        :param bgr: BGR 格式的 ndarray。
+        """
+        self.bgr = bgr
+        self._gray = None
+        self._hsv = None
+        self._rgb = None
+
+    @classmethod
+    def from_rgb(cls, rgb):
+        """从 RGB 格式的 ndarray 创建。"""
+        return cls(cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR))
+
+    @classmethod
+    def from_image(cls, image):
+        """从 PIL 图片创建。"""
+        return cls.from_rgb(np.asarray(image.convert('RGB')))
+
+    @classmethod
+    def from_bgra(cls, bgra):
+        """从 BGRA/BGRX 格式的 ndarray 创建（mss、PrintWindow 的原始像素格式）。"""
+        return cls(cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR))
+
+    @staticmethod
+    def as_frame(image):
+        """将 PIL 图片或 Frame 统一转换为 Frame。"""
+        if image is None or isinstance(image, Frame):
+            return image
+        return Frame.from_image(image)
+
+    @property
+    def width(self):
+        return self.bgr.shape[1]
+
+    @property
+    def height(self):
+        return self.bgr.shape[0]
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    @property
+    def gray(self):
+        """灰度图（缓存）。"""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def hsv(self):
+        """HSV 图（缓存）。"""
+        if self._hsv is None:
+            self._hsv = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2HSV)
+        return self._hsv
+
+    @property
+    def rgb(self):
+        """RGB 图（缓存）。"""
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    def to_image(self):
+        """转换为 PIL 图片，用于保存或推送通知。"""
+        return Image.fromarray(self.rgb)
+
+    def crop(self, box):
+        """
+        裁剪区域，返回共享底层数据的新 Frame。
+        :param box: (left, top, right, bottom)，与 PIL.Image.crop 一致。
+        """
+        left, top, right, bottom = (int(v) for v in box)
+        left, top = max(0, left), max(0, top)
+        return Frame(self.bgr[top:bottom, left:right])
+
+    def resize(self, size):
+        """
+        缩放到 (width, height)。
+        使用与 PIL.Image.resize 默认值相同的 BICUBIC 滤波，结果与原先缩放 PIL 截图逐像素一致，
+        模板匹配和 OCR 的阈值不受影响。cv2.INTER_CUBIC 缩小时不做抗锯齿，结果与之不同。
+        逐通道滤波与通道顺序无关，因此直接缩放 BGR 数据。
+        """
+        size = tuple(int(v) for v in size)
+        return Frame(np.array(Image.fromarray(self.bgr).resize(size, Image.Resampling.BICUBIC)))
+
+    def copy(self):
+        return Frame(self.bgr.copy())
+
+    def save(self, fp, *args, **kwargs):
+        self.to_image().save(fp, *args, **kwargs)
+
+    def __array__(self, dtype=None, copy=None):
+        """返回 RGB 数组。除非 copy 为 False，否则返回副本，调用方修改数组不会影响缓存的 RGB 图或共用此帧的其他截图。"""
+        rgb = self.rgb
+        if copy is False:
+            if dtype is not None and np.dtype(dtype) != rgb.dtype:
+                raise ValueError("转换数据类型需要复制数组")
+            return rgb
+        return rgb.astype(rgb.dtype if dtype is None else dtype, copy=True)
@@ -1,10 +1,17 @@
 import math
 import os
+import threading
 import cv2
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 
 class ImageUtils:
+    # 批量模板匹配共用的固定大小线程池（cv2.matchTemplate 执行时会释放 GIL）
+    MATCH_MAX_WORKERS = min(4, os.cpu_count() or 1)
+    _match_executor = None
+    _match_executor_lock = threading.Lock()
+
     @staticmethod
     def read_image(image_path, flags=cv2.IMREAD_COLOR):
         path = image_path
@@ -52,17 +59,191 @@ class ImageUtils:
         _, max_val, _, max_loc = cv2.minMaxLoc(result)
 
         if scale_range and (math.isinf(max_val) or threshold is None or max_val < threshold):
-            for scale in np.arange(scale_range[0], scale_range[1] + 0.0001, 0.05):
-                scaled_template = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
-                result = cv2.matchTemplate(screenshot, scaled_template, cv2.TM_CCOEFF_NORMED)
-                _, local_max_val, _, local_max_loc = cv2.minMaxLoc(result)
-
-                if local_max_val > max_val:
-                    max_val = local_max_val
-                    max_loc = local_max_loc
+            scales = np.arange(scale_range[0], scale_range[1] + 0.0001, 0.05)
+            local_max_val, local_max_loc = ImageUtils.pyramid_match_template(screenshot, template, scales)
+            if local_max_val is not None and (threshold is None or abs(local_max_val - threshold) <= ImageUtils.PYRAMID_EXHAUSTIVE_MARGIN):
+                # 金字塔匹配只精修部分候选，得分可能略低于完整搜索；接近阈值时改为完整搜索，是否匹配的判断与逐个比例搜索一致
+                local_max_val, local_max_loc = ImageUtils.exhaustive_match_template(screenshot, template, scales)
+            if local_max_val is not None and local_max_val > max_val:
+                max_val = local_max_val
+                max_loc = local_max_loc
 
         return max_val, max_loc
 
+    # 金字塔匹配参数：粗匹配时模板最短边不小于该值，否则退回原分辨率匹配
+    PYRAMID_MIN_TEMPLATE_SIZE = 12
+    # 粗匹配后在原分辨率下精修的候选位置数量
+    PYRAMID_TOP_K = 5
+    # 金字塔匹配的得分与阈值相差不超过此值时，改为逐个缩放比例在原分辨率下完整搜索
+    PYRAMID_EXHAUSTIVE_MARGIN = 0.1
+
+    @staticmethod
+    def exhaustive_match_template(screenshot, template, scales):
+        """
+        逐个缩放比例在原分辨率下完整搜索，返回 TM_CCOEFF_NORMED 的最佳匹配值和位置。
+        :param scales: 模板缩放比例序列。
+        :return: 最佳匹配值和最佳匹配位置；没有可用的缩放比例时返回 (None, None)。
+        """
+        screen_h, screen_w = screenshot.shape[:2]
+        best_val, best_loc = None, None
+        for scale in scales:
+            scaled_template = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            template_h, template_w = scaled_template.shape[:2]
+            if template_h == 0 or template_w == 0 or template_h > screen_h or template_w > screen_w:
+                continue
+            result = cv2.matchTemplate(screenshot, scaled_template, cv2.TM_CCOEFF_NORMED)
+            _, val, _, loc = cv2.minMaxLoc(result)
+            if best_val is None or val > best_val:
+                best_val, best_loc = val, loc
+        return best_val, best_loc
+
+    @staticmethod
+    def _top_candidates(result, k, higher_better, suppress_size):
+        """
+        从匹配结果图中取出前 k 个候选位置，每取出一个就抑制其邻域，避免候选集中在同一处。
+        :return: [(匹配值, (x, y)), ...]
+        """
+        worst = -np.inf if higher_better else np.inf
+        result = np.where(np.isfinite(result), result, worst).astype(np.float32)
+        suppress_w, suppress_h = suppress_size
+        candidates = []
+        for _ in range(k):
+            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+            val, loc = (max_val, max_loc) if higher_better else (min_val, min_loc)
+            if not math.isfinite(val):
+                break
+            candidates.append((val, loc))
+            x, y = loc
+            result[max(0, y - suppress_h):y + suppress_h + 1, max(0, x - suppress_w):x + suppress_w + 1] = worst
+        return candidates
+
+    @staticmethod
+    def pyramid_match_template(screenshot, template, scales, mask=None):
+        """
+        由粗到细的多尺度模板匹配：先在 1/2 或 1/4 分辨率下对所有缩放比例搜索候选位置，
+        再只对得分最高的 PYRAMID_TOP_K 个候选在原分辨率的小邻域内精修。
+        :param screenshot: 截图。
+        :param template: 模板图片。
+        :param scales: 模板缩放比例序列。
+        :param mask: 模板的掩码。有掩码时使用 TM_SQDIFF（越低越好），否则使用 TM_CCOEFF_NORMED（越高越好）。
+        :return: 最佳匹配值和最佳匹配位置，与 scale_and_match_template 一致；没有可用的缩放比例时返回 (None, None)。
+        """
+        method = cv2.TM_SQDIFF if mask is not None else cv2.TM_CCOEFF_NORMED
+        # 粗匹配使用归一化方法，保证不同缩放比例之间的得分可以比较
+        coarse_method = cv2.TM_SQDIFF_NORMED if mask is not None else cv2.TM_CCOEFF_NORMED
+        higher_better = mask is None
+        screen_h, screen_w = screenshot.shape[:2]
+
+        best_val, best_loc = None, None
+
+        def update_best(val, loc):
+            nonlocal best_val, best_loc
+            if not math.isfinite(val):
+                return
+            if best_val is None or (val > best_val if higher_better else val < best_val):
+                best_val, best_loc = val, loc
+
+        coarse_screens = {}
+        candidates = []  # (粗匹配值, 缩放后模板, 缩放后掩码, 原分辨率位置, 粗匹配倍率)
+        for scale in scales:
+            scaled_template = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            scaled_mask = None
+            if mask is not None:
+                scaled_mask = cv2.resize(mask, (scaled_template.shape[1], scaled_template.shape[0]), interpolation=cv2.INTER_NEAREST)
+            template_h, template_w = scaled_template.shape[:2]
+            if template_h == 0 or template_w == 0 or template_h > screen_h or template_w > screen_w:
+                continue
+
+            factor = 1
+            for candidate_factor in (0.25, 0.5):
+                if min(template_h, template_w) * candidate_factor >= ImageUtils.PYRAMID_MIN_TEMPLATE_SIZE:
+                    factor = candidate_factor
+                    break
+
+            if factor == 1:
+                # 模板太小，缩小后会丢失细节，直接在原分辨率下匹配
+                result = cv2.matchTemplate(screenshot, scaled_template, method, mask=scaled_mask)
+                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+                update_best(*((max_val, max_loc) if higher_better else (min_val, min_loc)))
+                continue
+
+            if factor not in coarse_screens:
+                coarse_screens[factor] = cv2.resize(screenshot, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+            coarse_screen = coarse_screens[factor]
+            coarse_template = cv2.resize(scaled_template, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+            coarse_mask = None
+            if scaled_mask is not None:
+                coarse_mask = cv2.resize(scaled_mask, (coarse_template.shape[1], coarse_template.shape[0]), interpolation=cv2.INTER_NEAREST)
+            if coarse_template.shape[0] > coarse_screen.shape[0] or coarse_template.shape[1] > coarse_screen.shape[1]:
+                continue
+
+            result = cv2.matchTemplate(coarse_screen, coarse_template, coarse_method, mask=coarse_mask)
+            suppress_size = (max(1, coarse_template.shape[1] // 2), max(1, coarse_template.shape[0] // 2))
+            for val, (x, y) in ImageUtils._top_candidates(result, ImageUtils.PYRAMID_TOP_K, higher_better, suppress_size):
+                candidates.append((val, scaled_template, scaled_mask, (int(x / factor), int(y / factor)), factor))
+
+        candidates.sort(key=lambda c: c[0], reverse=higher_better)
+        for _, scaled_template, scaled_mask, (x, y), factor in candidates[:ImageUtils.PYRAMID_TOP_K]:
+            # 粗匹配位置的误差不超过 1/factor 个像素，在该邻域内用原方法精修
+            radius = int(math.ceil(1 / factor)) + 2
+            template_h, template_w = scaled_template.shape[:2]
+            x0, y0 = max(0, x - radius), max(0, y - radius)
+            x1, y1 = min(screen_w, x + template_w + radius), min(screen_h, y + template_h + radius)
+            window = screenshot[y0:y1, x0:x1]
+            if window.shape[0] < template_h or window.shape[1] < template_w:
+                continue
+            result = cv2.matchTemplate(window, scaled_template, method, mask=scaled_mask)
+            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+            val, loc = (max_val, max_loc) if higher_better else (min_val, min_loc)
+            update_best(val, (loc[0] + x0, loc[1] + y0))
+
+        return best_val, best_loc
+
+    @staticmethod
+    def _get_match_executor():
+        """获取批量匹配使用的共享线程池，首次调用时创建。"""
+        with ImageUtils._match_executor_lock:
+            if ImageUtils._match_executor is None:
+                ImageUtils._match_executor = ThreadPoolExecutor(
+                    max_workers=ImageUtils.MATCH_MAX_WORKERS,
+                    thread_name_prefix="match_many",
+                )
+            return ImageUtils._match_executor
+
+    @staticmethod
+    def match_template_in_region(screenshot, template, threshold=None, scale_range=None, mask=None, region=None):
+        """
+        在截图的指定区域内匹配模板，返回的位置已换算回整张截图的坐标。
+        :param region: 搜索区域 (x0, y0, x1, y1)，为 None 时搜索整张截图。
+        :return: 最大匹配值和最佳匹配位置，与 scale_and_match_template 一致。
+        """
+        if region is None:
+            return ImageUtils.scale_and_match_template(screenshot, template, threshold, scale_range, mask)
+        x0, y0, x1, y1 = region
+        match_val, match_loc = ImageUtils.scale_and_match_template(screenshot[y0:y1, x0:x1], template, threshold, scale_range, mask)
+        if match_loc is None:
+            return match_val, match_loc
+        return match_val, (match_loc[0] + x0, match_loc[1] + y0)
+
+    @staticmethod
+    def match_many(screenshot, templates):
+        """
+        在同一张截图上批量匹配多个模板。
+        :param screenshot: 已转换好颜色空间的截图，所有模板共用，不会被复制。
+        :param templates: 模板参数列表，每项为 (template, threshold, scale_range, mask, region)，region 为 None 时搜索整张截图。
+        :return: 与 templates 顺序一致的 (匹配值, 匹配位置) 列表，出错的项为 (None, None)。
+        """
+        def match(item):
+            template, threshold, scale_range, mask, region = item
+            try:
+                return ImageUtils.match_template_in_region(screenshot, template, threshold, scale_range, mask, region)
+            except cv2.error:
+                return None, None
+
+        if len(templates) <= 1:
+            return [match(item) for item in templates]
+        return list(ImageUtils._get_match_executor().map(match, templates))
+
     @staticmethod
     def scale_and_match_template_with_multiple_targets(screenshot, template, threshold=None, scale=None):
         """
@@ -157,13 +338,90 @@ class ImageUtils:
         返回:
         - matches: 不重叠的匹配位置列表。
         """
-        matches = []
+        # 与逐个调用 is_match_non_overlapping 的贪心结果完全一致：按 np.where 的行优先顺序依次接受不重叠的位置。
+        # 每接受一个位置，就用向量运算一次性剔除其后所有与之相交的候选；由于候选按行排序，
+        # 只需处理纵坐标不超过 y + height 的连续一段，整体复杂度约为 O(匹配数 × 窗口大小)。
         width, height = template_size
-        for top_left in zip(*locations[::-1]):
-            if ImageUtils.is_match_non_overlapping(top_left, matches, width, height):
-                matches.append(top_left)
+        ys = np.asarray(locations[0])
+        xs = np.asarray(locations[1])
+        alive = np.ones(len(xs), dtype=bool)
+        matches = []
+        i = 0
+        while i < len(xs):
+            i += int(np.argmax(alive[i:]))
+            if not alive[i]:
+                break
+            x, y = xs[i], ys[i]
+            matches.append((x, y))
+            end = int(np.searchsorted(ys, y + height, side='right'))
+            window = slice(i, end)
+            alive[window] &= ~((np.abs(xs[window] - x) <= width) & (ys[window] - y <= height))
         return matches
 
+    # 滚动偏移估计：相位相关的响应低于此值时改用行模板对齐
+    SCROLL_PHASE_MIN_RESPONSE = 0.1
+    # 行模板对齐使用的条带高度（像素）、最低匹配值、最低灰度标准差，以及每个模板校验的候选位置数量
+    SCROLL_ROW_TEMPLATE_HEIGHT = 64
+    SCROLL_ROW_MIN_MATCH = 0.9
+    SCROLL_ROW_MIN_STD = 8
+    SCROLL_ROW_TOP_K = 10
+    # 校验偏移时两帧重叠区域中灰度差超过 SCROLL_PIXEL_DIFF 的像素允许的最大比例，以及重叠区域的最小高度（像素）
+    # 列表各行的背景和布局相同，错位一整行时只有文字不同，因此按差异明显的像素比例而不是平均差异判断
+    SCROLL_PIXEL_DIFF = 48
+    SCROLL_MAX_DIFF_RATIO = 0.001
+    SCROLL_MIN_OVERLAP = 48
+
+    @staticmethod
+    def estimate_vertical_shift(previous, current):
+        """
+        估计两帧之间列表内容的纵向滚动距离。
+        候选偏移来自整幅图的相位相关，以及取上一帧靠近边缘的行作为模板在当前帧中对齐的结果，
+        每个候选偏移都用两帧重叠区域的灰度差校验，返回通过校验且重叠区域最大的一个。
+        :param previous: 上一帧灰度图。
+        :param current: 当前帧灰度图，尺寸需与上一帧相同。
+        :return: 内容向上移动的像素数（向下滚动为正，向上滚动为负），无法对齐时返回 None。
+        """
+        if previous is None or current is None or previous.shape != current.shape:
+            return None
+        height, width = previous.shape[:2]
+
+        def verify(shift):
+            if height - abs(shift) < ImageUtils.SCROLL_MIN_OVERLAP:
+                return False
+            if shift >= 0:
+                a, b = previous[shift:], current[:height - shift]
+            else:
+                a, b = previous[:height + shift], current[-shift:]
+            changed = cv2.countNonZero(cv2.threshold(cv2.absdiff(a, b), ImageUtils.SCROLL_PIXEL_DIFF, 255, cv2.THRESH_BINARY)[1])
+            return changed <= a.size * ImageUtils.SCROLL_MAX_DIFF_RATIO
+
+        candidates = []
+        previous_f = np.float32(previous)
+        current_f = np.float32(current)
+        window = cv2.createHanningWindow((width, height), cv2.CV_32F)
+        (dx, dy), response = cv2.phaseCorrelate(previous_f, current_f, window)
+        if response >= ImageUtils.SCROLL_PHASE_MIN_RESPONSE and abs(dx) < 1.5:
+            candidates.append(int(round(-dy)))
+
+        strip = ImageUtils.SCROLL_ROW_TEMPLATE_HEIGHT
+        if height >= strip * 2:
+            # 向下滚动时上一帧越靠下的行越可能仍在画面中，向上滚动时相反，
+            # 因此分别从底边和顶边向内取第一条有纹理（可能包含文字）的条带作为模板
+            tops = np.linspace(0, height - strip, num=8, dtype=int)
+            for order in (tops[::-1], tops):
+                top = next((int(y) for y in order if float(np.std(previous[y:y + strip])) >= ImageUtils.SCROLL_ROW_MIN_STD), None)
+                if top is None:
+                    break
+                result = cv2.matchTemplate(current, previous[top:top + strip], cv2.TM_CCOEFF_NORMED)
+                for val, (_, y) in ImageUtils._top_candidates(result, ImageUtils.SCROLL_ROW_TOP_K, True, (0, strip // 8)):
+                    if val < ImageUtils.SCROLL_ROW_MIN_MATCH:
+                        break
+                    candidates.append(top - y)
+
+        # 列表各行外观相近，错位整行的偏移也可能通过校验，此时重叠区域越大的偏移越可信
+        verified = [shift for shift in set(candidates) if verify(shift)]
+        return min(verified, key=abs) if verified else None
+
     @staticmethod
     def count_template_matches(target, template, threshold):
         """使用模板匹配计算目标图片中的匹配数。
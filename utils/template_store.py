@@ -0,0 +1,186 @@
+import os
+import json
+import struct
+import hashlib
+import threading
+import cv2
+import numpy as np
+
+from utils.image_utils import ImageUtils
+
+
+class TemplateStore:
+    """
+    预解码模板图片包。
+
+    构建时将 assets/images 下的所有 PNG 解码为彩色图、灰度图和透明掩码，连续写入一个二进制文件，
+    运行时通过内存映射按需读取，查找图片时无需再解码 PNG，多个进程也可以共享同一份只读页面。
+
+    文件格式：MAGIC(8字节) + 索引长度(uint64, 小端) + JSON 索引 + 按 ALIGNMENT 对齐的数组数据。
+    索引中记录每张源图片的大小、修改时间和内容哈希，用于判断包中的图片是否已过期。
+    """
+
+    MAGIC = b"M7ATPL01"
+    INDEX_VERSION = 2
+    ALIGNMENT = 64
+    DEFAULT_IMAGE_DIR = "./assets/images"
+    DEFAULT_PACK_PATH = "./assets/images.pack"
+
+    def __init__(self, pack_path=DEFAULT_PACK_PATH, logger=None):
+        """
+        :param pack_path: 模板包路径。
+        :param logger: 用于记录日志的Logger对象，可选参数。
+        """
+        self.pack_path = pack_path
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._buffer = None
+        self._entries = {}
+        self._verified = set()
+
+    @staticmethod
+    def normalize_path(path):
+        """将图片路径标准化为索引中使用的键，如 ./assets/images/a.png -> assets/images/a.png。"""
+        return os.path.normpath(os.fspath(path)).replace("\\", "/")
+
+    @staticmethod
+    def _file_hash(path):
+        """源图片内容的哈希值。"""
+        with open(path, "rb") as file:
+            return hashlib.sha1(file.read()).hexdigest()
+
+    @staticmethod
+    def _decode(path):
+        """解码单张模板图片，返回 {'template': 彩色图, 'gray': 灰度图, 'mask': 掩码或None}。"""
+        template = ImageUtils.read_image(path)
+        if template is None:
+            return None
+        gray = ImageUtils.read_image(path, cv2.IMREAD_GRAYSCALE)
+        mask = ImageUtils.read_template_with_mask(path)
+        return {'template': template, 'gray': gray, 'mask': mask}
+
+    @staticmethod
+    def build(image_dir=DEFAULT_IMAGE_DIR, pack_path=DEFAULT_PACK_PATH):
+        """
+        解码 image_dir 下的所有 PNG 图片并写入模板包。
+        :return: 写入的图片数量。
+        """
+        entries = {}
+        chunks = []
+        offset = 0
+        for root, _, files in os.walk(image_dir):
+            for name in sorted(files):
+                if not name.lower().endswith(".png"):
+                    continue
+                path = os.path.join(root, name)
+                decoded = TemplateStore._decode(path)
+                if decoded is None:
+                    continue
+                arrays = {}
+                for kind, array in decoded.items():
+                    if array is None:
+                        arrays[kind] = None
+                        continue
+                    array = np.ascontiguousarray(array, dtype=np.uint8)
+                    padding = -offset % TemplateStore.ALIGNMENT
+                    if padding:
+                        chunks.append(b"\0" * padding)
+                        offset += padding
+                    arrays[kind] = [offset, list(array.shape)]
+                    chunks.append(array.tobytes())
+                    offset += array.nbytes
+                stat = os.stat(path)
+                entries[TemplateStore.normalize_path(path)] = {
+                    'size': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'sha1': TemplateStore._file_hash(path),
+                    'arrays': arrays,
+                }
+
+        index = json.dumps({'version': TemplateStore.INDEX_VERSION, 'entries': entries}, ensure_ascii=False).encode("utf-8")
+        header_size = len(TemplateStore.MAGIC) + 8 + len(index)
+        index += b" " * (-header_size % TemplateStore.ALIGNMENT)
+
+        tmp_path = pack_path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(TemplateStore.MAGIC)
+            file.write(struct.pack("<Q", len(index)))
+            file.write(index)
+            for chunk in chunks:
+                file.write(chunk)
+        os.replace(tmp_path, pack_path)
+        return len(entries)
+
+    def _load(self):
+        """打开并映射模板包，失败时退回到逐个解码图片。"""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not os.path.exists(self.pack_path):
+                return
+            try:
+                buffer = np.memmap(self.pack_path, dtype=np.uint8, mode="r")
+                magic_size = len(self.MAGIC)
+                if bytes(buffer[:magic_size]) != self.MAGIC:
+                    raise ValueError("文件头不匹配")
+                index_size = struct.unpack("<Q", bytes(buffer[magic_size:magic_size + 8]))[0]
+                data_start = magic_size + 8 + index_size
+                index = json.loads(bytes(buffer[magic_size + 8:data_start]).decode("utf-8"))
+                if index.get('version') != self.INDEX_VERSION:
+                    raise ValueError(f"索引版本 {index.get('version')} 不受支持，请重新构建模板包")
+                self._buffer = buffer[data_start:]
+                self._entries = index['entries']
+                if self.logger:
+                    self.logger.debug(f"已加载模板包：{self.pack_path} 图片数量：{len(self._entries)}")
+            except Exception as e:
+                self._buffer = None
+                self._entries = {}
+                if self.logger:
+                    self.logger.warning(f"加载模板包失败，将直接读取图片：{e}")
+
+    def _view(self, item):
+        """根据索引项返回只读数组视图。"""
+        if item is None:
+            return None
+        offset, shape = item
+        return np.ndarray(tuple(shape), dtype=np.uint8, buffer=self._buffer, offset=offset)
+
+    def _is_stale(self, path, entry):
+        """
+        源图片是否与包中的版本不同。大小不同时直接判定为过期；大小和修改时间都相同时认为未变化；
+        否则（原地修改为相同大小，或复制安装后修改时间改变）比较内容哈希。
+        源图片无法读取（已删除或无权限）时同样视为过期，不再使用包中的旧版本。
+        """
+        try:
+            stat = os.stat(path)
+            if stat.st_size != entry['size']:
+                return True
+            if stat.st_mtime_ns == entry['mtime_ns']:
+                return False
+            return self._file_hash(path) != entry['sha1']
+        except OSError:
+            return True
+
+    def get(self, path):
+        """
+        读取模板图片。优先从模板包中读取，包中不存在或源图片已变化时直接解码图片。
+        :param path: 图片路径。
+        :return: {'template': 彩色图, 'gray': 灰度图, 'mask': 掩码或None}，读取失败时返回 None。
+        """
+        self._load()
+        key = self.normalize_path(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and key not in self._verified:
+                if self._is_stale(path, entry):
+                    if self.logger:
+                        self.logger.debug(f"模板包中的图片已过期，直接读取：{path}")
+                    self._entries.pop(key, None)
+                    entry = None
+                else:
+                    self._verified.add(key)
+        if entry is None:
+            return self._decode(path)
+        return {kind: self._view(item) for kind, item in entry['arrays'].items()}